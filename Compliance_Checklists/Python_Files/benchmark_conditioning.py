@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Benchmark the table driven text conditioning against the original
+    sequence of substitutions.
+
+    For each RapidIO specification XML file in a directory, times
+    RapidIOStandardParser._legacy_condition_all_text and
+    RapidIOStandardParser._condition_all_text, and checks that both produce
+    identical text.  Exits with a non-zero return code if any output differs.
+"""
+
+from optparse import OptionParser
+import glob
+import sys
+import os
+import time
+import logging
+from parse_rapidio_standard import RapidIOStandardParser
+
+class ConditioningBenchmark(object):
+    def __init__(self, xml_filepaths, repeat):
+        self.xml_filepaths = xml_filepaths
+        self.repeat = repeat
+        self.results = []
+
+    @staticmethod
+    def _time_conditioning(std_parser, condition, text):
+        std_parser.all_text = text
+        start = time.time()
+        condition()
+        return time.time() - start, std_parser.all_text
+
+    def run(self):
+        for xml_filepath in self.xml_filepaths:
+            logging.info("Benchmarking '%s'" % xml_filepath)
+            spec_file = open(xml_filepath)
+            text = " " + spec_file.read() + "  "
+            spec_file.close()
+
+            std_parser = RapidIOStandardParser(False, False, xml_filepath)
+            legacy_times = []
+            table_times = []
+            for i in range(self.repeat):
+                elapsed, legacy_text = self._time_conditioning(std_parser,
+                                    std_parser._legacy_condition_all_text, text)
+                legacy_times.append(elapsed)
+                elapsed, table_text = self._time_conditioning(std_parser,
+                                    std_parser._condition_all_text, text)
+                table_times.append(elapsed)
+            self.results.append([os.path.basename(xml_filepath), len(text),
+                                 min(legacy_times), min(table_times),
+                                 legacy_text == table_text])
+
+    def print_results(self):
+        print("'File', 'Bytes', 'Legacy (s)', 'Table (s)', 'Speedup', 'Identical'")
+        for name, size, legacy, table, identical in self.results:
+            print("'%s', '%d', '%.3f', '%.3f', '%.1f', '%s'"
+                  % (name, size, legacy, table, legacy / table, identical))
+
+    def all_identical(self):
+        return not [r for r in self.results if not r[4]]
+
+def create_parser():
+    parser = OptionParser(description="Compare the speed and output of the original and table driven specification text conditioning.")
+    parser.add_option('-d', '--directory',
+            dest = 'xml_directory',
+            action = 'store', type = 'string', default = 'Standards_XML',
+            help = 'Directory containing RapidIO specification XML files.',
+            metavar = 'DIR')
+    parser.add_option('-n', '--repeat',
+            dest = 'repeat',
+            action = 'store', type = 'int', default = 3,
+            help = 'Number of times to condition each file.  The fastest time is reported.',
+            metavar = 'COUNT')
+    return parser
+
+def validate_options(options):
+    if not os.path.isdir(options.xml_directory):
+        raise ValueError("Directory '%s' does not exist." %
+                         options.xml_directory)
+    options.xml_filepaths = sorted(glob.glob(
+                            os.path.join(options.xml_directory, "*.xml")))
+    if not len(options.xml_filepaths):
+        raise ValueError("No XML files found in '%s'." %
+                         options.xml_directory)
+    if options.repeat < 1:
+        raise ValueError("Repeat count must be at least 1.")
+
+def main(argv = None):
+    logging.basicConfig(level=logging.WARN)
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    (options, argv) = parser.parse_args(argv)
+    if len(argv) != 0:
+        print('Invalid argument!')
+        print
+        parser.print_help()
+        return -1
+
+    try:
+        validate_options(options)
+    except ValueError as e:
+        print(e)
+        sys.exit(-1)
+
+    benchmark = ConditioningBenchmark(options.xml_filepaths, options.repeat)
+    benchmark.run()
+    benchmark.print_results()
+    if not benchmark.all_identical():
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
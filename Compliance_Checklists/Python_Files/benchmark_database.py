@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Measure how the time and memory taken to read, update, write and
+    export the compliance database grow with the number of requirements.
+
+    For each number of requirements, a synthetic merged sorted checklist,
+    database, test case description and requirements file and outline are
+    created by make_synthetic_db.py.  Then each stage is timed:
+    - ComplianceDBFile: read the database, write it, and export the
+      compliance checklist of the latest revision.
+    - ReqtDatabaseUpdater: read the database and checklist, update the
+      database from the checklist, and write it.
+    - TC_D_R_RD: read the test cases, outline and database, check the
+      requirement coverage of the outline, and create the tc_d_r_rd file.
+
+    Each number of requirements is benchmarked in its own process, so that
+    the largest resident set size after each stage belongs to that number
+    of requirements only.  The results are saved after each stage, so the
+    stages completed before a process runs out of memory or time are
+    still reported.  A stage which raises an exception is reported as
+    failed, the later stages of its group are skipped, and the other
+    groups of stages still run.
+
+    The growth of the time taken by each stage is given as the exponent k
+    of time = c * rows ** k.  k is 1 if time grows linearly with the number
+    of requirements.  Exits with a non-zero return code if any exponent
+    exceeds the threshold, or if a stage failed.
+
+    Stages whose class cannot be imported, for example because openpyxl is
+    not installed, are skipped.
+"""
+
+from optparse import OptionParser
+from collections import OrderedDict
+import json
+import multiprocessing
+import resource
+import shutil
+import sys
+import os
+import tempfile
+import time
+import logging
+from benchmark_pipeline import PYTHON_DIR
+from benchmark_scaling import growth_exponent
+from make_synthetic_db import SyntheticDatabase, REVISIONS
+
+TESTCASES_DIR = os.path.join(os.path.dirname(PYTHON_DIR), "Testcases")
+
+DB_FILE_STAGES = ["db_read", "db_write", "db_export"]
+UPDATER_STAGES = ["update_read", "update", "update_write"]
+TESTCASE_STAGES = ["tc_read", "tc_coverage", "tc_generate"]
+STAGES = DB_FILE_STAGES + UPDATER_STAGES + TESTCASE_STAGES
+
+RESULT_FILENAME = "result.json"
+
+# Runs the stages for one number of requirements.  Everything printed by a
+# stage is written to <stage>.txt in out_dir, and everything logged to
+# benchmark.log.
+class DatabaseStages(object):
+    def __init__(self, files, out_dir):
+        self.files = files
+        self.out_dir = out_dir
+        self.seconds = OrderedDict()
+        self.max_rss = OrderedDict()
+        self.skipped = OrderedDict()
+        self.failed = OrderedDict()
+
+    def _save(self):
+        output = open(os.path.join(self.out_dir, RESULT_FILENAME), 'w')
+        json.dump(OrderedDict([("seconds", self.seconds),
+                               ("max_rss_kb", self.max_rss),
+                               ("skipped", self.skipped),
+                               ("failed", self.failed)]),
+                  output, indent=2)
+        output.write("\n")
+        output.close()
+
+    def _stage(self, name, function, *args):
+        logging.info("Benchmarking '%s'" % name)
+        output = open(os.path.join(self.out_dir, name + ".txt"), 'w')
+        stdout = sys.stdout
+        sys.stdout = output
+        start = time.time()
+        try:
+            result = function(*args)
+        except Exception as e:
+            self.failed[name] = "%s: %s" % (e.__class__.__name__, e)
+            self._save()
+            raise
+        finally:
+            sys.stdout = stdout
+            output.close()
+        self.seconds[name] = time.time() - start
+        self.max_rss[name] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self._save()
+        return result
+
+    def _import(self, module_name, stage_names):
+        try:
+            return __import__(module_name)
+        except ImportError as e:
+            for name in stage_names:
+                self.skipped[name] = "cannot import %s: %s" % (module_name, e)
+            self._save()
+            return None
+
+    def _db_file(self):
+        module = self._import("checklist_db_file", DB_FILE_STAGES)
+        if module is None:
+            return
+        db = self._stage("db_read", module.ComplianceDBFile,
+                         self.files["database"])
+        self._stage("db_write", db.write_database)
+        self._stage("db_export", db.write_compliance_checklist, REVISIONS[-1])
+
+    def _updater(self):
+        module = self._import("update_checklist_db", UPDATER_STAGES)
+        if module is None:
+            return
+        updater = self._stage("update_read", module.ReqtDatabaseUpdater,
+                              self.files["checklist"], self.files["database"])
+        self._stage("update", updater.update_database)
+        self._stage("update_write", updater.write_database)
+
+    @staticmethod
+    def _coverage(tc_d_r_rd):
+        tc_d_r_rd.check_reqt_coverage()
+        tc_d_r_rd.print_missing_reqts()
+
+    @staticmethod
+    def _generate(tc_d_r_rd, tc_d_r_filepath, database_filepath):
+        tc_d_r_rd.generate_tc_d_r_rd(tc_d_r_filepath, database_filepath)
+        tc_d_r_rd.write_tc_d_r_rd()
+
+    def _testcases(self):
+        module = self._import("TC_D_R_RD", TESTCASE_STAGES)
+        if module is None:
+            return
+        tc_d_r_rd = self._stage("tc_read", module.TC_D_R_RD, '',
+                                self.files["tc_d_r"], self.files["outline"],
+                                self.files["database"])
+        self._stage("tc_coverage", self._coverage, tc_d_r_rd)
+        self._stage("tc_generate", self._generate, tc_d_r_rd,
+                    self.files["tc_d_r"], self.files["database"])
+
+    # Each group of stages uses its own objects, which are freed before
+    # the next group starts.  The stages of a group use the result of the
+    # stage before, so the stages after a failed stage are skipped.
+    def run(self):
+        for group, names in [(self._db_file, DB_FILE_STAGES),
+                             (self._updater, UPDATER_STAGES),
+                             (self._testcases, TESTCASE_STAGES)]:
+            try:
+                group()
+            except Exception as e:
+                logging.exception("Stages %s failed" % ", ".join(names))
+                not_run = [name for name in names
+                           if name not in self.seconds
+                              and name not in self.failed]
+                if not [name for name in names if name in self.failed]:
+                    self.failed[not_run.pop(0)] = ("%s: %s"
+                                            % (e.__class__.__name__, e))
+                for name in not_run:
+                    self.skipped[name] = "an earlier stage failed"
+                self._save()
+
+def _run_stages(files, out_dir):
+    logging.root.handlers = [
+            logging.FileHandler(os.path.join(out_dir, "benchmark.log"))]
+    sys.path.insert(0, TESTCASES_DIR)
+    DatabaseStages(files, out_dir).run()
+
+class DatabaseBenchmark(object):
+    def __init__(self, rows, threshold, time_limit, seed, work_dir,
+                 keep_files):
+        self.rows = sorted(rows)
+        self.threshold = threshold
+        self.time_limit = time_limit
+        self.seed = seed
+        self.work_dir = work_dir
+        self.keep_files = keep_files
+        self.results = []
+        self.failures = []
+
+    def _generate(self, rows, out_dir):
+        files = OrderedDict([
+                ("checklist", os.path.join(out_dir, "merged_sorted_checklist.txt")),
+                ("database", os.path.join(out_dir, "merged_sorted_db.txt")),
+                ("tc_d_r", os.path.join(out_dir, "tc_d_r.txt")),
+                ("outline", os.path.join(out_dir, "outline.txt"))])
+        db = SyntheticDatabase(rows, seed=self.seed)
+        uids = db.write(files["checklist"], files["database"])
+        db.write_tc_d_r(files["tc_d_r"], uids)
+        db.write_outline(files["outline"])
+        return files, db.counts
+
+    def _run_size(self, rows):
+        logging.info("Benchmarking %d requirements" % rows)
+        out_dir = os.path.join(self.work_dir, str(rows))
+        if not os.path.isdir(out_dir):
+            os.mkdir(out_dir)
+        files, counts = self._generate(rows, out_dir)
+
+        process = multiprocessing.Process(target=_run_stages,
+                                          args=(files, out_dir))
+        process.start()
+        process.join(self.time_limit)
+        failure = None
+        if process.is_alive():
+            process.terminate()
+            process.join()
+            failure = "time limit of %d seconds exceeded" % self.time_limit
+        elif process.exitcode:
+            failure = "process exit code %d" % process.exitcode
+
+        result = OrderedDict([("rows", rows),
+                              ("database_rows", counts["database_rows"]),
+                              ("sections", counts["sections"]),
+                              ("database_bytes",
+                               os.path.getsize(files["database"])),
+                              ("seconds", OrderedDict()),
+                              ("max_rss_kb", OrderedDict()),
+                              ("skipped", OrderedDict()),
+                              ("failed", OrderedDict()),
+                              ("failure", failure)])
+        result_filepath = os.path.join(out_dir, RESULT_FILENAME)
+        if os.path.isfile(result_filepath):
+            result_file = open(result_filepath)
+            result.update(json.load(result_file,
+                                    object_pairs_hook=OrderedDict))
+            result_file.close()
+        if failure is not None or result["failed"]:
+            self.failures.append(rows)
+        if not self.keep_files:
+            shutil.rmtree(out_dir)
+        return result
+
+    def run(self):
+        for rows in self.rows:
+            self.results.append(self._run_size(rows))
+
+    # Only the sizes for which the stage completed are used.
+    def exponents(self):
+        exponents = OrderedDict()
+        for name in STAGES:
+            points = [(result["rows"], result["seconds"][name])
+                      for result in self.results if name in result["seconds"]]
+            exponents[name] = growth_exponent([rows for rows, t in points],
+                                              [t for rows, t in points])
+        return exponents
+
+    def super_linear(self):
+        exponents = self.exponents()
+        return [name for name in exponents
+                if exponents[name] is not None
+                   and exponents[name] > self.threshold]
+
+    def print_results(self):
+        print("'Rows', 'Stage', 'Seconds', 'us/Row', 'Max RSS (KB)'")
+        for result in self.results:
+            for name in result["seconds"]:
+                print("'%d', '%s', '%.3f', '%.1f', '%d'"
+                      % (result["rows"], name, result["seconds"][name],
+                         result["seconds"][name] * 1000000.0 / result["rows"],
+                         result["max_rss_kb"][name]))
+        print("'Stage', 'Exponent', 'Growth'")
+        exponents = self.exponents()
+        super_linear = self.super_linear()
+        for name in exponents:
+            if exponents[name] is None:
+                continue
+            growth = "linear"
+            if name in super_linear:
+                growth = "super-linear"
+            print("'%s', '%.2f', '%s'" % (name, exponents[name], growth))
+        for result in self.results:
+            if result["failure"] is not None:
+                print("%d requirements failed: %s"
+                      % (result["rows"], result["failure"]))
+            for name in result["failed"]:
+                print("%d requirements '%s' failed: %s"
+                      % (result["rows"], name, result["failed"][name]))
+        skipped = OrderedDict()
+        for result in self.results:
+            skipped.update(result["skipped"])
+        for name in skipped:
+            print("'%s' skipped: %s" % (name, skipped[name]))
+
+    def write(self, filepath):
+        report = OrderedDict([("python", sys.version.split()[0]),
+                              ("seed", self.seed),
+                              ("threshold", self.threshold),
+                              ("time_limit", self.time_limit),
+                              ("sizes", self.results),
+                              ("exponents", self.exponents()),
+                              ("super_linear", self.super_linear())])
+        output = open(filepath, 'w')
+        json.dump(report, output, indent=2)
+        output.write("\n")
+        output.close()
+
+    def passed(self):
+        return not self.failures and not self.super_linear()
+
+def create_parser():
+    parser = OptionParser(description="Time reading, updating, writing and exporting synthetic compliance databases of increasing size, and report how the time grows with size.")
+    parser.add_option('-n', '--rows',
+            dest = 'rows',
+            action = 'append', type = 'int', default = [],
+            help = 'Number of requirements in a synthetic database.  May be given more than once.  Default is 10000, 100000 and 1000000.',
+            metavar = 'COUNT')
+    parser.add_option('-t', '--threshold',
+            dest = 'threshold',
+            action = 'store', type = 'float', default = 1.15,
+            help = 'Largest exponent of the growth of stage time with size that is considered linear.  Default is 1.15.',
+            metavar = 'EXPONENT')
+    parser.add_option('-l', '--time_limit',
+            dest = 'time_limit',
+            action = 'store', type = 'int', default = None,
+            help = 'Stop benchmarking a size after this many seconds.  By default, there is no limit.',
+            metavar = 'SECONDS')
+    parser.add_option('-S', '--seed',
+            dest = 'seed',
+            action = 'store', type = 'int', default = 0,
+            help = 'Random number seed for the synthetic databases.  Default is 0.',
+            metavar = 'SEED')
+    parser.add_option('-w', '--work_dir',
+            dest = 'work_dir',
+            action = 'store', type = 'string', default = None,
+            help = 'Directory for the synthetic databases and the output of each stage, which are kept.  By default, a temporary directory is used, and each size is removed once benchmarked.',
+            metavar = 'DIR')
+    parser.add_option('-o', '--output',
+            dest = 'output_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Write the results as JSON to this file.',
+            metavar = 'FILE')
+    return parser
+
+def validate_options(options):
+    if not options.rows:
+        options.rows = [10000, 100000, 1000000]
+    if [rows for rows in options.rows if rows < 1]:
+        raise ValueError("Number of requirements must be at least 1.")
+    if options.time_limit is not None and options.time_limit < 1:
+        raise ValueError("Time limit must be at least 1 second.")
+    if options.work_dir is not None and not os.path.isdir(options.work_dir):
+        raise ValueError("Directory '%s' does not exist." % options.work_dir)
+
+def main(argv = None):
+    logging.basicConfig(level=logging.WARN)
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    (options, argv) = parser.parse_args(argv)
+    if len(argv) != 0:
+        print('Invalid argument!')
+        print
+        parser.print_help()
+        return -1
+
+    try:
+        validate_options(options)
+    except ValueError as e:
+        print(e)
+        sys.exit(-1)
+
+    work_dir = options.work_dir
+    if work_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="benchmark_database_")
+    benchmark = DatabaseBenchmark(options.rows, options.threshold,
+                                  options.time_limit, options.seed, work_dir,
+                                  options.work_dir is not None)
+    try:
+        benchmark.run()
+    finally:
+        if options.work_dir is None:
+            shutil.rmtree(work_dir)
+    benchmark.print_results()
+    if options.output_filepath is not None:
+        benchmark.write(options.output_filepath)
+    if not benchmark.passed():
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,475 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Benchmark every stage of the compliance checklist work flow on the
+    files in this repository.
+
+    Each stage runs the same commands as the 1_update_Standards,
+    2_update_Checklists, 3_update_Compliance and
+    2A_update_Standards_Registers scripts, reading the Standards_XML,
+    Historic_Checklists, Standards_Outlines, Standards_Translations,
+    Standards_Requirements and Standards_Registers files and writing all
+    output to a work directory.  The work flow files are never changed.
+
+    Each stage is run repeatedly, and the median and 95th percentile of the
+    time taken to run all of the commands of the stage are reported.
+    Results may be written to a JSON file, and compared with the results of
+    an earlier run.  Exits with a non-zero return code if a command fails,
+    or if the median time of a stage exceeds the baseline median time by
+    more than the threshold.
+
+    Stages which need a python package that is not installed, e.g. openpyxl
+    or docx, are skipped, as are the stages that use their output.
+"""
+
+from optparse import OptionParser
+from collections import OrderedDict
+import glob
+import json
+import math
+import re
+import shutil
+import subprocess
+import sys
+import os
+import tempfile
+import time
+import logging
+from constants import CHECKLIST_MANIFEST_HEADER
+from parse_checklist import read_manifest, REFERENCE_CORRECTIONS_FILE
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REVISIONS = ["1.3", "2.2", "3.2", "4.0", "4.1"]
+
+# Manifest of the historic checklists parsed by 2_update_Checklists.
+CHECKLIST_MANIFEST = "Historic_Checklists/checklist_manifest.txt"
+
+# Confidence used to match the sections of each outline difference, from
+# 1_update_Standards.
+DIFF_CONFIDENCE = {"1.3to2.2":"0.80", "2.2to3.2":"0.80"}
+DEFAULT_DIFF_CONFIDENCE = "0.75"
+
+# Registers files used for the register summary of each revision, from
+# 2A_update_Standards_Registers.
+SUMMARY_REGISTERS = {"2.2":["1.3"]}
+SUMMARY_TRANSLATIONS = {"2.2":["1.3to2.2"], "3.2":["1.3to2.2", "2.2to3.2"]}
+
+class PipelineStage(object):
+    # commands - list of (script arguments, output file name or None).
+    # modules - python packages which must be installed to run the stage.
+    # after - stages which create files used by this stage.
+    def __init__(self, name, commands, modules=(), after=()):
+        self.name = name
+        self.commands = commands
+        self.modules = modules
+        self.after = after
+
+def _revision(filepath):
+    match = re.search("([0-9]\.[0-9])", os.path.basename(filepath))
+    if match is None:
+        return None
+    return match.group(1)
+
+def _name(filepath):
+    return os.path.splitext(os.path.basename(filepath))[0].replace(" ", "_")
+
+def _parse_stages(xml_filepaths, cache_dir, out):
+    outline = []
+    reqts = []
+    registers = []
+    cache = []
+    if cache_dir is not None:
+        cache = ["-c", cache_dir]
+    for xml_filepath in xml_filepaths:
+        revision = _revision(xml_filepath)
+        if revision is None:
+            continue
+        parse = ["parse_rapidio_standard.py", "-f", xml_filepath,
+                 "-r", revision] + cache
+        name = _name(xml_filepath)
+        outline.append((parse + ["-O", out("outline_%s.txt" % name)], None))
+        new_secs = "Standards_Outlines/new_sections_%s.txt" % revision
+        if os.path.isfile(new_secs):
+            reqts.append((parse + ["-n", new_secs,
+                                   "-R", out("reqts_%s.txt" % name)], None))
+        registers.append((parse + ["-E", out("registers_%s.txt" % name)],
+                          None))
+    return [PipelineStage("outline_parse", outline),
+            PipelineStage("requirement_parse", reqts),
+            PipelineStage("register_parse", registers)]
+
+def _translation_stages(out):
+    merges = []
+    for diff_filepath in sorted(glob.glob(
+                        "Standards_Translations/*_outline_diff.txt")):
+        revs = os.path.basename(diff_filepath).split("_")[0]
+        new_secs = ("Standards_Outlines/new_sections_%s.txt"
+                    % revs.split("to")[1])
+        merge = ["merge_outline_diffs.py", "-f", diff_filepath,
+                 "-n", new_secs]
+        manual = "Standards_Translations/manual_%s.txt" % revs
+        if os.path.isfile(manual):
+            merge += ["-m", manual]
+        merge += ["-c", DIFF_CONFIDENCE.get(revs, DEFAULT_DIFF_CONFIDENCE),
+                  "-o", out("translate_%s.txt" % revs)]
+        merges.append((merge, None))
+
+    translate = ["create_translation.py"]
+    for trans_filepath in sorted(glob.glob(
+                        "Standards_Translations/translate_*.txt")):
+        translate += ["-t", trans_filepath]
+    return [PipelineStage("outline_diff_merge", merges),
+            PipelineStage("translation_build",
+                          [(translate, out("all_translations.txt"))])]
+
+# The checklists are parsed using a copy of the manifest which writes the
+# output files to the work directory.
+def _checklist_stages(out):
+    entries = read_manifest(CHECKLIST_MANIFEST, REFERENCE_CORRECTIONS_FILE)
+    manifest_filepath = out("checklist_manifest.txt")
+    manifest = open(manifest_filepath, 'w')
+    manifest.write("%s\n" % CHECKLIST_MANIFEST_HEADER)
+    for entry in entries:
+        manifest.write("'%s'\n" % "', '".join([entry.checklist_filename,
+                entry.revision, entry.part_number, str(entry.rev2_part6),
+                entry.optional_filename or "",
+                out(os.path.basename(entry.output_filename))]))
+    manifest.close()
+    parses = [(["parse_checklist.py", "-m", manifest_filepath,
+                "-j", str(len(entries))], out("checklist_parse.txt"))]
+
+    merge = ["merge_checklists.py",
+        "-c", "Compliance_Database/ErrorManagementChecklist_Rev2.txt",
+        "-c", "Compliance_Database/DataStreamingChecklist_Rev2.txt",
+        "-c", "Compliance_Database/rev1_3_rio_chklist.txt",
+        "-c", "Compliance_Database/rapidio_interop_checklist_rev2_2.txt",
+        "-o", "Standards_Outlines/outline_1.3.txt",
+        "-o", "Standards_Outlines/outline_2.2.txt",
+        "-t", "Standards_Translations/translate_1.3to2.2.txt",
+        "-t", "Standards_Translations/translate_2.2to3.2.txt",
+        "-t", "Standards_Translations/translate_3.2to4.0.txt",
+        "-t", "Standards_Translations/translate_4.0to4.1.txt",
+        "-r", "Standards_Requirements/reqts_2.2.txt",
+        "-r", "Standards_Requirements/reqts_3.2.txt",
+        "-m", "Standards_Requirements/manual_reqts_3.2.txt",
+        "-d", "Standards_Requirements/manual_drop_3.2.txt",
+        "-r", "Standards_Requirements/reqts_4.0.txt",
+        "-m", "Standards_Requirements/manual_reqts_4.0.txt",
+        "-r", "Standards_Requirements/reqts_4.1.txt"]
+
+    update = ["update_checklist_db.py",
+              "-c", out("merged_sorted_checklist.txt"),
+              "-d", "Compliance_Database/merged_sorted_db.txt"]
+
+    exports = []
+    for revision in REVISIONS:
+        exports.append((["checklist_db_file.py",
+                         "-d", out("merged_sorted_db.txt"), "-r", revision,
+                         "-x", out("Compliance_Checklist_%s.xlsx" % revision)],
+                        out("Compliance_Checklist_%s.txt" % revision)))
+
+    return [PipelineStage("checklist_parse", parses),
+            PipelineStage("checklist_merge",
+                          [(merge, out("merged_sorted_checklist.txt"))]),
+            PipelineStage("db_update",
+                          [(update, out("merged_sorted_db.txt"))],
+                          modules=["openpyxl"], after=["checklist_merge"]),
+            PipelineStage("xlsx_export", exports,
+                          modules=["openpyxl"], after=["db_update"])]
+
+def _register_stages(out):
+    summaries = []
+    documents = []
+    for revision in REVISIONS:
+        summary = ["create_register_summary.py"]
+        for reg_rev in SUMMARY_REGISTERS.get(revision, []) + [revision]:
+            summary += ["-r", "Standards_Registers/registers_%s.txt" % reg_rev]
+        summary += ["-r",
+                    "Standards_Registers/manual_registers_%s.txt" % revision]
+        for revs in SUMMARY_TRANSLATIONS.get(revision, []):
+            summary += ["-t", "Standards_Translations/translate_%s.txt" % revs]
+        summary_filepath = out("register_summary_%s.txt" % revision)
+        summaries.append((summary, summary_filepath))
+        documents.append((["make_document.py", "-t", summary_filepath,
+                           "-w", out("register_summary_%s.docx" % revision)],
+                          None))
+    return [PipelineStage("register_summary", summaries),
+            PipelineStage("docx_export", documents,
+                          modules=["docx"], after=["register_summary"])]
+
+# Return the stages of the work flow, in the order that they are run.
+# out returns the path of a file in the work directory.
+def pipeline_stages(xml_filepaths, cache_dir, out):
+    return (_parse_stages(xml_filepaths, cache_dir, out)
+            + _translation_stages(out)
+            + _checklist_stages(out)
+            + _register_stages(out))
+
+def median(times):
+    times = sorted(times)
+    mid = len(times) // 2
+    if len(times) % 2:
+        return times[mid]
+    return (times[mid - 1] + times[mid]) / 2.0
+
+# Nearest rank percentile.
+def percentile(times, pct):
+    times = sorted(times)
+    rank = int(math.ceil(pct / 100.0 * len(times)))
+    return times[max(rank, 1) - 1]
+
+class PipelineBenchmark(object):
+    def __init__(self, stages, repeat, work_dir):
+        self.stages = stages
+        self.repeat = repeat
+        self.work_dir = work_dir
+        self.results = OrderedDict()
+        self.skipped = OrderedDict()
+        self.failures = []
+        self.regressions = []
+
+    @staticmethod
+    def _missing_module(stage):
+        for module in stage.modules:
+            try:
+                __import__(module)
+            except ImportError:
+                return module
+        return None
+
+    # Run each command of the stage once, and return the total time taken.
+    def _run_stage(self, stage):
+        total = 0.0
+        log = open(os.path.join(self.work_dir, stage.name + ".log"), 'a')
+        for args, out_filepath in stage.commands:
+            command = [sys.executable, os.path.join(PYTHON_DIR, args[0])]
+            command += args[1:]
+            output = log
+            if out_filepath is not None:
+                output = open(out_filepath, 'w')
+            start = time.time()
+            rc = subprocess.call(command, stdout=output, stderr=log)
+            total += time.time() - start
+            if out_filepath is not None:
+                output.close()
+            if rc:
+                log.close()
+                raise RuntimeError("'%s' returned %d, see %s"
+                                   % (" ".join(args), rc, log.name))
+        log.close()
+        return total
+
+    def run(self):
+        for stage in self.stages:
+            reason = None
+            module = self._missing_module(stage)
+            if module is not None:
+                reason = "python package '%s' is not installed" % module
+            elif not stage.commands:
+                reason = "no input files"
+            for after in stage.after:
+                if after in self.skipped or after in self.failures:
+                    reason = "stage '%s' did not run" % after
+            if reason is not None:
+                self.skipped[stage.name] = reason
+                continue
+
+            logging.info("Benchmarking '%s'" % stage.name)
+            times = []
+            try:
+                for i in range(self.repeat):
+                    times.append(self._run_stage(stage))
+            except RuntimeError as e:
+                print("Stage '%s' failed: %s" % (stage.name, e))
+                self.failures.append(stage.name)
+                continue
+            self.results[stage.name] = OrderedDict([
+                    ("commands", len(stage.commands)),
+                    ("runs", times),
+                    ("median", median(times)),
+                    ("p95", percentile(times, 95)),
+                    ("min", min(times))])
+
+    # A stage regresses if its median time exceeds the baseline median time
+    # by more than threshold times the baseline, and by more than
+    # min_seconds.
+    def compare(self, baseline, threshold, min_seconds):
+        base_stages = baseline.get("stages", {})
+        for name in self.results:
+            if name not in base_stages:
+                continue
+            base = base_stages[name]["median"]
+            current = self.results[name]["median"]
+            self.results[name]["baseline_median"] = base
+            if current > base * (1.0 + threshold) and current - base > min_seconds:
+                self.regressions.append(name)
+
+    def write(self, filepath):
+        report = OrderedDict([("python", sys.version.split()[0]),
+                              ("repeat", self.repeat),
+                              ("stages", self.results),
+                              ("skipped", self.skipped),
+                              ("failed", self.failures),
+                              ("regressed", self.regressions)])
+        output = open(filepath, 'w')
+        json.dump(report, output, indent=2)
+        output.write("\n")
+        output.close()
+
+    def print_results(self):
+        print("'Stage', 'Commands', 'Median (s)', 'P95 (s)', 'Baseline (s)', 'Regressed'")
+        for name in self.results:
+            result = self.results[name]
+            base = ""
+            if "baseline_median" in result:
+                base = "%.3f" % result["baseline_median"]
+            print("'%s', '%d', '%.3f', '%.3f', '%s', '%s'"
+                  % (name, result["commands"], result["median"],
+                     result["p95"], base, name in self.regressions))
+        for name in self.skipped:
+            print("'%s' skipped: %s" % (name, self.skipped[name]))
+
+    def passed(self):
+        return not self.failures and not self.regressions
+
+def create_parser():
+    parser = OptionParser(description="Time each stage of the compliance checklist work flow, and compare the times with an earlier run.  Run from the Compliance_Checklists directory.")
+    parser.add_option('-d', '--directory',
+            dest = 'xml_directory',
+            action = 'store', type = 'string', default = 'Standards_XML',
+            help = 'Directory containing RapidIO specification XML files.',
+            metavar = 'DIR')
+    parser.add_option('-n', '--repeat',
+            dest = 'repeat',
+            action = 'store', type = 'int', default = 5,
+            help = 'Number of times to run each stage.',
+            metavar = 'COUNT')
+    parser.add_option('-s', '--stage',
+            dest = 'stage_names',
+            action = 'append', type = 'string', default = [],
+            help = 'Only run this stage, and the stages whose output it uses.  May be given more than once.',
+            metavar = 'STAGE')
+    parser.add_option('-c', '--cache_dir',
+            dest = 'cache_dir',
+            action = 'store', type = 'string', default = None,
+            help = 'Conditioned text cache directory used when parsing specifications.  By default, the text of each specification is conditioned every time it is parsed.',
+            metavar = 'DIR')
+    parser.add_option('-w', '--work_dir',
+            dest = 'work_dir',
+            action = 'store', type = 'string', default = None,
+            help = 'Directory for the files created by each stage.  By default, a temporary directory is used and removed, unless a stage fails.',
+            metavar = 'DIR')
+    parser.add_option('-o', '--output',
+            dest = 'output_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Write the results as JSON to this file.',
+            metavar = 'FILE')
+    parser.add_option('-b', '--baseline',
+            dest = 'baseline_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'JSON results of an earlier run to compare with.',
+            metavar = 'FILE')
+    parser.add_option('-t', '--threshold',
+            dest = 'threshold',
+            action = 'store', type = 'float', default = 0.20,
+            help = 'Fraction of the baseline median time that a stage may exceed the baseline by.  Default is 0.20.',
+            metavar = 'FRACTION')
+    parser.add_option('-m', '--min_seconds',
+            dest = 'min_seconds',
+            action = 'store', type = 'float', default = 0.05,
+            help = 'Ignore differences from the baseline smaller than this number of seconds.  Default is 0.05.',
+            metavar = 'SECONDS')
+    return parser
+
+def validate_options(options):
+    if not os.path.isdir(options.xml_directory):
+        raise ValueError("Directory '%s' does not exist." %
+                         options.xml_directory)
+    options.xml_filepaths = sorted(glob.glob(
+                            os.path.join(options.xml_directory, "*.xml")))
+    if options.repeat < 1:
+        raise ValueError("Repeat count must be at least 1.")
+    if options.threshold < 0:
+        raise ValueError("Threshold must not be negative.")
+    if (options.baseline_filepath is not None
+            and not os.path.isfile(options.baseline_filepath)):
+        raise ValueError("File '%s' not found." % options.baseline_filepath)
+    if options.work_dir is not None and not os.path.isdir(options.work_dir):
+        raise ValueError("Directory '%s' does not exist." % options.work_dir)
+
+# Return the named stages, and the stages they depend on, in work flow
+# order.
+def select_stages(stages, names):
+    if not names:
+        return stages
+    by_name = dict([(stage.name, stage) for stage in stages])
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError("Unknown stage '%s'.  Stages are: %s"
+                         % (unknown[0], ", ".join([s.name for s in stages])))
+    selected = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(by_name[name].after)
+    return [stage for stage in stages if stage.name in selected]
+
+def main(argv = None):
+    logging.basicConfig(level=logging.WARN)
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    (options, argv) = parser.parse_args(argv)
+    if len(argv) != 0:
+        print('Invalid argument!')
+        print
+        parser.print_help()
+        return -1
+
+    work_dir = options.work_dir
+    if work_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="benchmark_pipeline_")
+    out = lambda filename: os.path.join(work_dir, filename)
+
+    try:
+        validate_options(options)
+        stages = select_stages(pipeline_stages(options.xml_filepaths,
+                                               options.cache_dir, out),
+                               options.stage_names)
+        baseline = None
+        if options.baseline_filepath is not None:
+            baseline_file = open(options.baseline_filepath)
+            baseline = json.load(baseline_file)
+            baseline_file.close()
+    except ValueError as e:
+        print(e)
+        if options.work_dir is None:
+            shutil.rmtree(work_dir)
+        sys.exit(-1)
+
+    # The temporary work directory is kept if a stage failed, as the
+    # failure messages refer to the stage logs in it.
+    benchmark = PipelineBenchmark(stages, options.repeat, work_dir)
+    try:
+        benchmark.run()
+    finally:
+        if options.work_dir is None:
+            if benchmark.failures:
+                print("Kept work directory '%s'" % work_dir)
+            else:
+                shutil.rmtree(work_dir)
+    if baseline is not None:
+        benchmark.compare(baseline, options.threshold, options.min_seconds)
+    benchmark.print_results()
+    if options.output_filepath is not None:
+        benchmark.write(options.output_filepath)
+    if not benchmark.passed():
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Measure how the time taken to parse a specification grows with the size
+    of the specification.
+
+    For each size, a synthetic specification and new sections file are
+    created by make_synthetic_spec.py, and parsed by
+    parse_rapidio_standard.py to create the outline, requirements and
+    registers, with the time taken by each stage written by -P.
+
+    The growth of the time taken is given as the exponent k of
+    time = c * size ** k, found by a least squares fit of log(time) against
+    log(size).  k is 1 if time grows linearly with size.  The exponent is
+    reported for the whole parse, and for each stage of parsing, so that
+    the stage which grows faster than the others can be found.  Exits with
+    a non-zero return code if the exponent of the whole parse exceeds the
+    threshold.
+"""
+
+from optparse import OptionParser
+from collections import OrderedDict
+import json
+import math
+import resource
+import shutil
+import subprocess
+import sys
+import os
+import tempfile
+import time
+import logging
+from benchmark_pipeline import PYTHON_DIR
+from make_synthetic_spec import SyntheticSpecification
+
+REVISION = "4.0"
+
+# Exponent of the least squares fit of log(times) against log(sizes).
+def growth_exponent(sizes, times):
+    points = [(math.log(size), math.log(t))
+              for size, t in zip(sizes, times) if t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum([x for x, y in points]) / len(points)
+    mean_y = sum([y for x, y in points]) / len(points)
+    var_x = sum([(x - mean_x) ** 2 for x, y in points])
+    if var_x == 0:
+        return None
+    return sum([(x - mean_x) * (y - mean_y) for x, y in points]) / var_x
+
+class ScalingBenchmark(object):
+    def __init__(self, megabytes, repeat, jobs, threshold, work_dir):
+        self.megabytes = sorted(megabytes)
+        self.repeat = repeat
+        self.jobs = jobs
+        self.threshold = threshold
+        self.work_dir = work_dir
+        self.results = []
+
+    def _out(self, filename):
+        return os.path.join(self.work_dir, filename)
+
+    def _parse(self, xml_filepath, new_secs_filepath, profile_filepath):
+        command = [sys.executable,
+                   os.path.join(PYTHON_DIR, "parse_rapidio_standard.py"),
+                   "-f", xml_filepath, "-r", REVISION,
+                   "-n", new_secs_filepath,
+                   "-O", self._out("outline.txt"),
+                   "-R", self._out("reqts.txt"),
+                   "-E", self._out("registers.txt"),
+                   "-P", profile_filepath,
+                   "-j", str(self.jobs)]
+        log = open(self._out("parse.log"), 'a')
+        start = time.time()
+        rc = subprocess.call(command, stdout=log, stderr=log)
+        elapsed = time.time() - start
+        log.close()
+        if rc:
+            raise RuntimeError("Parsing '%s' returned %d, see %s"
+                               % (xml_filepath, rc, log.name))
+        return elapsed
+
+    # The fastest of the repeated parses, and its stage times, are kept.
+    def run(self):
+        for megabytes in self.megabytes:
+            logging.info("Benchmarking %.1f MB" % megabytes)
+            xml_filepath = self._out("synthetic_%s.xml" % megabytes)
+            new_secs_filepath = self._out("new_sections_%s.txt" % megabytes)
+            profile_filepath = self._out("profile_%s.json" % megabytes)
+            spec = SyntheticSpecification(REVISION)
+            size = spec.write(xml_filepath, int(megabytes * 1024 * 1024))
+            spec.write_new_secs(new_secs_filepath)
+
+            best = None
+            for i in range(self.repeat):
+                elapsed = self._parse(xml_filepath, new_secs_filepath,
+                                      profile_filepath)
+                if best is None or elapsed < best[0]:
+                    profile_file = open(profile_filepath)
+                    stages = json.load(profile_file)["stages"]
+                    profile_file.close()
+                    best = (elapsed, stages)
+            os.remove(xml_filepath)
+
+            # ru_maxrss is the largest of all parses so far.  Sizes are
+            # parsed in increasing order, so it is normally this size.
+            max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            self.results.append(OrderedDict([
+                    ("megabytes", megabytes),
+                    ("bytes", size),
+                    ("sections", spec.counts["sections"]),
+                    ("register_fields", spec.counts["register_fields"]),
+                    ("seconds", best[0]),
+                    ("seconds_per_mb", best[0] * 1024 * 1024 / size),
+                    ("max_rss_kb", max_rss),
+                    ("stages", OrderedDict([(name, best[1][name]["seconds"])
+                                            for name in best[1]]))]))
+
+    def exponents(self):
+        sizes = [result["bytes"] for result in self.results]
+        exponents = OrderedDict([("parse", growth_exponent(sizes,
+                            [result["seconds"] for result in self.results]))])
+        if self.results:
+            for name in self.results[0]["stages"]:
+                exponents[name] = growth_exponent(sizes,
+                        [result["stages"].get(name, 0.0)
+                         for result in self.results])
+        return exponents
+
+    def linear(self):
+        exponent = self.exponents()["parse"]
+        return exponent is None or exponent <= self.threshold
+
+    def print_results(self):
+        print("'Size (MB)', 'Sections', 'Register Fields', 'Parse (s)', 's/MB', 'Max RSS (KB)'")
+        for result in self.results:
+            print("'%.1f', '%d', '%d', '%.3f', '%.3f', '%d'"
+                  % (result["bytes"] / (1024.0 * 1024.0), result["sections"],
+                     result["register_fields"], result["seconds"],
+                     result["seconds_per_mb"], result["max_rss_kb"]))
+        print("'Stage', 'Exponent'")
+        exponents = self.exponents()
+        for name in exponents:
+            if exponents[name] is None:
+                print("'%s', ''" % name)
+            else:
+                print("'%s', '%.2f'" % (name, exponents[name]))
+        if exponents["parse"] is not None:
+            growth = "linearly"
+            if not self.linear():
+                growth = "super-linearly"
+            print("Parse time grows %s with size (exponent %.2f, threshold %.2f)."
+                  % (growth, exponents["parse"], self.threshold))
+
+    def write(self, filepath):
+        report = OrderedDict([("revision", REVISION),
+                              ("jobs", self.jobs),
+                              ("repeat", self.repeat),
+                              ("threshold", self.threshold),
+                              ("sizes", self.results),
+                              ("exponents", self.exponents()),
+                              ("linear", self.linear())])
+        output = open(filepath, 'w')
+        json.dump(report, output, indent=2)
+        output.write("\n")
+        output.close()
+
+def create_parser():
+    parser = OptionParser(description="Parse synthetic specifications of increasing size, and report whether the parse time grows linearly with size.")
+    parser.add_option('-m', '--megabytes',
+            dest = 'megabytes',
+            action = 'append', type = 'float', default = [],
+            help = 'Size of a synthetic specification in megabytes.  May be given more than once.  Default is 3, 10 and 30.',
+            metavar = 'SIZE')
+    parser.add_option('-n', '--repeat',
+            dest = 'repeat',
+            action = 'store', type = 'int', default = 1,
+            help = 'Number of times to parse each specification.  The fastest time is reported.',
+            metavar = 'COUNT')
+    parser.add_option('-j', '--jobs',
+            dest = 'jobs',
+            action = 'store', type = 'int', default = 1,
+            help = 'Number of processes used to parse each specification.',
+            metavar = 'COUNT')
+    parser.add_option('-t', '--threshold',
+            dest = 'threshold',
+            action = 'store', type = 'float', default = 1.15,
+            help = 'Largest exponent of the growth of parse time with size that is considered linear.  Default is 1.15.',
+            metavar = 'EXPONENT')
+    parser.add_option('-w', '--work_dir',
+            dest = 'work_dir',
+            action = 'store', type = 'string', default = None,
+            help = 'Directory for the synthetic specifications and parser output.  By default, a temporary directory is used and removed.',
+            metavar = 'DIR')
+    parser.add_option('-o', '--output',
+            dest = 'output_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Write the results as JSON to this file.',
+            metavar = 'FILE')
+    return parser
+
+def validate_options(options):
+    if not options.megabytes:
+        options.megabytes = [3.0, 10.0, 30.0]
+    if [size for size in options.megabytes if size <= 0]:
+        raise ValueError("Sizes must be greater than 0.")
+    if options.repeat < 1:
+        raise ValueError("Repeat count must be at least 1.")
+    if options.jobs < 1:
+        raise ValueError("Number of jobs must be at least 1.")
+    if options.work_dir is not None and not os.path.isdir(options.work_dir):
+        raise ValueError("Directory '%s' does not exist." % options.work_dir)
+
+def main(argv = None):
+    logging.basicConfig(level=logging.WARN)
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    (options, argv) = parser.parse_args(argv)
+    if len(argv) != 0:
+        print('Invalid argument!')
+        print
+        parser.print_help()
+        return -1
+
+    try:
+        validate_options(options)
+    except ValueError as e:
+        print(e)
+        sys.exit(-1)
+
+    work_dir = options.work_dir
+    if work_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="benchmark_scaling_")
+    benchmark = ScalingBenchmark(options.megabytes, options.repeat,
+                                 options.jobs, options.threshold, work_dir)
+    try:
+        benchmark.run()
+    except RuntimeError as e:
+        print(e)
+        return 1
+    finally:
+        if options.work_dir is None:
+            shutil.rmtree(work_dir)
+    benchmark.print_results()
+    if options.output_filepath is not None:
+        benchmark.write(options.output_filepath)
+    if not benchmark.linear():
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,454 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Check that the fast and legacy parsing engines produce identical
+    outlines, requirements, registers, translations, merged checklist and
+    database, and compare their speed.
+
+    The legacy engine uses the original text conditioning, sentence
+    splitting, keyword matching, register table cleaning and register block
+    assignment, so changes to these stages of the fast engine are checked.
+    Both engines use TextSpan and RegisterField, so changes to these are
+    not checked.
+
+    The work flow of 1_update_Standards and 3_update_Compliance is run once
+    with each engine of parse_rapidio_standard.py, writing all output to a
+    work directory.  Files which cannot be created, e.g. for specifications
+    without an XML file, are taken from the repository by both runs.
+
+    Each file created by the fast engine is compared with the file created
+    by the legacy engine, one record (line) at a time.  Some files record
+    the names of their input files, so the output directory of each engine
+    is replaced by OUT_DIR_NAME before comparing.  The first differing
+    record of each file is reported field by field, using the field names
+    from the header of the file.  Exits with a non-zero return code if any
+    file differs or any command fails.
+"""
+
+from optparse import OptionParser
+from collections import OrderedDict
+import json
+import re
+import shutil
+import subprocess
+import sys
+import os
+import tempfile
+import time
+import logging
+from benchmark_pipeline import PYTHON_DIR, DIFF_CONFIDENCE, DEFAULT_DIFF_CONFIDENCE
+
+ENGINES = ["legacy", "fast"]
+
+# Specification parsed for each revision, from 1_update_Standards.
+SPECIFICATIONS = OrderedDict([
+    ("1.3", "Standards_XML/RapidIO 1.3 Specification Stack.xml"),
+    ("2.2", "Standards_XML/Rev_2.2_specification_stack.xml"),
+    ("3.2", "Standards_XML/RapidIO-Revision-3.2-Specification.xml"),
+    ("4.0", "Standards_XML/RapidIO-Specification-4.0.xml"),
+    ("4.1", "Standards_XML/RapidIO-Specification-4-1.xml"),
+])
+
+# Repository directory of each kind of file created by the work flow.
+REPOSITORY_DIRS = {"outline":"Standards_Outlines",
+                   "reqts":"Standards_Requirements",
+                   "registers":"Standards_Registers",
+                   "translate":"Standards_Translations"}
+
+OUT_DIR_NAME = "<engine>"
+
+# Number of lines at the start of a file which may contain its header.
+HEADER_LINES = 3
+
+class CommandError(Exception):
+    pass
+
+# Split a record into fields.  Records are either quoted, as in
+# "'a', 'b'", or unquoted, as in "a, b".
+def split_record(line):
+    line = line.rstrip("\r\n")
+    if len(line) > 1 and line.startswith("'") and line.endswith("'"):
+        return line[1:-1].split("', '")
+    return [tok.strip() for tok in line.split(",")]
+
+class EngineRun(object):
+    def __init__(self, engine, work_dir, jobs):
+        self.engine = engine
+        self.out_dir = os.path.join(work_dir, engine)
+        if not os.path.isdir(self.out_dir):
+            os.makedirs(self.out_dir)
+        self.jobs = jobs
+        self.times = OrderedDict()
+        self.artifacts = OrderedDict()
+        self.log = None
+
+    def _out(self, filename):
+        return os.path.join(self.out_dir, filename)
+
+    # Return the file created by this run, or the repository file if this
+    # run could not create it.
+    def _input(self, kind, name):
+        filename = "%s_%s.txt" % (kind, name)
+        if filename in self.artifacts:
+            return self.artifacts[filename]
+        return os.path.join(REPOSITORY_DIRS[kind], filename)
+
+    def _run(self, args, out_filepath=None):
+        command = [sys.executable, os.path.join(PYTHON_DIR, args[0])]
+        command += args[1:]
+        output = self.log
+        if out_filepath is not None:
+            output = open(out_filepath, 'w')
+        rc = subprocess.call(command, stdout=output, stderr=self.log)
+        if out_filepath is not None:
+            output.close()
+        if rc:
+            raise CommandError("'%s' returned %d, see %s"
+                               % (" ".join(args), rc, self.log.name))
+
+    def _step(self, name, function):
+        logging.info("%s: %s" % (self.engine, name))
+        start = time.time()
+        function()
+        self.times[name] = time.time() - start
+
+    def _add_artifact(self, filename):
+        self.artifacts[filename] = self._out(filename)
+
+    def parse(self):
+        for revision in SPECIFICATIONS:
+            xml_filepath = SPECIFICATIONS[revision]
+            if not os.path.isfile(xml_filepath):
+                continue
+            args = ["parse_rapidio_standard.py", "-f", xml_filepath,
+                    "-r", revision, "-g", self.engine,
+                    "-O", self._out("outline_%s.txt" % revision),
+                    "-E", self._out("registers_%s.txt" % revision)]
+            new_secs = "Standards_Outlines/new_sections_%s.txt" % revision
+            if os.path.isfile(new_secs):
+                args += ["-n", new_secs,
+                         "-R", self._out("reqts_%s.txt" % revision)]
+            if self.engine == "fast" and self.jobs > 1:
+                args += ["-j", str(self.jobs)]
+            self._run(args)
+            self._add_artifact("outline_%s.txt" % revision)
+            self._add_artifact("registers_%s.txt" % revision)
+            if os.path.isfile(new_secs):
+                self._add_artifact("reqts_%s.txt" % revision)
+
+    # Create the outline difference of two revisions as 1_update_Standards
+    # does, by comparing the outlines with both revisions renamed "test".
+    def _outline_diff(self, old_rev, new_rev):
+        test_filepaths = []
+        for revision in (old_rev, new_rev):
+            outline_file = open(self._input("outline", revision))
+            text = outline_file.read()
+            outline_file.close()
+            test_filepath = self._out("outline_%s.test" % revision)
+            test_file = open(test_filepath, 'w')
+            test_file.write(re.sub("(?m)^'%s'" % re.escape(revision),
+                                   "'test'", text))
+            test_file.close()
+            test_filepaths.append(test_filepath)
+        diff = subprocess.Popen(["diff"] + test_filepaths,
+                                stdout=subprocess.PIPE)
+        diff_text = diff.communicate()[0]
+        if diff.returncode > 1:
+            raise CommandError("diff of outlines %s and %s returned %d"
+                               % (old_rev, new_rev, diff.returncode))
+        diff_text = diff_text.replace("< 'test", "< '%s" % old_rev)
+        diff_text = diff_text.replace("> 'test", "> '%s" % new_rev)
+        diff_filepath = self._out("%sto%s_outline_diff.txt" % (old_rev, new_rev))
+        diff_file = open(diff_filepath, 'w')
+        diff_file.write(diff_text)
+        diff_file.close()
+        return diff_filepath
+
+    # Translations are only created for pairs of revisions whose outlines
+    # were both created by this run.
+    def translate(self):
+        revisions = list(SPECIFICATIONS.keys())
+        for old_rev, new_rev in zip(revisions, revisions[1:]):
+            if not ("outline_%s.txt" % old_rev in self.artifacts
+                    and "outline_%s.txt" % new_rev in self.artifacts):
+                continue
+            revs = "%sto%s" % (old_rev, new_rev)
+            args = ["merge_outline_diffs.py",
+                    "-f", self._outline_diff(old_rev, new_rev),
+                    "-n", "Standards_Outlines/new_sections_%s.txt" % new_rev]
+            manual = "Standards_Translations/manual_%s.txt" % revs
+            if os.path.isfile(manual):
+                args += ["-m", manual]
+            args += ["-c", DIFF_CONFIDENCE.get(revs, DEFAULT_DIFF_CONFIDENCE),
+                     "-o", self._out("translate_%s.txt" % revs)]
+            self._run(args)
+            self._add_artifact("translate_%s.txt" % revs)
+
+    def _translations(self):
+        revisions = list(SPECIFICATIONS.keys())
+        return [self._input("translate", "%sto%s" % (old_rev, new_rev))
+                for old_rev, new_rev in zip(revisions, revisions[1:])]
+
+    def build_translations(self):
+        args = ["create_translation.py"]
+        for trans_filepath in self._translations():
+            args += ["-t", trans_filepath]
+        self._run(args, self._out("all_translations.txt"))
+        self._add_artifact("all_translations.txt")
+
+    # Arguments are in the same order as in 3_update_Compliance.
+    def merge_checklists(self):
+        args = ["merge_checklists.py",
+            "-c", "Compliance_Database/ErrorManagementChecklist_Rev2.txt",
+            "-c", "Compliance_Database/DataStreamingChecklist_Rev2.txt",
+            "-c", "Compliance_Database/rev1_3_rio_chklist.txt",
+            "-c", "Compliance_Database/rapidio_interop_checklist_rev2_2.txt",
+            "-o", self._input("outline", "1.3"),
+            "-o", self._input("outline", "2.2")]
+        for trans_filepath in self._translations():
+            args += ["-t", trans_filepath]
+        args += ["-r", self._input("reqts", "2.2"),
+                 "-r", self._input("reqts", "3.2"),
+                 "-m", "Standards_Requirements/manual_reqts_3.2.txt",
+                 "-d", "Standards_Requirements/manual_drop_3.2.txt",
+                 "-r", self._input("reqts", "4.0"),
+                 "-m", "Standards_Requirements/manual_reqts_4.0.txt",
+                 "-r", self._input("reqts", "4.1")]
+        self._run(args, self._out("merged_sorted_checklist.txt"))
+        self._add_artifact("merged_sorted_checklist.txt")
+
+    def update_database(self):
+        self._run(["update_checklist_db.py",
+                   "-c", self._out("merged_sorted_checklist.txt"),
+                   "-d", "Compliance_Database/merged_sorted_db.txt"],
+                  self._out("merged_sorted_db.txt"))
+        self._add_artifact("merged_sorted_db.txt")
+
+    # Run each step of the work flow.  The database is only updated if
+    # openpyxl, which update_checklist_db.py requires, is installed.
+    def run(self, update_db):
+        self.log = open(self._out("commands.log"), 'w')
+        try:
+            self._step("parse", self.parse)
+            self._step("translate", self.translate)
+            self._step("build_translations", self.build_translations)
+            self._step("merge_checklists", self.merge_checklists)
+            if update_db:
+                self._step("update_database", self.update_database)
+        finally:
+            self.log.close()
+
+class EngineComparison(object):
+    def __init__(self, work_dir, jobs):
+        self.runs = OrderedDict([(engine, EngineRun(engine, work_dir, jobs))
+                                 for engine in ENGINES])
+        self.update_db = True
+        self.skipped = OrderedDict()
+        try:
+            import openpyxl
+        except ImportError:
+            self.update_db = False
+            self.skipped["merged_sorted_db.txt"] = \
+                "python package 'openpyxl' is not installed"
+        self.artifacts = OrderedDict()
+
+    def run(self):
+        for engine in self.runs:
+            self.runs[engine].run(self.update_db)
+        legacy = self.runs["legacy"]
+        fast = self.runs["fast"]
+        for name in fast.artifacts:
+            self.artifacts[name] = self.compare_files(legacy, fast, name)
+
+    @staticmethod
+    def _read_lines(engine_run, name):
+        lines_file = open(engine_run.artifacts[name])
+        lines = [line.replace(engine_run.out_dir, OUT_DIR_NAME)
+                 for line in lines_file.readlines()]
+        lines_file.close()
+        return lines
+
+    # Return the field names for a record, from the first line at the
+    # start of the file that has the same number of fields.
+    @staticmethod
+    def _field_names(lines, record_idx, field_count):
+        for line in lines[:min(record_idx, HEADER_LINES)]:
+            names = split_record(line)
+            if len(names) == field_count:
+                return names
+        return [str(idx) for idx in range(field_count)]
+
+    @classmethod
+    def first_difference(cls, legacy_lines, fast_lines):
+        for idx in range(max(len(legacy_lines), len(fast_lines))):
+            legacy_line = None
+            fast_line = None
+            if idx < len(legacy_lines):
+                legacy_line = legacy_lines[idx].rstrip("\r\n")
+            if idx < len(fast_lines):
+                fast_line = fast_lines[idx].rstrip("\r\n")
+            if legacy_line == fast_line:
+                continue
+            difference = OrderedDict([("record", idx + 1)])
+            if legacy_line is None or fast_line is None:
+                difference["legacy"] = legacy_line
+                difference["fast"] = fast_line
+                return difference
+            legacy_fields = split_record(legacy_line)
+            fast_fields = split_record(fast_line)
+            if len(legacy_fields) != len(fast_fields):
+                difference["legacy"] = legacy_line
+                difference["fast"] = fast_line
+                return difference
+            names = cls._field_names(legacy_lines, idx, len(legacy_fields))
+            difference["fields"] = [OrderedDict([("field", name),
+                                                 ("legacy", legacy_field),
+                                                 ("fast", fast_field)])
+                                    for name, legacy_field, fast_field
+                                    in zip(names, legacy_fields, fast_fields)
+                                    if legacy_field != fast_field]
+            return difference
+        return None
+
+    @classmethod
+    def compare_files(cls, legacy, fast, name):
+        legacy_lines = cls._read_lines(legacy, name)
+        fast_lines = cls._read_lines(fast, name)
+        difference = cls.first_difference(legacy_lines, fast_lines)
+        return OrderedDict([("legacy_records", len(legacy_lines)),
+                            ("fast_records", len(fast_lines)),
+                            ("identical", difference is None),
+                            ("first_difference", difference)])
+
+    def step_times(self):
+        times = OrderedDict()
+        legacy = self.runs["legacy"].times
+        fast = self.runs["fast"].times
+        for step in fast:
+            speedup = None
+            if fast[step] > 0:
+                speedup = legacy[step] / fast[step]
+            times[step] = OrderedDict([("legacy", legacy[step]),
+                                       ("fast", fast[step]),
+                                       ("speedup", speedup)])
+        return times
+
+    def identical(self):
+        return not [name for name in self.artifacts
+                    if not self.artifacts[name]["identical"]]
+
+    def print_results(self):
+        print("'Step', 'Legacy (s)', 'Fast (s)', 'Speedup'")
+        times = self.step_times()
+        for step in times:
+            speedup = ""
+            if times[step]["speedup"] is not None:
+                speedup = "%.2f" % times[step]["speedup"]
+            print("'%s', '%.3f', '%.3f', '%s'" % (step, times[step]["legacy"],
+                                                times[step]["fast"], speedup))
+        print("'File', 'Legacy Records', 'Fast Records', 'Identical'")
+        for name in self.artifacts:
+            result = self.artifacts[name]
+            print("'%s', '%d', '%d', '%s'" % (name, result["legacy_records"],
+                                              result["fast_records"],
+                                              result["identical"]))
+        for name in self.artifacts:
+            difference = self.artifacts[name]["first_difference"]
+            if difference is None:
+                continue
+            print("First difference in '%s' at record %d:"
+                  % (name, difference["record"]))
+            if "fields" in difference:
+                for field in difference["fields"]:
+                    print("    '%s': legacy '%s', fast '%s'"
+                          % (field["field"], field["legacy"], field["fast"]))
+            else:
+                print("    legacy: %s" % difference["legacy"])
+                print("    fast:   %s" % difference["fast"])
+        for name in self.skipped:
+            print("'%s' skipped: %s" % (name, self.skipped[name]))
+
+    def write(self, filepath):
+        report = OrderedDict([("steps", self.step_times()),
+                              ("files", self.artifacts),
+                              ("skipped", self.skipped),
+                              ("identical", self.identical())])
+        output = open(filepath, 'w')
+        json.dump(report, output, indent=2)
+        output.write("\n")
+        output.close()
+
+def create_parser():
+    parser = OptionParser(description="Run the specification work flow with the fast and legacy parsing engines, and compare the files created and the time taken.  Run from the Compliance_Checklists directory.")
+    parser.add_option('-j', '--jobs',
+            dest = 'jobs',
+            action = 'store', type = 'int', default = 1,
+            help = 'Number of processes used by the fast engine to parse each specification.',
+            metavar = 'COUNT')
+    parser.add_option('-w', '--work_dir',
+            dest = 'work_dir',
+            action = 'store', type = 'string', default = None,
+            help = 'Directory for the files created by each engine.  By default, a temporary directory is used and removed, unless a command fails.',
+            metavar = 'DIR')
+    parser.add_option('-o', '--output',
+            dest = 'output_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Write the results as JSON to this file.',
+            metavar = 'FILE')
+    return parser
+
+def validate_options(options):
+    if options.jobs < 1:
+        raise ValueError("Number of jobs must be at least 1.")
+    if options.work_dir is not None and not os.path.isdir(options.work_dir):
+        raise ValueError("Directory '%s' does not exist." % options.work_dir)
+    if not [xml for xml in SPECIFICATIONS.values() if os.path.isfile(xml)]:
+        raise ValueError("No specification XML files found.  Run from the Compliance_Checklists directory.")
+
+def main(argv = None):
+    logging.basicConfig(level=logging.WARN)
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    (options, argv) = parser.parse_args(argv)
+    if len(argv) != 0:
+        print('Invalid argument!')
+        print
+        parser.print_help()
+        return -1
+
+    try:
+        validate_options(options)
+    except ValueError as e:
+        print(e)
+        sys.exit(-1)
+
+    work_dir = options.work_dir
+    if work_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="compare_engines_")
+    # The temporary work directory is kept if a command failed, as the
+    # failure message refers to the command log in it.
+    comparison = EngineComparison(work_dir, options.jobs)
+    failed = False
+    try:
+        comparison.run()
+    except CommandError as e:
+        print(e)
+        failed = True
+        return 1
+    finally:
+        if options.work_dir is None:
+            if failed:
+                print("Kept work directory '%s'" % work_dir)
+            else:
+                shutil.rmtree(work_dir)
+    comparison.print_results()
+    if options.output_filepath is not None:
+        comparison.write(options.output_filepath)
+    if not comparison.identical():
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Substitution rules used to condition the text of RapidIO specification
+    XML files before parsing.
+
+    Rules are applied in the order listed, each to the output of the
+    previous rule.  Patterns are regular expressions, exactly as they
+    would be passed to re.sub().  Patterns without regular expression
+    special characters, and rules marked as literal, are matched as plain
+    strings.  A non-zero count limits the number of replacements.
+
+    Each rule belongs to one or more rule packs: the common pack, which
+    applies to every specification, or the packs for the specification
+    revisions where the rule is known to be needed.  Most rules were added
+    to correct defects in one revision of the specification, so
+    conditioning a revision applies only the common pack and the pack for
+    that revision.
+"""
+
+from text_conditioner import ConditioningRule, COMMON_PACK
+
+CONDITIONING_REVISIONS = ["1.3", "2.2", "3.2", "4.0", "4.1"]
+
+COMMON = [COMMON_PACK]
+
+CONDITIONING_RULES = [
+    # Remove carriage returns, newlines, and tabs.
+    ConditioningRule('\n', ' ', COMMON),
+    ConditioningRule('\r', ' ', COMMON),
+    ConditioningRule('\t', ' ', COMMON),
+
+    # Fix Rev 1.3 special characters
+    ConditioningRule("™", '', COMMON),
+    ConditioningRule('•', '', COMMON),
+    ConditioningRule("“", '"', COMMON),
+    ConditioningRule("”", '"', COMMON),
+    ConditioningRule("’", "'", COMMON),
+
+    # In Revision 3.2 and 4.0, superscripts were dropped.
+    # Change this case to use a '^' <carat> character
+    ConditioningRule("2Mask", '2^Mask', ["3.2", "4.0", "4.1"]),
+
+    # Fix Rev 1.3 text defects
+    ConditioningRule('LogicalSpecification', 'Logical Specification',
+                     ["1.3", "3.2", "4.0", "4.1"]),
+    ConditioningRule('SpecificationPart', 'Specification Part',
+                     ["1.3", "3.2", "4.0", "4.1"]),
+    ConditioningRule('PhysicalLayer', 'Physical Layer',
+                     ["1.3", "3.2", "4.0", "4.1"]),
+    ConditioningRule('DeviceInter-operability', 'Device Inter-operability',
+                     ["1.3", "3.2", "4.0", "4.1"]),
+    ConditioningRule('4.2.7 Type 3–4 Packet Formats \(Reserved\)',
+                     '<P>4.2.7 Type 3–4 Packet Formats (Reserved) </P>',
+                     ["1.3", "3.2", "4.0", "4.1"]),
+    ConditioningRule('4.2.8 Type 5 Packet Format \(Write Class\)',
+                     '<P>4.2.8 Type 5 Packet Format (Write Class) </P>',
+                     COMMON),
+    ConditioningRule('RapidIOTM', 'RapidIO', COMMON),
+    ConditioningRule('TransportSpecification', 'Transport Specification',
+                     ["1.3", "3.2", "4.0", "4.1"]),
+    ConditioningRule('SpecificationAnnex', 'Specification Annex', ["1.3"]),
+
+    # Convert Rev 1.3 Part 5 title to match subsequent specifications
+    ConditioningRule("MemoryLogical", "Memory Logical", ["1.3"]),
+
+    # Convert Rev 1.3 Part 9 title to match subsequent specifications
+    ConditioningRule("LayerExtensions", "Layer Extensions", ["1.3"]),
+
+    # Convert Rev 1.3 terminology to industry standard
+    ConditioningRule("8B/10B", "8b/10b", COMMON),
+
+    # Correct Rev 1.3 Part 6 Register description titles
+    ConditioningRule("CSRs\(Block", "CSRs (Block", ["1.3"]),
+
+    # Correct Rev 1.3 Part 8 title
+    ConditioningRule("ManagementExtensions",
+                     "Management Extensions",
+                     ["1.3"]),
+
+    # Correct Rev 1.3 Part 11 Section 1.1/1.2 Overview
+    ConditioningRule("1.1 Overview",
+                     "1.2 Overview",
+                     ["1.3"]),
+
+    # Correct Rev 2.2 XML special characters...
+    ConditioningRule("&#8482;", "", COMMON),
+    ConditioningRule("&#8216;", "'", COMMON),
+    ConditioningRule("&#8217;", "'", COMMON),
+    ConditioningRule("&#8212;", "—", COMMON),
+    ConditioningRule("&#8211;", "–", COMMON),
+    ConditioningRule("&#8226;", "", COMMON),
+    ConditioningRule("&#8221;", '"', COMMON),
+    ConditioningRule("&#8220;", '"', COMMON),
+    ConditioningRule(" ", ' ', COMMON),
+    ConditioningRule("&gt;", ">", COMMON),
+    ConditioningRule("&lt;", "<", COMMON),
+    ConditioningRule("–", "-", COMMON),
+
+    # Correct Rev 2.2 XML issues register table references,
+    # Configuration Space Offset and Block Offset xml
+    ConditioningRule("&#61472;</P>", "", ["2.2"]),
+    ConditioningRule("&#61472;", "", ["2.2"]),
+    ConditioningRule("<P>\(Configuration Space Offset",
+                     "(Configuration Space Offset",
+                     ["2.2"]),
+    ConditioningRule("<P>\(Block Offset",
+                     " (Block Offset",
+                     ["2.2", "3.2", "4.0", "4.1"]),
+    ConditioningRule("CSR\(Block Offset ",
+                     "CSR (Block Offset ",
+                     ["1.3", "2.2"]),
+    ConditioningRule("\<P\>\(Offset ",
+                     " (Offset ",
+                     ["2.2", "3.2", "4.0", "4.1"]),
+    ConditioningRule("Header\(Block Offset ",
+                     "Header (Block Offset ",
+                     ["1.3", "2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss the start of Part 4...
+    ConditioningRule("Interconnect Specification \</P\>",
+                     "Interconnect Specification ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>Part 4: Physical",
+                     "Part 4: Physical",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 5 Chapter 5 5.2.3.6 TLB Invalidate Entry,
+    # TLB Invalidate Entry Synchronize Operations
+    ConditioningRule("Invalidate Entry Synchronize \</P\>",
+                     "Invalidate Entry Synchronize ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>Operations \</\P>",
+                     "Operations </P>",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 5 Chapter 5 6.7 Data Cache and Instruction Cache
+    # Invalidate Operations
+    #
+    # Note: "Operations" fix in previous block is also necessary for
+    #       this fix.
+    ConditioningRule("Instruction Cache Invalidate \</P\>",
+                     "Instruction Cache Invalidate ",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 5 Chapter 6 6.9 TLB Invalidate Entry,
+    # TLB Invalidate Entry Synchronize Operations
+    ConditioningRule("Entry, TLB Invalidate Entry \</P\>",
+                     "Entry, TLB Invalidate Entry ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>Synchronize Operations \</P\>",
+                     "Synchronize Operations </P>",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 5 Chapter 7 7.6 Resolving an Outstanding
+    # READ_TO_OWN_OWNER Transaction
+    ConditioningRule("Resolving an Outstanding \</P\>",
+                     "Resolving an Outstanding ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>READ_TO_OWN_OWNER Transaction \</P\>",
+                     "READ_TO_OWN_OWNER Transaction </P>",
+                     ["2.2"]),
+
+    # Correct Rev 2.2. XML issue that would otherwise cause parser
+    # to mislable Part 6 Chapter 8 Section 8.5.11
+    ConditioningRule("Transmitter and </P>    <P>Receiver",
+                     "Transmitter and Receiver",
+                     ["2.2"]),
+
+    # Correct Rev 2.2. XML issue that would otherwise cause parser
+    # to mislable Part 6 Chapter 8 Section 8.7.4.5
+    ConditioningRule("Cumulative Distribution </P>    <P>Function",
+                     "Cumulative Distribution Function",
+                     ["2.2"]),
+
+    # Correct Rev 2.2. XML issue that would otherwise cause parser
+    # to mislable Part 6 Chapter 9 Section 9.3
+    ConditioningRule("I Transmitter and </P>    <P>Receiver Specifications",
+                     "I Transmitter and Receiver Specifications",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 6 Chapter 9 1.25 Gbaud, 2.5Gbaud, and 3.125 Gbaud LP-Serial Links
+    ConditioningRule("1.25Gbaud, 2.5Gbaud, and \</P\>",
+                     "1.25 Gbaud, 2.5 Gbaud, and ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>3.125Gbaud LP-Serial Links \</P\>",
+                     "3.125 Gbaud LP-Serial Links </P>",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 6 Chapter 10 5 Gbaud and 6.25 Gbaud LP-Serial
+    ConditioningRule("5Gbaud and 6.25Gbaud LP-Serial \</P\>",
+                     "5 Gbaud and 6.25 Gbaud LP-Serial ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>Links \</P\>",
+                     "Links </P>",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 6 Section 10.1.5
+    ConditioningRule("Transmitter and Receiver </P>    <P>Specifications",
+                     "Transmitter and Receiver Specifications",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 7 Chapter 2 System Exploration and Initialization
+    ConditioningRule("Chapter 2 System Exploration and \</P\>",
+                     "Chapter 2 System Exploration and ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>Initialization",
+                     "Initialization",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 9 Chapter 2 Logical Layer Flow Control Operation
+    ConditioningRule("Logical Layer Flow Control \</P\>",
+                     "Logical Layer Flow Control ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>Operation \</\P>",
+                     "Operation </P>",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 XML issue that would otherwise cause parser
+    # to miss-lable Part 9 Chapter 4 Logical Layer Flow Control
+    # Extensions Register Bits
+    ConditioningRule("Logical Layer Flow Control \</P\>",
+                     "Logical Layer Flow Control ",
+                     ["2.2"]),
+    ConditioningRule("\<P\>Extensions Register Bits \</\P>",
+                     "Extensions Register Bits </P>",
+                     ["2.2"]),
+
+    # Correct Rev 3.2 Part 3 Section 3.7.3 title
+    ConditioningRule("Routing Table Entry </H3>    <P>CSR \(Offset",
+                     "Routing Table Entry CSR (Offset",
+                     ["3.2", "4.0", "4.1"]),
+
+    # Correct Rev 3.2 Part 6 Section 3.5.5.3 title
+    ConditioningRule("Port-status1 Command",
+                     "Port-status Command",
+                     ["3.2", "4.0", "4.1"]),
+
+    # Correct Rev 3.2 Part 6 Chapter 9 title
+    ConditioningRule("Specificationsfor", "Specifications for",
+                     ["3.2", "4.0", "4.1"]),
+
+    # Correct Rev 2.2 Part 6 Chapter 10 title
+    # Correct Rev 3.2 Part 6 Chapter 10 title
+    # Correct Rev 4.0 Part 6 Chapter 10 title
+    ConditioningRule("Chapter 10  1.25 Gbaud, 2.5 Gbaud, and </P>    <P>3.125 Gbaud LP-Serial Links",
+                     "Chapter 10 1.25 Gbaud, 2.5 Gbaud, and 3.125 Gbaud LP-Serial Links",
+                     ["2.2", "3.2", "4.0", "4.1"]),
+
+    # Correct Rev 2.2 Part 6 Chapter 11.4.1.1 title
+    # Correct Rev 3.2 Part 6 Chapter 11.4.1.1 title
+    # Correct Rev 4.0 Part 6 Chapter 11.4.1.1 title
+    ConditioningRule("Test Patterns1", "Test Patterns",
+                     ["2.2", "3.2", "4.0", "4.1"]),
+
+    # Correct Rev 2.2 Part 6 Chapter 11.7.1.2.2 title
+    # Correct Rev 3.2 Part 6 Chapter 11.7.1.2.2 title
+    # Correct Rev 4.0 Part 6 Chapter 11.7.1.2.2 title
+    ConditioningRule("Band Limited1", "Band Limited",
+                     ["2.2", "3.2", "4.0", "4.1"]),
+
+    # Correct Rev 2.2 Part 8 Section 1.2.4 title
+    ConditioningRule("Rate Failed Threshold is </P>    <P>Reached",
+                     "Rate Failed Threshold is Reached",
+                     ["2.2"]),
+
+    # Correct Rev 2.2 Part 8 Section 1.2.4 title
+    ConditioningRule("Enable and Capture </P>    <P>CSRs",
+                     "Enable and Capture CSRs",
+                     ["2.2"]),
+
+    # Correct Rev 3.2 Part 7 Chapter 2 title
+    ConditioningRule("andInitialization",
+                     "and Initialization",
+                     ["3.2", "4.0", "4.1"]),
+    ConditioningRule('3.0, 10/2013 © Copyright RapidIO.org ', '',
+                     ["3.2", "4.0", "4.1"]),
+    ConditioningRule('[0-9+] RapidIO.org', '', ["3.2", "4.0", "4.1"]),
+    ConditioningRule('RapidIO.org [0-9+]', '', ["3.2", "4.0", "4.1"]),
+    ConditioningRule(r" id=\"LinkTarget_[0-9]*\">", r'>', COMMON),
+
+    # Correct Rev 3.2 Part 8 Section 2.5.9 title
+    ConditioningRule("Destination ID Capture </P>    <P>CSR   (Block Offset 0x20)",
+                     "Destination ID Capture CSR (Block Offset 0x20)",
+                     ["3.2"]),
+
+    # Correct Rev 3.2 Part 9 Section 3.4.5 title
+    ConditioningRule("Rules for Traffic Management Supported",
+                     "Rules for Traffic Management </P> Supported",
+                     ["3.2", "4.0", "4.1"]),
+
+    # Correct Rev 3.2 & 4.0 Part 11 Section 3.4.7 title
+    ConditioningRule("Mask x Clear Register y CSR </P>     \(Offset",
+                     "Mask x Clear Register y CSR (Offset",
+                     ["3.2", "4.0", "4.1"]),
+    # Correct Rev 4.0 Register Map section titles
+    ConditioningRule("Map -I", "Map - I", ["3.2", "4.0", "4.1"]),
+
+    # Correct Rev 4.1 Part 10 & Annex 1 titles
+    ConditioningRule("RapidIO\s+Interconnect\s+Specification",
+                     "RapidIO Interconnect Specification",
+                     ["3.2", "4.0", "4.1"]),
+
+    # Correct Rev 4.1 Register titles
+    ConditioningRule("\s+</P>\s+\(Configuration ",
+                     " (Configuration ",
+                     ["4.1"]),
+    ConditioningRule("\s+</P>\s+\(Block ",
+                     " (Block ",
+                     ["3.2", "4.0", "4.1"]),
+    ConditioningRule("\s+</P>\s+\(Offset ",
+                     " (Offset ",
+                     ["4.1"]),
+    ConditioningRule("[\s+</P>]*CSR[\s+</P>]*\s+\(Offset ",
+                     " CSR (Offset ",
+                     ["3.2", "4.0", "4.1"]),
+    ConditioningRule("\s+</P>\s+<P>\(RM-I",
+                     " (RM-I",
+                     ["4.1"]),
+    ConditioningRule("offset based on </P>\s*<P>VC #",
+                     "offset based on VC  . #",
+                     ["4.1"]),
+    ConditioningRule("Capture </P>\s*<P>CSRs",
+                     "Capture CSRs",
+                     ["4.1"]),
+    ConditioningRule(" \+ </P>    <P>\(",
+                     " + (",
+                     ["4.1"]),
+
+    # Correct Rev 4.1 Section Titles
+    ConditioningRule("for Reliable </P>\s+\<P>Transmission",
+                     "for Reliable Transmission",
+                     ["4.1"]),
+    ConditioningRule("Error Free Mode </P>\s+<P>Link Operation",
+                     "Error Free Mode Link Operation",
+                     ["4.1"]),
+    ConditioningRule("Error </P>\s+<P>Recovery Option",
+                     "Error Recovery Option",
+                     ["4.1"]),
+    ConditioningRule("and </P>\s+<P>3.125 Gbaud LP",
+                     "and 3.125 Gbaud LP",
+                     ["4.1"]),
+    ConditioningRule("LP-Serial </P>\s+Links",
+                     "LP-Serial Links",
+                     ["4.1"]),
+    ConditioningRule("for </P>\s+<P>10.3125",
+                     "for 10.3125",
+                     ["4.1"]),
+    ConditioningRule("for 25 </P>\s+<P>Gbaud",
+                     "for 25Gbaud",
+                     ["4.1"]),
+    ConditioningRule("General </P>\s+<P>Requirements",
+                     "General Requirements",
+                     ["2.2", "4.1"]),
+    ConditioningRule("Port Aggrega- tion",
+                     "Port Aggregation",
+                     ["4.1"]),
+    ConditioningRule("Aggregation </P>\s+<P>Extensions",
+                     "Aggregation Extensions",
+                     ["4.1"]),
+
+    # Correct the first Port n Port Aggregation Mask Info CSR offset
+    ConditioningRule("4.4.7  Port n Port Aggregation Mask Info CSR (Block Offset 0x48 + 20 * n)",
+                     "4.4.7  Port n Port Aggregation Mask Info CSR (Block Offset 0x4C + 20 * n)",
+                     ["4.1"], literal=True, count=1),
+
+    # Correct 4.1 requirement beginning with a '
+    ConditioningRule("'Y'", "Y", ["2.2", "3.2", "4.0", "4.1"]),
+]
@@ -30,12 +30,36 @@ TOK_IDX_REQTS_REQT_NUM = 5
 TOK_IDX_REQTS_SENTENCE = 6
 REQUIREMENTS_HEADER_TOKEN_COUNT = TOK_IDX_REQTS_SENTENCE + 1
 
+KEYWORDS_HEADER = "Revision, Part, Chapter, Section, Type, Reqt_Num, Keywords"
+
 OPTIONAL_CHECKLIST_ITEMS_HEADER = "'Table_Name', 'Checklist_ID', 'Optional'"
 TOK_IDX_OPT_CHK_H_TABLE_NAME = 0
 TOK_IDX_OPT_CHK_H_CHECKLIST_ID = 1
 TOK_IDX_OPT_CHK_H_OPTIONAL = 2
 OPTIONAL_CHECKLIST_ITEMS_HEADER_TOKEN_COUNT = TOK_IDX_OPT_CHK_H_OPTIONAL + 1
 
+REFERENCE_CORRECTIONS_HEADER = "'Revision', 'Part', 'Chapter', 'Section', 'Action', 'New_Chapter', 'New_Section', 'Reason'"
+TOK_IDX_REF_CORR_REVISION = 0
+TOK_IDX_REF_CORR_PART = 1
+TOK_IDX_REF_CORR_CHAPTER = 2
+TOK_IDX_REF_CORR_SECTION = 3
+TOK_IDX_REF_CORR_ACTION = 4
+TOK_IDX_REF_CORR_NEW_CHAPTER = 5
+TOK_IDX_REF_CORR_NEW_SECTION = 6
+TOK_IDX_REF_CORR_REASON = 7
+REFERENCE_CORRECTIONS_HEADER_TOKEN_COUNT = TOK_IDX_REF_CORR_REASON + 1
+REF_CORR_SKIP = "SKIP"
+REF_CORR_CORRECT = "CORRECT"
+
+CHECKLIST_MANIFEST_HEADER = "'Checklist', 'Revision', 'Part', 'Rev2_Part6', 'Optional', 'Output'"
+TOK_IDX_CHK_MAN_CHECKLIST = 0
+TOK_IDX_CHK_MAN_REVISION = 1
+TOK_IDX_CHK_MAN_PART = 2
+TOK_IDX_CHK_MAN_REV2_PART6 = 3
+TOK_IDX_CHK_MAN_OPTIONAL = 4
+TOK_IDX_CHK_MAN_OUTPUT = 5
+CHECKLIST_MANIFEST_HEADER_TOKEN_COUNT = TOK_IDX_CHK_MAN_OUTPUT + 1
+
 MERGED_CHECKLIST_SPEC_REVS = "Keys: "
 MERGED_CHECKLIST_SORTED_SPEC_REVS = "Keys sorted: "
 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Keyword classifier for requirement extraction.
+
+    Classifies a sentence by the keywords that it contains, for example
+    "shall" for a requirement or "should" for a recommendation.  Each type
+    has a list of keywords, and the types are listed in order of precedence:
+    a sentence containing both "shall" and "should" is a requirement.
+
+    All keywords are compiled into a single regular expression, so that one
+    pass over the sentence finds every keyword in it.  The expression is a
+    lookahead, so keywords that overlap are all found.  At each position the
+    keywords of the first type are tried first, so the type of a sentence is
+    always the first type that has a keyword anywhere in the sentence.
+    Most sentences contain no keywords, and are rejected by a search for
+    any keyword, which is faster than the lookahead.
+
+    Keywords match anywhere in a sentence, as "shall" matches "shallow".
+    If whole_words is True, keywords only match whole words.
+"""
+
+import re
+
+class KeywordClassifier(object):
+    # types_keywords is a list of (type, [keyword, ...]) in order of
+    # precedence.
+    def __init__(self, types_keywords, whole_words=False):
+        self.types = []
+        self.whole_words = whole_words
+        groups = []
+        any_keywords = []
+        for s_type, keywords in types_keywords:
+            keywords = [keyword for keyword in keywords if keyword]
+            if not keywords:
+                continue
+            # Longer keywords are tried first, so that "may not" is
+            # reported rather than "may".
+            keywords = sorted(set(keywords), key=len, reverse=True)
+            keywords = "|".join([re.escape(keyword) for keyword in keywords])
+            if whole_words:
+                keywords = r"\b(?:%s)\b" % keywords
+            groups.append("(%s)" % keywords)
+            any_keywords.append(keywords)
+            self.types.append(s_type)
+        self.pattern = None
+        self.any_pattern = None
+        if groups:
+            self.pattern = re.compile("(?=%s)" % "|".join(groups))
+            self.any_pattern = re.compile("|".join(any_keywords))
+
+    # Returns (type, keyword, start, end) for each keyword in sentence.
+    def keywords_found(self, sentence):
+        if self.pattern is None or not self.any_pattern.search(sentence):
+            return []
+        found = []
+        for match in self.pattern.finditer(sentence):
+            group = match.lastindex
+            keyword = match.group(group)
+            start = match.start()
+            found.append((self.types[group - 1], keyword,
+                          start, start + len(keyword)))
+        return found
+
+    # Returns the type of the sentence, or None if it contains no keywords,
+    # and the list of (type, keyword, start, end) for each keyword found.
+    def classify(self, sentence):
+        found = self.keywords_found(sentence)
+        if not found:
+            return None, found
+        s_type = self.types[min([self.types.index(f[0]) for f in found])]
+        return s_type, found
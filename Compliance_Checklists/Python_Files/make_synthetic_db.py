@@ -0,0 +1,419 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Create a synthetic merged_sorted_checklist.txt and merged_sorted_db.txt
+    pair of any number of requirements, for measuring how the compliance
+    database tools scale with the size of the database.
+
+    The distributions follow the merged_sorted_checklist.txt created from
+    the RapidIO specifications and Historic Checklists:
+    - Most requirements are introduced in revisions 1.3, 2.2 and 3.2, and
+      most of them are in Part 6.
+    - Requirements of revision 1.3 come from the historic checklists,
+      those of revision 2.2 from the checklists and the specification, and
+      later revisions from the specification and manual requirements.
+      Each source uses its own range of sentence numbers.
+    - Most sections have a few requirements, and a few sections have
+      many.
+    - A requirement is referenced by the revision that introduced it and
+      by all later revisions.
+
+    The database is the checklist as it was before the last update:
+    a fraction of the requirements have since changed their sentence, and
+    a fraction are new, so that updating the database does real work.
+
+    A test case description and requirements (tc_d_r) file, which tests
+    a fraction of the database requirements, and an outline of every
+    section may also be written for Testcases/TC_D_R_RD.py.
+
+    The same options and seed always produce the same files.
+"""
+
+from optparse import OptionParser
+import random
+import sys
+import logging
+from constants import *
+from make_synthetic_spec import NOUNS, ADJECTIVES, VERBS, CLAUSES
+
+REVISIONS = ["1.3", "2.2", "3.2", "4.0", "4.1"]
+
+# Relative number of requirements introduced by each revision.
+REVISION_WEIGHTS = {"1.3":35, "2.2":28, "3.2":34, "4.0":1, "4.1":2}
+
+SPEC = "spec"
+CHECKLIST = "checklist"
+MANUAL = "manual"
+
+# Relative number of requirements from each source for each revision.
+SOURCE_WEIGHTS = {"1.3":[(CHECKLIST, 1)],
+                  "2.2":[(CHECKLIST, 64), (SPEC, 36)],
+                  "3.2":[(SPEC, 53), (MANUAL, 47)],
+                  "4.0":[(SPEC, 78), (MANUAL, 22)],
+                  "4.1":[(SPEC, 1)]}
+
+FIRST_SENTENCE_NUM = {SPEC:REQT_NUM_OFFSET_NONE + 1,
+                      CHECKLIST:REQT_NUM_OFFSET_CHKLIST,
+                      MANUAL:REQT_NUM_OFFSET_MANUAL + 1}
+
+CHECKLIST_FILES = {"1.3":[("Historic_Checklists/rev1_3_rio_chklist.xml", 84),
+                          ("Historic_Checklists/Error Management Checklist.xml", 12),
+                          ("Historic_Checklists/Data Streaming Checklist.xml", 4)],
+                   "2.2":[("Historic_Checklists/rapidio_interop_checklist_rev2_2.xml", 1)]}
+
+PART_TITLES = {1:"Input/Output Logical",
+               2:"Message Passing Logical",
+               3:"Common Transport",
+               6:"LP-Serial Physical Layer",
+               7:"System and Device Inter-operability",
+               8:"Error Management Extensions",
+               9:"Flow Control Logical Layer Extensions",
+               10:"Data Streaming Logical",
+               11:"Multicast Extensions",
+               12:"Virtual Output Queueing Extensions"}
+
+# Relative number of requirements in each part.
+PART_WEIGHTS = {1:403, 2:200, 3:132, 6:3244, 7:90, 8:277, 9:21, 10:92,
+                11:343, 12:26}
+
+PART_HEADER = "RapidIO Interconnect Specification Part %d: %s Specification"
+
+CHAPTERS = 12
+SECTIONS_PER_SUBHEADING = 40
+
+# Relative number of sections with each number of requirements.  Sections
+# of SECTION_SIZE_MAX requirements have between SECTION_SIZE_MAX and
+# SECTION_SIZE_TAIL requirements.
+SECTION_SIZES = [(1, 150), (2, 101), (3, 71), (4, 77), (5, 50), (6, 50),
+                 (7, 34), (8, 31), (9, 27), (10, 31), (11, 19), (12, 9),
+                 (13, 8), (14, 7), (15, 9), (16, 6), (17, 9), (18, 6),
+                 (19, 4), (20, 38)]
+SECTION_SIZE_MAX = 20
+SECTION_SIZE_TAIL = 72
+
+RECOMMENDATION_FRACTION = 0.08
+OPTIONAL_FRACTION = 0.1
+REQTS_PER_TESTCASE = 20
+
+def weighted_choice(rand, choices):
+    total = sum([weight for item, weight in choices])
+    pick = rand.uniform(0, total)
+    for item, weight in choices:
+        pick -= weight
+        if pick <= 0:
+            return item
+    return choices[-1][0]
+
+# Same as ComplianceDBFile.get_uid, which cannot be imported without
+# openpyxl.
+def get_uid(rev, part_num, sec_num, sent_num):
+    num = int(sent_num)
+    if (num < REQT_NUM_OFFSET_CHKLIST):
+        reqt_type = 'r'
+    elif (num < REQT_NUM_OFFSET_MANUAL):
+        num = num - REQT_NUM_OFFSET_CHKLIST
+        reqt_type = 'c'
+    else:
+        num = num - REQT_NUM_OFFSET_MANUAL
+        reqt_type = 'm'
+    return "R%sp%ss%s%s%04.0d" % (rev, part_num, sec_num, reqt_type, num)
+
+def quoted_line(toks):
+    return "'%s'\n" % "', '".join(toks)
+
+class SyntheticDatabase(object):
+    def __init__(self, rows, changed=0.05, added=0.02, tested=0.9, seed=0):
+        self.rows = rows
+        self.changed = changed
+        self.added = added
+        self.tested = tested
+        self.random = random.Random(seed)
+        self.chapter_titles = {}
+        self.section_titles = {}
+        self.item_counts = {}
+        self.sections = self._sections()
+        self.counts = {"sections":len(self.sections), "checklist_rows":0,
+                       "database_rows":0, "changed":0, "added":0,
+                       "testcases":0, "tested":0}
+
+    def _title(self, count):
+        words = [self.random.choice(ADJECTIVES)]
+        words += [self.random.choice(NOUNS) for i in range(count)]
+        return " ".join([word.capitalize() for word in words])
+
+    def _sentence(self, verb):
+        words = {"noun":self.random.choice(NOUNS),
+                 "adj":self.random.choice(ADJECTIVES),
+                 "number":self.random.randint(1, 0xFFFF)}
+        clause = self.random.choice(CLAUSES) % words
+        return ("The %(adj)s %(noun)s " % words + verb + " "
+                + self.random.choice(VERBS) + " the %s %s." % (
+                    self.random.choice(NOUNS), clause))
+
+    def _section_size(self):
+        size = weighted_choice(self.random, SECTION_SIZES)
+        if size == SECTION_SIZE_MAX:
+            size = self.random.randint(SECTION_SIZE_MAX, SECTION_SIZE_TAIL)
+        return size
+
+    # The k'th section of a part has the same name in every revision.
+    # Sections are spread over the chapters, with numbers such as 5.3.12.
+    def _section_name(self, part_num, k):
+        chap_num = (k % CHAPTERS) + 1
+        idx = k // CHAPTERS
+        if (part_num, chap_num) not in self.chapter_titles:
+            self.chapter_titles[(part_num, chap_num)] = (
+                    "Chapter %d %s" % (chap_num, self._title(2)))
+        if (part_num, k) not in self.section_titles:
+            self.section_titles[(part_num, k)] = "%d.%d.%d %s" % (
+                    chap_num, (idx // SECTIONS_PER_SUBHEADING) + 1,
+                    (idx % SECTIONS_PER_SUBHEADING) + 1, self._title(2))
+        return (self.chapter_titles[(part_num, chap_num)],
+                self.section_titles[(part_num, k)])
+
+    # Choose the revision, part, source and number of requirements of each
+    # section, then sort the sections in the order written by
+    # ComplianceDBFile.write_database.
+    def _sections(self):
+        revisions = [(rev, REVISION_WEIGHTS[rev]) for rev in REVISIONS]
+        parts = sorted(PART_WEIGHTS.items())
+        next_section = {}
+        sections = []
+        total = 0
+        while total < self.rows:
+            rev = weighted_choice(self.random, revisions)
+            part_num = weighted_choice(self.random, parts)
+            source = weighted_choice(self.random, SOURCE_WEIGHTS[rev])
+            size = min(self._section_size(), self.rows - total)
+            k = next_section.get((rev, part_num), 0)
+            next_section[(rev, part_num)] = k + 1
+            part = PART_HEADER % (part_num, PART_TITLES[part_num])
+            chap, sect = self._section_name(part_num, k)
+            sections.append((rev, part, chap, sect, part_num, source, size))
+            total += size
+        sections.sort(key=lambda s: (REVISIONS.index(s[0]),) + s[1:4])
+        return sections
+
+    def _checklist_source(self, rev, part_num, chap):
+        filename = weighted_choice(self.random, CHECKLIST_FILES[rev])
+        table = "Table %d. %s Certification List" % (part_num,
+                                                       chap.split(" ", 2)[2])
+        return filename, table
+
+    # Yields the checklist tokens of each requirement of a section, and
+    # the sentence recorded in the database for it.  The database sentence
+    # is None for requirements that are not in the database.
+    def _requirements(self, section):
+        rev, part, chap, sect, part_num, source, size = section
+        if source == CHECKLIST:
+            filename, table = self._checklist_source(rev, part_num, chap)
+        elif source == SPEC:
+            filename = "Standards_Requirements/reqts_%s.txt" % rev
+            table = "N/A"
+        else:
+            filename = "Standards_Requirements/manual_reqts_%s.txt" % rev
+            table = "N/A"
+        rev_refs = []
+        for s_rev in REVISIONS:
+            if REVISIONS.index(s_rev) < REVISIONS.index(rev):
+                rev_refs.extend(['', '', '', ''])
+            else:
+                rev_refs.extend([s_rev, part, chap, sect])
+
+        for idx in range(size):
+            sent_num = str(FIRST_SENTENCE_NUM[source] + idx)
+            reqt_type = "REQUIREMENT"
+            verb = "shall"
+            optional = "REQUIREMENT"
+            item = "N/A"
+            if source == CHECKLIST:
+                optional = "STANDARD"
+                if self.random.random() < OPTIONAL_FRACTION:
+                    optional = "OPTIONAL"
+                count = self.item_counts.get((filename, table), 0) + 1
+                self.item_counts[(filename, table)] = count
+                item = "Item %d" % count
+            elif (source == SPEC
+                  and self.random.random() < RECOMMENDATION_FRACTION):
+                reqt_type = "Recommendation"
+                verb = "should"
+            sentence = self._sentence(verb)
+            db_sentence = sentence
+            kind = self.random.random()
+            if kind < self.added:
+                db_sentence = None
+            elif kind < self.added + self.changed:
+                db_sentence = self._sentence(verb)
+            toks = [sentence, sent_num, reqt_type, rev, part, chap, sect,
+                    filename, table, item, optional]
+            yield toks + rev_refs, db_sentence
+
+    # Write the checklist and database, and return the UIDs of the
+    # database requirements.
+    def write(self, checklist_filepath, database_filepath):
+        chk_file = open(checklist_filepath, 'w')
+        db_file = open(database_filepath, 'w')
+        chk_file.write("%s%s\n" % (MERGED_CHECKLIST_SPEC_REVS,
+                                   " ".join(REVISIONS)))
+        chk_file.write("%s%s\n" % (MERGED_CHECKLIST_SORTED_SPEC_REVS,
+                                   " ".join(REVISIONS)))
+        db_file.write("%s%s\n" % (MERGED_CHECKLIST_SORTED_SPEC_REVS,
+                                  " ".join(REVISIONS)))
+        chk_header = CHECKLIST_HEADER
+        db_header = DATABASE_HEADER
+        for rev in REVISIONS:
+            chk_header = CHECKLIST_HEADER_REV_FORMAT % (chk_header,
+                                                       rev, rev, rev, rev)
+            db_header = CHECKLIST_HEADER_REV_FORMAT % (db_header,
+                                                      rev, rev, rev, rev)
+        chk_file.write(chk_header + "\n")
+        db_file.write(db_header + "\n")
+
+        uids = []
+        for section in self.sections:
+            rev, part, chap, sect, part_num, source, size = section
+            sec_num = sect.split(" ")[0]
+            for toks, db_sentence in self._requirements(section):
+                chk_file.write(quoted_line(toks))
+                self.counts["checklist_rows"] += 1
+                if db_sentence is None:
+                    self.counts["added"] += 1
+                    continue
+                if db_sentence != toks[TOK_IDX_CHK_H_SENTENCE]:
+                    self.counts["changed"] += 1
+                uid = get_uid(rev, part_num, sec_num,
+                              toks[TOK_IDX_CHK_H_SENTENCE_NUM])
+                db_toks = [uid, db_sentence] + toks[1:CHECKLIST_HEADER_TOKEN_COUNT]
+                db_toks.append("ACTIVE")
+                db_toks.extend(toks[CHECKLIST_HEADER_TOKEN_COUNT:])
+                db_file.write(quoted_line(db_toks))
+                self.counts["database_rows"] += 1
+                uids.append(uid)
+        chk_file.close()
+        db_file.close()
+        return uids
+
+    # Each test case tests REQTS_PER_TESTCASE consecutive requirements.
+    # Requirements are left untested at random.
+    def write_tc_d_r(self, tc_d_r_filepath, uids):
+        output = open(tc_d_r_filepath, 'w')
+        output.write("'TESTNAME', 'DESCRIPTION', 'REQUIREMENTS'\n")
+        for start in range(0, len(uids), REQTS_PER_TESTCASE):
+            reqts = [uid for uid in uids[start:start + REQTS_PER_TESTCASE]
+                     if self.random.random() < self.tested]
+            if not reqts:
+                continue
+            self.counts["testcases"] += 1
+            self.counts["tested"] += len(reqts)
+            name = "verify_%s_%d" % (self.random.choice(NOUNS),
+                                     self.counts["testcases"])
+            descr = "Check that the %s %s is handled correctly." % (
+                        self.random.choice(ADJECTIVES),
+                        self.random.choice(NOUNS))
+            output.write(quoted_line([name, descr, ",".join(reqts)]))
+        output.close()
+
+    def write_outline(self, outline_filepath):
+        output = open(outline_filepath, 'w')
+        output.write("'Revision', 'Part', 'Chapter', 'Section'\n")
+        for section in self.sections:
+            output.write(quoted_line(section[0:4]))
+        output.close()
+
+def create_parser():
+    parser = OptionParser(description="Create a synthetic merged sorted checklist and database of a given number of requirements.")
+    parser.add_option('-c', '--checklist',
+            dest = 'checklist_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Synthetic merged sorted checklist file to create.',
+            metavar = 'FILE')
+    parser.add_option('-d', '--database',
+            dest = 'database_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Synthetic database file to create.',
+            metavar = 'FILE')
+    parser.add_option('-n', '--rows',
+            dest = 'rows',
+            action = 'store', type = 'int', default = 10000,
+            help = 'Number of requirements in the checklist.  Default is 10000.',
+            metavar = 'COUNT')
+    parser.add_option('-u', '--changed',
+            dest = 'changed',
+            action = 'store', type = 'float', default = 0.05,
+            help = 'Fraction of requirements whose sentence differs in the database.  Default is 0.05.',
+            metavar = 'FRACTION')
+    parser.add_option('-a', '--added',
+            dest = 'added',
+            action = 'store', type = 'float', default = 0.02,
+            help = 'Fraction of requirements which are not in the database.  Default is 0.02.',
+            metavar = 'FRACTION')
+    parser.add_option('-t', '--tc_d_r',
+            dest = 'tc_d_r_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Also write a test case description and requirements file.',
+            metavar = 'FILE')
+    parser.add_option('-T', '--tested',
+            dest = 'tested',
+            action = 'store', type = 'float', default = 0.9,
+            help = 'Fraction of database requirements tested by the test case description and requirements file.  Default is 0.9.',
+            metavar = 'FRACTION')
+    parser.add_option('-O', '--outline',
+            dest = 'outline_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Also write an outline of every section.',
+            metavar = 'FILE')
+    parser.add_option('-S', '--seed',
+            dest = 'seed',
+            action = 'store', type = 'int', default = 0,
+            help = 'Random number seed.  Default is 0.',
+            metavar = 'SEED')
+    return parser
+
+def validate_options(options):
+    if options.checklist_filepath is None:
+        raise ValueError("Must enter name of synthetic checklist file.")
+    if options.database_filepath is None:
+        raise ValueError("Must enter name of synthetic database file.")
+    if options.rows < 1:
+        raise ValueError("Number of requirements must be at least 1.")
+    for name in ["changed", "added", "tested"]:
+        value = getattr(options, name)
+        if value < 0 or value > 1:
+            raise ValueError("Fraction %s must be between 0 and 1." % name)
+    if options.changed + options.added > 1:
+        raise ValueError("Changed and added fractions total more than 1.")
+
+def main(argv = None):
+    logging.basicConfig(level=logging.WARN)
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    (options, argv) = parser.parse_args(argv)
+    if len(argv) != 0:
+        print('Invalid argument!')
+        print
+        parser.print_help()
+        return -1
+
+    try:
+        validate_options(options)
+    except ValueError as e:
+        print(e)
+        sys.exit(-1)
+
+    db = SyntheticDatabase(options.rows, options.changed, options.added,
+                           options.tested, options.seed)
+    uids = db.write(options.checklist_filepath, options.database_filepath)
+    if options.tc_d_r_filepath is not None:
+        db.write_tc_d_r(options.tc_d_r_filepath, uids)
+    if options.outline_filepath is not None:
+        db.write_outline(options.outline_filepath)
+    print("'%s', '%s', %s" % (options.checklist_filepath,
+          options.database_filepath,
+          ", ".join(["'%d %s'" % (db.counts[name], name)
+                     for name in sorted(db.counts)])))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Create a synthetic RapidIO specification XML file of any size, for
+    measuring how the tools scale with the size of a specification.
+
+    The file has the structure that RapidIOStandardParser expects:
+    "RapidIO Interconnect Specification Part N:" part headers, "Chapter N"
+    headings, numbered sections containing requirement ("shall"),
+    recommendation ("should") and other sentences, and a register chapter
+    in each part whose sections give a register "Offset" and contain a
+    register table.
+
+    Parts are written until the file reaches the requested size.  Part 4
+    is never used, as the parser always skips it.  A new sections file,
+    naming a random fraction of the sections, may also be written so that
+    requirements are extracted from those sections.
+
+    The same options and seed always produce the same file.
+"""
+
+from optparse import OptionParser
+import random
+import sys
+import logging
+
+NOUNS = ["buffer", "queue", "channel", "endpoint", "switch", "transaction",
+         "response", "request", "doorbell", "mailbox", "segment", "window",
+         "credit", "stream", "route", "lane", "symbol", "counter", "timer",
+         "device"]
+ADJECTIVES = ["inbound", "outbound", "local", "remote", "pending", "reserved",
+              "default", "extended", "primary", "secondary"]
+VERBS = ["accept", "forward", "discard", "retry", "acknowledge", "update",
+         "report", "clear", "assert", "reset"]
+CLAUSES = ["when the %(noun)s is %(adj)s",
+           "before the %(noun)s is %(adj)s",
+           "for each of the 16 %(noun)ss",
+           "(i.e. the %(noun)s is %(adj)s)",
+           "within 0x%(number)X cycles"]
+
+# Fraction of sentences which are requirements and recommendations.
+REQUIREMENT_FRACTION = 0.3
+RECOMMENDATION_FRACTION = 0.1
+
+PART_HEADER = "RapidIO Interconnect Specification Part %d: %s Specification"
+
+XML_HEAD = ('<?xml version="1.0" encoding="UTF-8" ?>\r\n'
+            '<!-- Synthetic RapidIO specification -->\r\n'
+            '<TaggedPDF-doc>\r\n<Part>\r\n')
+XML_TAIL = '</Part>\r\n</TaggedPDF-doc>\r\n'
+
+class SyntheticSpecification(object):
+    def __init__(self, revision, chapters=8, sections=12, sentences=20,
+                 fields=6, new_fraction=0.1, seed=0):
+        self.revision = revision
+        self.chapters = chapters
+        self.sections = sections
+        self.sentences = sentences
+        self.fields = fields
+        self.new_fraction = new_fraction
+        self.random = random.Random(seed)
+        self.new_secs = []
+        self.counts = {"parts":0, "chapters":0, "sections":0,
+                       "register_sections":0, "register_fields":0,
+                       "requirements":0, "recommendations":0}
+
+    def _words(self):
+        return {"noun":self.random.choice(NOUNS),
+                "adj":self.random.choice(ADJECTIVES),
+                "number":self.random.randint(1, 0xFFFF)}
+
+    def _title(self, count):
+        words = [self.random.choice(ADJECTIVES)]
+        words += [self.random.choice(NOUNS) for i in range(count)]
+        return " ".join([word.capitalize() for word in words])
+
+    def _sentence(self):
+        words = self._words()
+        kind = self.random.random()
+        if kind < REQUIREMENT_FRACTION:
+            self.counts["requirements"] += 1
+            verb = "shall " + self.random.choice(VERBS)
+        elif kind < REQUIREMENT_FRACTION + RECOMMENDATION_FRACTION:
+            self.counts["recommendations"] += 1
+            verb = "should " + self.random.choice(VERBS)
+        else:
+            verb = self.random.choice(VERBS) + "s"
+        clause = self.random.choice(CLAUSES) % self._words()
+        return "The %(adj)s %(noun)s " % words + verb + " the %s %s." % (
+                    self.random.choice(NOUNS), clause)
+
+    @staticmethod
+    def _paragraph(text, link_id=None):
+        if link_id is None:
+            return "<P>%s </P>\r\n\r\n" % text
+        return '<P id="LinkTarget_%d">%s </P>\r\n\r\n' % (link_id, text)
+
+    def _body(self, count):
+        text = []
+        for idx in range(0, count, 4):
+            text.append(self._paragraph(" ".join([self._sentence()
+                                for i in range(min(4, count - idx))])))
+        return text
+
+    # Split the 32 bits of a register into fields, the last of which
+    # includes bit 31.
+    def _register_table(self, table_name):
+        text = ["<Table>\r\n<Caption>\r\n",
+                self._paragraph("Table %s. Bit Settings for %s"
+                                % (table_name, table_name)),
+                "</Caption>\r\n\r\n<TR>\r\n<TH>Bit </TH>\r\n\r\n"
+                "<TH>Name </TH>\r\n\r\n<TH>Reset Value </TH>\r\n\r\n"
+                "<TH>Description </TH>\r\n</TR>\r\n\r\n"]
+        bounds = sorted(self.random.sample(range(1, 32), self.fields - 1))
+        starts = [0] + bounds
+        ends = [bound - 1 for bound in bounds] + [31]
+        for start, end in zip(starts, ends):
+            bits = str(start)
+            if end != start:
+                bits = "%d-%d" % (start, end)
+            name = "_".join([self.random.choice(NOUNS).upper()
+                             for i in range(2)])
+            text.append("<TR>\r\n<TD>%s </TD>\r\n\r\n<TD>%s </TD>\r\n\r\n"
+                        "<TD>0x0 </TD>\r\n\r\n<TD>%s </TD>\r\n</TR>\r\n\r\n"
+                        % (bits, name, self._sentence()))
+            self.counts["register_fields"] += 1
+        text.append("</Table>\r\n\r\n")
+        return text
+
+    def _section(self, part_name, chapter_name, section_name, text):
+        self.counts["sections"] += 1
+        if self.random.random() < self.new_fraction:
+            self.new_secs.append((part_name, chapter_name, section_name))
+        return [self._paragraph(section_name, self.counts["sections"])] + text
+
+    # The last chapter of each part contains the registers of the part.
+    def _chapter(self, part_number, part_name, chapter_number):
+        self.counts["chapters"] += 1
+        registers = chapter_number == self.chapters
+        if registers:
+            chapter_name = "Chapter %d Synthetic Registers" % chapter_number
+        else:
+            chapter_name = "Chapter %d %s" % (chapter_number, self._title(1))
+        text = [self._paragraph(chapter_name)]
+        text.extend(self._body(self.sentences // 2))
+        for section_number in range(1, self.sections + 1):
+            number = "%d.%d" % (chapter_number, section_number)
+            if registers:
+                self.counts["register_sections"] += 1
+                offset = 0x100 * part_number + 4 * section_number
+                reg_name = "%s CSR" % self._title(2)
+                section_name = ("%s %s (Configuration Space Offset 0x%X)"
+                                % (number, reg_name, offset))
+                body = self._body(2) + self._register_table(
+                            "%d-%d" % (chapter_number, section_number))
+            else:
+                section_name = "%s %s" % (number, self._title(2))
+                body = self._body(self.sentences)
+            text.extend(self._section(part_name, chapter_name,
+                                      section_name, body))
+        return text
+
+    def part(self, part_number):
+        self.counts["parts"] += 1
+        part_name = PART_HEADER % (part_number, self._title(2))
+        text = [self._paragraph(part_name)]
+        for chapter_number in range(1, self.chapters + 1):
+            text.extend(self._chapter(part_number, part_name, chapter_number))
+        return "".join(text)
+
+    # Write parts until the file contains at least size bytes, and at least
+    # min_parts parts.  Returns the number of bytes written.
+    def write(self, xml_filepath, size, min_parts=1):
+        output = open(xml_filepath, 'wb')
+        output.write(XML_HEAD)
+        written = len(XML_HEAD)
+        part_number = 0
+        while written < size or self.counts["parts"] < min_parts:
+            part_number += 1
+            if part_number == 4:
+                continue
+            text = self.part(part_number)
+            output.write(text)
+            written += len(text)
+        output.write(XML_TAIL)
+        output.close()
+        return written + len(XML_TAIL)
+
+    def write_new_secs(self, new_secs_filepath):
+        output = open(new_secs_filepath, 'w')
+        output.write("'Revision', 'Part', 'Chapter', 'Section'\n")
+        for new_sec in self.new_secs:
+            output.write("'%s'\n" % "', '".join((self.revision,) + new_sec))
+        output.close()
+
+def create_parser():
+    parser = OptionParser(description="Create a synthetic RapidIO specification XML file of a given size.")
+    parser.add_option('-o', '--output',
+            dest = 'xml_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Synthetic specification XML file to create.',
+            metavar = 'FILE')
+    parser.add_option('-m', '--megabytes',
+            dest = 'megabytes',
+            action = 'store', type = 'float', default = 3.0,
+            help = 'Approximate size of the file in megabytes.  The RapidIO specifications are about 3 MB.  Default is 3.',
+            metavar = 'SIZE')
+    parser.add_option('-r', '--revision',
+            dest = 'revision',
+            action = 'store', type = 'string', default = '4.0',
+            help = 'Revision named in the new sections file.  Default is 4.0.',
+            metavar = 'REV')
+    parser.add_option('-c', '--chapters',
+            dest = 'chapters',
+            action = 'store', type = 'int', default = 8,
+            help = 'Number of chapters in each part, including the register chapter.  Default is 8.',
+            metavar = 'COUNT')
+    parser.add_option('-s', '--sections',
+            dest = 'sections',
+            action = 'store', type = 'int', default = 12,
+            help = 'Number of sections in each chapter.  Default is 12.',
+            metavar = 'COUNT')
+    parser.add_option('-e', '--sentences',
+            dest = 'sentences',
+            action = 'store', type = 'int', default = 20,
+            help = 'Number of sentences in each section.  Default is 20.',
+            metavar = 'COUNT')
+    parser.add_option('-f', '--fields',
+            dest = 'fields',
+            action = 'store', type = 'int', default = 6,
+            help = 'Number of fields in each register.  Default is 6.',
+            metavar = 'COUNT')
+    parser.add_option('-N', '--new_secs',
+            dest = 'new_secs_filepath',
+            action = 'store', type = 'string', default = None,
+            help = 'Also write a new sections file, naming a random fraction of the sections.',
+            metavar = 'FILE')
+    parser.add_option('-n', '--new_fraction',
+            dest = 'new_fraction',
+            action = 'store', type = 'float', default = 0.1,
+            help = 'Fraction of sections named in the new sections file.  Default is 0.1.',
+            metavar = 'FRACTION')
+    parser.add_option('-S', '--seed',
+            dest = 'seed',
+            action = 'store', type = 'int', default = 0,
+            help = 'Random number seed.  Default is 0.',
+            metavar = 'SEED')
+    return parser
+
+def validate_options(options):
+    if options.xml_filepath is None:
+        raise ValueError("Must enter name of synthetic specification file.")
+    if options.megabytes <= 0:
+        raise ValueError("Size must be greater than 0.")
+    if options.chapters < 2:
+        raise ValueError("Each part must have at least 2 chapters.")
+    if options.sections < 1 or options.sentences < 1:
+        raise ValueError("Sections and sentences must be at least 1.")
+    if options.fields < 1 or options.fields > 32:
+        raise ValueError("Fields must be between 1 and 32, inclusive.")
+    if options.new_fraction < 0 or options.new_fraction > 1:
+        raise ValueError("New sections fraction must be between 0 and 1.")
+
+def main(argv = None):
+    logging.basicConfig(level=logging.WARN)
+    parser = create_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    (options, argv) = parser.parse_args(argv)
+    if len(argv) != 0:
+        print('Invalid argument!')
+        print
+        parser.print_help()
+        return -1
+
+    try:
+        validate_options(options)
+    except ValueError as e:
+        print(e)
+        sys.exit(-1)
+
+    spec = SyntheticSpecification(options.revision, options.chapters,
+                                  options.sections, options.sentences,
+                                  options.fields, options.new_fraction,
+                                  options.seed)
+    size = spec.write(options.xml_filepath,
+                      int(options.megabytes * 1024 * 1024))
+    if options.new_secs_filepath is not None:
+        spec.write_new_secs(options.new_secs_filepath)
+    print("'%s', '%d bytes', %s" % (options.xml_filepath, size,
+          ", ".join(["'%d %s'" % (spec.counts[name], name)
+                     for name in sorted(spec.counts)])))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,19 +17,102 @@
     Note that if there is more than one specification reference in the
     checklist, then one line of output is displayed for each specification
     reference.
+
+    Several checklists can be parsed at once using a manifest file, which
+    gives the options and output file of each checklist.  The checklists
+    are parsed by a pool of processes, so all checklists are parsed in
+    about the time taken by the largest one.
+
+    Checklists parsed by this script are streamed: the XML file is read one
+    table at a time, and each requirement is written as soon as it is
+    found, so memory use does not grow with the size of the checklist.
 """
 
 from optparse import OptionParser
+import multiprocessing
 import re
+import string
 import sys
 import os
-import copy
 import logging
 from constants import *
 
 PRINT_TRACE = False
 
+# Corrections of erroneous specification references in the historic
+# checklists.
+REFERENCE_CORRECTIONS_FILE = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "Historic_Checklists", "reference_corrections.txt")
+
+# Regular expressions used by ChecklistParser, compiled once.
+SECTION_NUMBER = r"(\d+\.\d+[\.\d+]*)"
+CHECKLIST_ITEM = re.compile(r"([0-9]+\.)")
+SUBITEM = re.compile(r"([0-9]+[A-Z][0-9]*).* DETAIL: ",
+                     flags=re.IGNORECASE | re.VERBOSE)
+SUBITEM_ID = re.compile(r"([0-9]+[A-Z][0-9]*)")
+SECTION = re.compile(SECTION_NUMBER, flags=re.IGNORECASE | re.VERBOSE)
+REV2_PART6_TABLE_ITEM = re.compile(SECTION_NUMBER + r"[A-Z][\.\d+]*")
+TABLE_NUMBER = re.compile(r"\d+")
+XML_TAG = re.compile(r'\<[^>]+\>')
+REVISION = re.compile(r"[1-4]\.[0-3]|[1-4]\.[1-3]\.[1-3]")
+
+# The checklist is split into tables at each TABLE_START, and read
+# CHUNK_SIZE bytes at a time.
+TABLE_START = "<Table>"
+CHUNK_SIZE = 64 * 1024
+
+# Characters replaced in the whole checklist, due to some nasty characters
+# in a few checklists...
+CHECKLIST_CHARACTERS = [("\xc2\xa0", " "),
+                        ("\xe2\x80\xa2", " ")]
+
+# Newlines and carriage returns are replaced by spaces, and tabs are
+# removed, by a single str.translate().
+WHITESPACE_TABLE = string.maketrans("\n\r", "  ")
+WHITESPACE_DELETE = "\t"
+
+# Bullets are removed before the other entities are decoded, so that
+# removing a bullet cannot create an entity that is then decoded.
+BULLET_ENTITY = "&#8226;"
+ENTITIES = {"&#8221;":'"',
+            "&#8220;":'"',
+            "&#8216;":"'",
+            "&#8217;":"'",
+            "&quot;":'"',
+            "&gt;":">",
+            "&lt;":"<"}
+ENTITY = re.compile("|".join(ENTITIES.keys()))
+
+# Spelling/grammatical errors in the original tables, corrected in order.
+SPELLING_CORRECTIONS = [
+    # Problem in 1.3 Error Management Checklist Table 2 items 12F,
+    # 12G, and 12I
+    ('an packet', 'a packet'),
+    # Problem in 1.3 Error Management Checklist Table 2 item 20C
+    ('APort', 'A Port'),
+    # Conversion to ASCII removes the S-overbar notation in the
+    # 1.3 Error Management Checklist Table 2-12 items 1C3 and 1C4.
+    # This attempts to correct that.
+    ('ackID, S, S, or rsrv', 'ackID, S, S-overbar, or rsrv'),
+    ('ackID, S, S, and rsrv', 'ackID, S, S-overbar, and rsrv'),
+    # The only reference in 1.3 Error Management Checklist Table 2-13
+    # item 6 is to the previous table 2-12.  Change that to refer to the
+    # correct specification section.
+    ('Table 2-12 above', 'Part 4, Sec. 2.4.5')]
+
+# One requirement, for one specification reference, of a checklist.
+#
+# A requirement is emitted for every reference of every checklist item, so
+# records use __slots__ and are copied field by field instead of with
+# copy.deepcopy().  Every field is a string, a number or None, so a copy
+# shares the values of the original until a new value is assigned to a
+# field of either record.
 class ChecklistRequirement(object):
+    __slots__ = ("sentence", "sentence_num", "reqt_type", "revision", "part",
+                 "chapter", "section", "checklist_file", "table_name",
+                 "chklist_id", "optional")
+
     def __init__(self, filename=None, part_number=None, rev=None):
         self.sentence = None
         self.sentence_num = REQT_NUM_OFFSET_CHKLIST
@@ -49,6 +132,12 @@ class ChecklistRequirement(object):
                 self.chapter, self.section, self.checklist_file,
                 self.table_name, self.chklist_id, self.optional))
 
+    def copy(self):
+        reqt = ChecklistRequirement.__new__(ChecklistRequirement)
+        for name in self.__slots__:
+            setattr(reqt, name, getattr(self, name))
+        return reqt
+
 class ChecklistParser(object):
     TYPE_RECOMMENDATION = "Recommendation"
     TYPE_REQUIREMENT = "REQUIREMENT"
@@ -56,17 +145,14 @@ class ChecklistParser(object):
 
     TABLE_ROW = "<TR>"
     TABLE_COLUMN = "<TD>"
-    SECTION_NUMBER =  r"(\d+\.\d+[\.\d+]*)"
 
     def __init__(self, checklist_filename,
                        optional_filename = None,
                        part_number=None,
                        revision=None,
-                       rev2_part6=False):
-        SUBITEM_RE =  r"([0-9]+[A-Z][0-9]*).* DETAIL: "
-        SUBITEM_ID =  r"([0-9]+[A-Z][0-9]*)"
-        CHKLIST_RE = r"([0-9]+\.)"
-
+                       rev2_part6=False,
+                       corrections_filename=REFERENCE_CORRECTIONS_FILE,
+                       stream=False):
         self.rev2_part6 = rev2_part6
         self.default_reqt = ChecklistRequirement(filename=checklist_filename,
                                                 rev=revision,
@@ -75,17 +161,7 @@ class ChecklistParser(object):
         self.part_chapter_section_col = None
         self.reqts = []
         self.sentence_num = REQT_NUM_OFFSET_CHKLIST
-
-        self.checklist_pattern = re.compile(CHKLIST_RE)
-        self.subitem_pattern = re.compile(SUBITEM_RE,
-                                          flags=re.IGNORECASE | re.VERBOSE)
-        self.subitem_identifier = re.compile(SUBITEM_ID)
-        self.section_number = re.compile(self.SECTION_NUMBER,
-                                          flags=re.IGNORECASE | re.VERBOSE)
-
-        checklist_file = open(checklist_filename)
-        self.checklist = checklist_file.read()
-        checklist_file.close()
+        self.checklist_filename = checklist_filename
 
         self.optionslist = []
         self.optional_table_items_fn = None
@@ -95,10 +171,15 @@ class ChecklistParser(object):
                 self.optionslist = [t.strip() for t in options_file.readlines()]
 
         self.setup_options()
-        self.parse_checklist()
+        self.read_reference_corrections(corrections_filename)
+        # When streaming, the requirements are parsed by the caller
+        # iterating over stream_reqts().
+        if not stream:
+            self.parse_checklist()
 
     def setup_options(self):
-        self.optional_table_items = []
+        # (Table_Name, Checklist_ID, Optional) of each optional item.
+        self.optional_table_items = set()
         if len(self.optionslist) == 0:
             return
 
@@ -116,68 +197,110 @@ class ChecklistParser(object):
                             len(tokens), token_str))
                 continue
             logging.info("Optional: %s" % token_str)
-            self.optional_table_items.append(tokens)
+            self.optional_table_items.add(tuple(tokens))
+
+    # Corrections are keyed by the (revision, part, chapter, section) of the
+    # erroneous reference.  The value is (action, new chapter, new section).
+    def read_reference_corrections(self, corrections_filename):
+        self.reference_corrections = {}
+        if corrections_filename is None:
+            return
+        with open(corrections_filename) as corrections_file:
+            lines = [line.strip() for line in corrections_file.readlines()]
+
+        if not lines or lines[0] != REFERENCE_CORRECTIONS_HEADER:
+            raise ValueError("Reference corrections file %s has incorrect header."
+                             % corrections_filename)
+        for line_num, line in enumerate(lines[1:]):
+            tokens = [tok.strip() for tok in line[1:-1].split("', '")]
+            if not len(tokens) == REFERENCE_CORRECTIONS_HEADER_TOKEN_COUNT:
+                raise ValueError("File '%s' Line %d: %d tokens expected, got %d: %s"
+                         % (corrections_filename, line_num + 1,
+                            REFERENCE_CORRECTIONS_HEADER_TOKEN_COUNT,
+                            len(tokens), line))
+            action = tokens[TOK_IDX_REF_CORR_ACTION]
+            if action not in [REF_CORR_SKIP, REF_CORR_CORRECT]:
+                raise ValueError("File '%s' Line %d: unknown action '%s'"
+                         % (corrections_filename, line_num + 1, action))
+            key = tuple(tokens[TOK_IDX_REF_CORR_REVISION:
+                               TOK_IDX_REF_CORR_SECTION + 1])
+            self.reference_corrections[key] = (action,
+                    tokens[TOK_IDX_REF_CORR_NEW_CHAPTER],
+                    tokens[TOK_IDX_REF_CORR_NEW_SECTION])
 
     def parse_checklist(self):
-        # substitution below is due to some nasty characters
-        # in a few checklists...
-        self.checklist = re.sub("\xc2\xa0", " ", self.checklist)
-        self.checklist = re.sub("\xe2\x80\xa2", " ", self.checklist)
-        self.tables = self.checklist.split("<Table>")
+        self.reqts = list(self.stream_reqts())
+
+    # Yields the text of the checklist file before the first TABLE_START,
+    # and after each TABLE_START, exactly as str.split() would.  Only the
+    # table being read is held in memory.
+    @staticmethod
+    def read_tables(checklist_file):
+        table = ""
+        for chunk in iter(lambda: checklist_file.read(CHUNK_SIZE), ""):
+            # A TABLE_START may span the end of the previous chunk.
+            search = max(0, len(table) - len(TABLE_START) + 1)
+            table += chunk
+            # Tables are sliced from the buffer, and the remainder kept once
+            # the buffer has been searched, to avoid copying it per table.
+            start = 0
+            end = table.find(TABLE_START, search)
+            while end >= 0:
+                yield table[start:end]
+                start = end + len(TABLE_START)
+                end = table.find(TABLE_START, start)
+            table = table[start:]
+        yield table
+
+    # Yields each requirement as soon as it is parsed.
+    def stream_reqts(self):
         self.default_reqt.table_name = None
-        for table in self.tables:
-            logging.debug("Split table: %s" % table[0:100])
-            self.parse_table(table)
+        with open(self.checklist_filename) as checklist_file:
+            for table in self.read_tables(checklist_file):
+                # substitution below is due to some nasty characters
+                # in a few checklists...  None of them contain
+                # TABLE_START, so they can be replaced in each table.
+                for character, replacement in CHECKLIST_CHARACTERS:
+                    table = table.replace(character, replacement)
+                logging.debug("Split table: %s" % table[0:100])
+                for reqt in self.parse_table(table):
+                    yield reqt
 
     # Remove all XML and other extraneous characters/expressions in the text
+    #
+    # Whitespace is translated and tags are removed in one pass each, and
+    # entities are decoded in a single pass.  Tags are removed after tabs,
+    # exactly as the original sequence of substitutions did.
     @staticmethod
     def cleanup_text(text):
-        text = re.sub('\n', ' ', text)
-        text = re.sub('\t', '', text)
-        text = re.sub('\r', ' ', text)
-        text = re.sub(r'\<[^>]+\>', "", text)
+        text = text.translate(WHITESPACE_TABLE, WHITESPACE_DELETE)
+        if "<" in text:
+            text = XML_TAG.sub("", text)
 
         end_partial_xml = ">"
         start_txt = text.find(end_partial_xml)
         if start_txt >= 0:
             start_txt += len(end_partial_xml)
             text = text[start_txt:]
-        text = re.sub('&#8226;', '', text)
-        text = re.sub('&#8221;', '"', text)
-        text = re.sub('&#8220;', '"', text)
-        text = re.sub('&#8216;', "'", text)
-        text = re.sub('&#8217;', "'", text)
-        text = re.sub('&quot;', '"', text)
-        text = re.sub('&gt;', '>', text)
-        text = re.sub('&lt;', '<', text)
-
-        # Correct some spelling/grammatical errors in original tables.
-        # Problem in 1.3 Error Management Checklist Table 2 items 12F,
-        # 12G, and 12I
-        text = re.sub('an packet', 'a packet', text)
-        # Problem in 1.3 Error Management Checklist Table 2 item 20C
-        text = re.sub('APort', 'A Port', text)
-        # Conversion to ASCII removes the S-overbar notation in the
-        # 1.3 Error Management Checklist Table 2-12 items 1C3 and 1C4.
-        # This attempts to correct that.
-        text = re.sub('ackID, S, S, or rsrv', 'ackID, S, S-overbar, or rsrv', text)
-        text = re.sub('ackID, S, S, and rsrv', 'ackID, S, S-overbar, and rsrv', text)
-        # The only reference in 1.3 Error Management Checklist Table 2-13
-        # item 6 is to the previous table 2-12.  Change that to refer to the
-        # correct specification section.
-        text = re.sub('Table 2-12 above', 'Part 4, Sec. 2.4.5', text)
+        if "&" in text:
+            text = text.replace(BULLET_ENTITY, "")
+            text = ENTITY.sub(lambda match: ENTITIES[match.group(0)], text)
+
+        for error, correction in SPELLING_CORRECTIONS:
+            if error in text:
+                text = text.replace(error, correction)
 
         return text.strip()
 
     def check_sentence_for_subitem_pattern(self, sentence,
                                            part_chapter_section_col):
-        result = self.subitem_pattern.match(sentence)
+        result = SUBITEM.match(sentence)
         if not result:
             logging.debug("        NO SUBITEM")
             return False
 
         logging.debug("        SUBITEM_RE: '%s'" % result.group(0))
-        temp = self.subitem_identifier.match(result.group(0))
+        temp = SUBITEM_ID.match(result.group(0))
         self.reqt.chklist_id = self.ITEM_PREFIX + temp.group(0)
         logging.debug("        SUBITEM_ID: '%s'" % temp.group(0))
         sentence_start = len(result.group(0))
@@ -226,7 +349,7 @@ class ChecklistParser(object):
         else:
             logging.debug("    No ITEM")
 
-        result = self.checklist_pattern.match(self.columns[0])
+        result = CHECKLIST_ITEM.match(self.columns[0])
         if result:
             logging.debug("    NUMBER")
             self.reqt.chklist_id = (self.ITEM_PREFIX
@@ -247,13 +370,14 @@ class ChecklistParser(object):
         self.table_name = None
         self.chklist_id = None
         self.optional = "STANDARD"
-        chk_tuple = [self.reqt.table_name, self.reqt.chklist_id, "OPTIONAL"]
+        chk_tuple = (self.reqt.table_name, self.reqt.chklist_id, "OPTIONAL")
         if (chk_tuple in self.optional_table_items):
             self.reqt.optional = "OPTIONAL"
         self.reqt.sentence_num = self.sentence_num
         self.sentence_num += 1
-        self.reqts.append(copy.deepcopy(self.reqt))
+        reqt = self.reqt.copy()
         self.reqt.optional = "STANDARD"
+        return reqt
 
     # Parse first column which has one or more lines of the form:
     # Part X, Sec. Chapter.Y.Z...
@@ -319,7 +443,7 @@ class ChecklistParser(object):
             logging.debug("        PCS: '%s'" % pcs)
             self.reqt.part = "Part " + pcs[0].strip()
 
-            result = self.section_number.search(pcs[1].strip())
+            result = SECTION.search(pcs[1].strip())
             if result:
                 self.reqt.section = result.group(0)
             else:
@@ -327,51 +451,18 @@ class ChecklistParser(object):
             self.reqt.chapter = "Chapter " + sections[1][0]
             logging.debug("        Part: '%s' Chapter: '%s' Section: '%s'"
                       % (self.reqt.part, self.reqt.chapter, self.reqt.section))
-            if (self.reqt.revision == "1.3"
-                and self.reqt.part == "Part 6"
-                and self.reqt.chapter == "Chapter 4"
-                and (self.reqt.section == "Table 4-1"
-                     or self.reqt.section == "Table 4-2")):
-                logging.debug("        Skipping table references...")
-                continue
-            # Skip erroneous requirement reference found in
-            # rev1.3 Checklists, Table 2-4, item 12A/A1/A2.
-            # This should be a references to Part 4, which is not
-            # supported by the checklists.
-            if (self.reqt.revision == "1.3"
-                and self.reqt.part == "Part 6"
-                and self.reqt.section == "5.8.2.1"):
+            # Skip or correct the erroneous references listed in the
+            # reference corrections file.
+            correction = self.reference_corrections.get((self.reqt.revision,
+                    self.reqt.part, self.reqt.chapter, self.reqt.section))
+            if correction is not None:
+                action, chapter, section = correction
+                if action == REF_CORR_SKIP:
+                    logging.debug("        Skipping reference...")
                     continue
-            # Correct erroneous requirement reference found in
-            # rev1.3 Checklists, Table 3-8, item 12
-            if (self.reqt.revision == "1.3"
-                and self.reqt.part == "Part 1"
-                and self.reqt.chapter == "Chapter 2"
-                and (self.reqt.section == "2.32.2")):
-                self.reqt.section = "2.3.2.2"
-            # Correct erroneous requirement reference found in
-            # rev1.3 Checklists, Table 3-12, item 1A, 1B
-            if (self.reqt.revision == "1.3"
-               and self.reqt.part == "Part 6"
-               and self.reqt.chapter == "Chapter 5"
-               and self.reqt.section == "5.10.2.3.2"):
-                    self.reqt.section = "5.11.2.3.2"
-                # Correct erroneous requirement reference found in
-                # rev1.3 Checklists, Table 4-1, item 2G
-            if (self.reqt.revision == "1.3"
-                and self.reqt.part == "Part 3"
-                and self.reqt.chapter == "Chapter 2"
-                and self.reqt.section == "2.3.1"):
-                    self.reqt.chapter = "Chapter 3"
-                    self.reqt.section = "3.4.1"
-                # Correct erroneous requirement reference found in
-                # rev1.3 Checklists, Table 6-4, item 3.
-            if (self.reqt.revision == "1.3"
-                and self.reqt.part == "Part 1"
-                and self.reqt.chapter == "Chapter 3"
-                and self.reqt.section == "3.41"):
-                    self.reqt.section = "3.4.1"
-            self.add_requirement()
+                self.reqt.chapter = chapter
+                self.reqt.section = section
+            yield self.add_requirement()
 
     def rev2_part6_get_cols_from_row(self, row):
         temp = [col.strip() for col in row.split(self.TABLE_COLUMN)]
@@ -383,15 +474,12 @@ class ChecklistParser(object):
         logging.debug("Rev2_Part6_Columns: %s" % self.columns)
 
     def rev2_part6_add_requirements(self):
-        REV2p6_TABLE_ITEM = self.SECTION_NUMBER + "[A-Z][\.\d+]*"
-        table_item = re.compile(REV2p6_TABLE_ITEM)
-
-        result = table_item.match(self.columns[0])
+        result = REV2_PART6_TABLE_ITEM.match(self.columns[0])
         if not result:
             return
-        self.reqt = copy.deepcopy(self.default_reqt)
+        self.reqt = self.default_reqt.copy()
         self.reqt.chklist_id = self.columns[0].strip()
-        section = self.section_number.match(self.reqt.chklist_id)
+        section = SECTION.match(self.reqt.chklist_id)
         if not section:
             logging.error("Found ID, no section: '%s'" % self.reqt.chklist_id)
             return
@@ -403,13 +491,9 @@ class ChecklistParser(object):
         self.reqt.chklist_id = self.ITEM_PREFIX + self.reqt.chklist_id
         logging.info("Table REQT: '%s': '%s'"
                    % (self.reqt.chklist_id, self.reqt.table_name))
-        self.add_requirement()
+        yield self.add_requirement()
 
     def rev2_part6_parse_table(self):
-        TABLE_NUMBER = r"\d+"
-
-        table_number_re = re.compile(TABLE_NUMBER)
-
         new_reqts = []
         self.rows = self.table.split(self.TABLE_ROW)
         self.default_reqt.table_name = None
@@ -420,7 +504,7 @@ class ChecklistParser(object):
                 logging.info("Skipping Row: '%s'" % row[0:50])
                 continue
             if self.default_reqt.table_name is None:
-                result =  table_number_re.match(self.columns[0])
+                result =  TABLE_NUMBER.match(self.columns[0])
                 if not result:
                     logging.info("No Number Row: '%s'" % row[0:50])
                     continue
@@ -430,7 +514,8 @@ class ChecklistParser(object):
                 logging.info("Table: '%s'" % self.default_reqt.table_name)
                 continue
             # Know the table name, now get requirements...
-            self.rev2_part6_add_requirements()
+            for reqt in self.rev2_part6_add_requirements():
+                yield reqt
 
     def parse_table_name(self):
         TABLE_TITLE = "<TableTitle>"
@@ -482,7 +567,7 @@ class ChecklistParser(object):
                 continue
             logging.debug("columns: %s" % self.columns)
             sys.stdout.flush()
-            self.reqt = copy.deepcopy(self.default_reqt)
+            self.reqt = self.default_reqt.copy()
             self.get_checklist_item_and_sentence()
             if self.reqt.sentence is None:
                 logging.debug("No sentence, skipping...")
@@ -490,28 +575,135 @@ class ChecklistParser(object):
             # Skip item duplicated in original 1.3 checklists.
             if self.reqt.table_name == 'Table 6-3. General device message passing logical layer source transaction support list' and self.reqt.chklist_id == '1C':
                 continue
-            self.add_one_requirement_per_reference()
+            for reqt in self.add_one_requirement_per_reference():
+                yield reqt
 
+    # Yields the requirements of one table.
     def parse_table(self, table):
         self.table = table
 
         if self.rev2_part6:
-            self.rev2_part6_parse_table()
-        else:
-            self.parse_table_name()
-            self.parse_usual_table()
-
-    def print_reqts(self):
-        if len(self.reqts) == 0:
-            print "No requirements found"
-
-        print ("%s" % CHECKLIST_HEADER)
-        for reqt in self.reqts:
-            print ("'%s', '%d', '%s', '%s', '%s', '%s', '%s', '%s', '%s', '%s', '%s'"
+            return self.rev2_part6_parse_table()
+        self.parse_table_name()
+        return self.parse_usual_table()
+
+    # Writes reqts, or the parsed requirements if reqts is None, and returns
+    # the number written.  reqts may be a generator such as stream_reqts(),
+    # so the header is written when the first requirement arrives.
+    def write_reqts(self, output, reqts=None):
+        if reqts is None:
+            reqts = self.reqts
+        count = 0
+        for reqt in reqts:
+            if count == 0:
+                output.write("%s\n" % CHECKLIST_HEADER)
+            count += 1
+            output.write("'%s', '%d', '%s', '%s', '%s', '%s', '%s', '%s', '%s', '%s', '%s'\n"
                 % (reqt.sentence, reqt.sentence_num, reqt.reqt_type, reqt.revision, reqt.part,
                    reqt.chapter, reqt.section,
                    reqt.checklist_file, reqt.table_name, reqt.chklist_id,
                    reqt.optional))
+        if count == 0:
+            output.write("No requirements found\n")
+            output.write("%s\n" % CHECKLIST_HEADER)
+        return count
+
+    def print_reqts(self, reqts=None):
+        return self.write_reqts(sys.stdout, reqts)
+
+# One checklist of a manifest file.  Each entry is parsed by its own
+# process, so all arguments are strings, booleans or None.
+class ManifestEntry(object):
+    def __init__(self, checklist_filename, revision, part_number, rev2_part6,
+                 optional_filename, output_filename, corrections_filename):
+        self.checklist_filename = checklist_filename
+        self.revision = revision
+        self.part_number = part_number
+        self.rev2_part6 = rev2_part6
+        self.optional_filename = optional_filename
+        self.output_filename = output_filename
+        self.corrections_filename = corrections_filename
+
+# Returns the ManifestEntry for each line of the manifest file.  File names
+# in the manifest are relative to the current directory.
+def read_manifest(manifest_filename, corrections_filename):
+    with open(manifest_filename) as manifest_file:
+        lines = [line.strip() for line in manifest_file.readlines()]
+
+    if not lines or lines[0] != CHECKLIST_MANIFEST_HEADER:
+        raise ValueError("Manifest file %s has incorrect header."
+                         % manifest_filename)
+    entries = []
+    for line_num, line in enumerate(lines[1:]):
+        if not line:
+            continue
+        tokens = [tok.strip() for tok in line[1:-1].split("', '")]
+        if not len(tokens) == CHECKLIST_MANIFEST_HEADER_TOKEN_COUNT:
+            raise ValueError("File '%s' Line %d: %d tokens expected, got %d: %s"
+                     % (manifest_filename, line_num + 1,
+                        CHECKLIST_MANIFEST_HEADER_TOKEN_COUNT,
+                        len(tokens), line))
+        checklist_filename = tokens[TOK_IDX_CHK_MAN_CHECKLIST]
+        if not os.path.isfile(checklist_filename):
+            raise ValueError("File '%s' Line %d: file '%s' not found"
+                     % (manifest_filename, line_num + 1, checklist_filename))
+        revision = tokens[TOK_IDX_CHK_MAN_REVISION]
+        if not REVISION.match(revision):
+            raise ValueError("File '%s' Line %d: revision '%s' must be of the form X.Y or X.Y.Z"
+                     % (manifest_filename, line_num + 1, revision))
+        part_number = tokens[TOK_IDX_CHK_MAN_PART]
+        if not part_number.isdigit() or not 1 <= int(part_number) <= 12:
+            raise ValueError("File '%s' Line %d: part '%s' must be between 1 and 12, inclusive"
+                     % (manifest_filename, line_num + 1, part_number))
+        rev2_part6 = tokens[TOK_IDX_CHK_MAN_REV2_PART6]
+        if rev2_part6 not in ["True", "False"]:
+            raise ValueError("File '%s' Line %d: Rev2_Part6 must be True or False, got '%s'"
+                     % (manifest_filename, line_num + 1, rev2_part6))
+        optional_filename = tokens[TOK_IDX_CHK_MAN_OPTIONAL]
+        if not optional_filename:
+            optional_filename = None
+        elif not os.path.isfile(optional_filename):
+            raise ValueError("File '%s' Line %d: file '%s' not found"
+                     % (manifest_filename, line_num + 1, optional_filename))
+        output_filename = tokens[TOK_IDX_CHK_MAN_OUTPUT]
+        if not output_filename:
+            raise ValueError("File '%s' Line %d: no output file"
+                     % (manifest_filename, line_num + 1))
+        entries.append(ManifestEntry(checklist_filename, revision,
+                                     part_number, rev2_part6 == "True",
+                                     optional_filename, output_filename,
+                                     corrections_filename))
+    return entries
+
+# Parse one checklist of a manifest and write its output file.  Returns the
+# output file name and number of requirements.  Must be a module level
+# function so that multiprocessing can send it to the worker processes.
+def parse_manifest_entry(entry):
+    parser = ChecklistParser(checklist_filename = entry.checklist_filename,
+                             optional_filename = entry.optional_filename,
+                             revision = entry.revision,
+                             part_number = entry.part_number,
+                             rev2_part6 = entry.rev2_part6,
+                             corrections_filename = entry.corrections_filename,
+                             stream = True)
+    output = open(entry.output_filename, 'w')
+    # merge_checklists.py expects the header on the second line, after the
+    # revision line printed by validate_options() for a single checklist.
+    output.write("options revision_number: %s\n" % entry.revision)
+    count = parser.write_reqts(output, parser.stream_reqts())
+    output.close()
+    return (entry.output_filename, count)
+
+def parse_manifest(entries, jobs):
+    if jobs == 1:
+        return [parse_manifest_entry(entry) for entry in entries]
+    pool = multiprocessing.Pool(min(jobs, len(entries)))
+    try:
+        results = pool.map(parse_manifest_entry, entries, 1)
+    finally:
+        pool.close()
+        pool.join()
+    return results
 
 def create_parser():
     parser = OptionParser()
@@ -540,9 +732,28 @@ def create_parser():
             action = 'store', type = 'string', default=None,
             help = 'File containing table name and item for optional requirements.',
             metavar = 'FILE')
+    parser.add_option('-c', '--corrections',
+            dest = 'corrections',
+            action = 'store', type = 'string',
+            default=REFERENCE_CORRECTIONS_FILE,
+            help = 'File containing the erroneous specification references to skip or correct.  Default is Historic_Checklists/reference_corrections.txt.',
+            metavar = 'FILE')
+    parser.add_option('-m', '--manifest',
+            dest = 'manifest',
+            action = 'store', type = 'string', default=None,
+            help = 'File containing the checklist, revision, part, rev2.2 part 6 flag, optional items file and output file of each checklist to parse.  Replaces -f, -r, -p, -t and -o.',
+            metavar = 'FILE')
+    parser.add_option('-j', '--jobs',
+            dest = 'jobs',
+            action = 'store', type = 'int', default=1,
+            help = 'Number of processes used to parse the checklists of the manifest.',
+            metavar = 'COUNT')
     return parser
 
 def validate_options(options):
+    if options.manifest is not None:
+        return validate_manifest_options(options)
+
     if options.checklist_filename is None:
         print "Must enter file name of checklist."
         sys.exit()
@@ -565,10 +776,7 @@ def validate_options(options):
              sys.exit()
 
     print "options revision_number:", options.revision_number
-    pattern = r"[1-4]\.[0-3]|[1-4]\.[1-3]\.[1-3]"
-    regex = re.compile(pattern)
-    match = regex.match(options.revision_number)
-    if not match:
+    if not REVISION.match(options.revision_number):
         print "Revision must be of the form X.Y or X.Y.Z,"
         print "where X, Y and Z are single digit numbers"
         print "X is 1-4."
@@ -581,6 +789,38 @@ def validate_options(options):
             print "File '%s' not found" % options.optional
             sys.exit()
 
+    if not os.path.isfile(options.corrections):
+        print "File '%s' not found" % options.corrections
+        sys.exit()
+
+    return options
+
+def validate_manifest_options(options):
+    if options.checklist_filename is not None:
+        print "Enter either a checklist file name or a manifest, not both."
+        sys.exit(-1)
+
+    if not os.path.isfile(options.manifest):
+        print "File '%s' not found" % options.manifest
+        sys.exit(-1)
+
+    if options.jobs < 1:
+        print "Number of jobs must be at least 1."
+        sys.exit(-1)
+
+    if not os.path.isfile(options.corrections):
+        print "File '%s' not found" % options.corrections
+        sys.exit(-1)
+
+    try:
+        options.entries = read_manifest(options.manifest, options.corrections)
+    except ValueError as e:
+        print e
+        sys.exit(-1)
+    if not options.entries:
+        print "Manifest '%s' contains no checklists." % options.manifest
+        sys.exit(-1)
+
     return options
 
 def main(argv = None):
@@ -597,12 +837,20 @@ def main(argv = None):
         return -1
 
     options = validate_options(options)
+    if options.manifest is not None:
+        for output_filename, count in parse_manifest(options.entries,
+                                                     options.jobs):
+            print "'%s', '%d requirements'" % (output_filename, count)
+        return 0
+
     parser = ChecklistParser(checklist_filename = options.checklist_filename,
                              optional_filename = options.optional,
                              revision = options.revision_number,
                              part_number = options.part_number,
-                             rev2_part6 = options.rev_2_part_6)
-    parser.print_reqts()
+                             rev2_part6 = options.rev_2_part_6,
+                             corrections_filename = options.corrections,
+                             stream = True)
+    parser.print_reqts(parser.stream_reqts())
 
 if __name__ == '__main__':
     sys.exit(main())
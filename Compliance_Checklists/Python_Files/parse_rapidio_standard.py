@@ -20,8 +20,20 @@ import re
 import sys
 import os
 import logging
-import copy
+import multiprocessing
 from constants import *
+from text_conditioner import TextConditioner
+from conditioning_rules import CONDITIONING_RULES, CONDITIONING_REVISIONS
+from text_conditioner import COMMON_PACK, TRACE_HEADER
+from text_span import TextSpan
+from spec_cache import SpecificationCache
+from part_index import PartIndex
+from sentence_splitter import SentenceSplitter
+from keyword_classifier import KeywordClassifier
+from xml_table import XmlTable, TableRow
+from register_blocks import RegisterBlockMatcher
+from register_block_rules import REGISTER_BLOCK_RULES
+from stage_profile import StageProfile
 
 class RequirementFields(object):
     REVISION = "Revision"
@@ -32,6 +44,103 @@ class RequirementFields(object):
     REQT_NUM = -1
     SENTENCE = "Sentence"
 
+class SpeculationError(Exception):
+    pass
+
+# One row of a register table, written as REGISTERS_HEADER:
+# revision, part, chapter, section, block ID, then the columns of the row.
+#
+# Many register fields appear in several register blocks.  The records for
+# each block share the location and columns tuples, and differ only in
+# block_id.  Extending the columns of a record replaces its tuple, so the
+# other records are unchanged.
+class RegisterField(object):
+    __slots__ = ("location", "block_id", "cols")
+
+    def __init__(self, location, block_id, cols):
+        # (revision, part, chapter, section)
+        self.location = location
+        self.block_id = block_id
+        self.cols = cols
+
+    @property
+    def revision(self):
+        return self.location[0]
+
+    @property
+    def part(self):
+        return self.location[1]
+
+    @property
+    def section(self):
+        return self.location[3]
+
+    # The name of the field, which raises IndexError if the row has only
+    # one column.
+    @property
+    def field(self):
+        return self.cols[1]
+
+    # The same field in another register block.
+    def in_block(self, block_id):
+        return RegisterField(self.location, block_id, self.cols)
+
+    def set_block_id(self, block_id):
+        self.block_id = block_id
+
+    def extend(self, cols):
+        self.cols = self.cols + tuple(cols)
+
+    def __iter__(self):
+        return iter(self.location + (self.block_id,) + self.cols)
+
+    # Records are sent from worker processes, which pickles them.
+    def __getstate__(self):
+        return (self.location, self.block_id, self.cols)
+
+    def __setstate__(self, state):
+        self.location, self.block_id, self.cols = state
+
+# Value of parser state which is carried from one part of the specification
+# to the next, when the part is parsed by a worker process without knowing
+# the state left by the previous parts.  Any use of the value raises
+# SpeculationError, and the part is then parsed again by the main process.
+#
+# Flags have a guessed value.  Testing the flag returns the guess, and records
+# that the part depends on it.  If the guess turns out to be wrong, the part
+# is parsed again by the main process.
+class UnknownState(object):
+    def __init__(self, name, guesses_used, guess=None):
+        self.name = name
+        self.guesses_used = guesses_used
+        self.guess = guess
+
+    def _unknown(self, *args):
+        raise SpeculationError("Part depends on '%s' from a previous part"
+                               % self.name)
+
+    def __nonzero__(self):
+        if self.guess is None:
+            self._unknown()
+        self.guesses_used.add(self.name)
+        return self.guess
+
+    __eq__ = __ne__ = __lt__ = __le__ = __gt__ = __ge__ = _unknown
+    __hash__ = __contains__ = __len__ = __getitem__ = __setitem__ = _unknown
+    __add__ = __radd__ = __str__ = __iter__ = extend = append = find = _unknown
+    set_block_id = _unknown
+
+# Parser used by worker processes.  Set before the workers are forked, so that
+# each worker inherits the parser and the conditioned text without copying.
+_job_parser = None
+
+def _parse_part_job(job):
+    try:
+        return _job_parser.parse_part_speculatively(job)
+    except Exception as e:
+        logging.info("Part %d will be parsed serially: %s" % (job[0], e))
+        return None
+
 class RapidIOStandardParser(object):
     REQTS = {RequirementFields.REVISION:0,
              RequirementFields.PART:1,
@@ -44,19 +153,75 @@ class RapidIOStandardParser(object):
     TYPE_RECOMMENDATION = "Recommendation"
     TYPE_REQUIREMENT = "REQUIREMENT"
 
-    def __init__(self, create_outline, extract_registers, std_xml_file, target_part=None, rev=None, new_secs=None):
+    REQT_KW = ["must", "shall", "Do not depend"]
+    REC_KW = ["should", "recommend"]
+
+    PART_HEADER = "RapidIO Interconnect Specification "
+    REGISTER_SECTION_MARK = "Offset"
+    # Padding added to the start and end of the text of the specification.
+    TEXT_HEAD = " "
+    TEXT_TAIL = "  "
+
+    # The fast engine uses the conditioning rules, the sentence splitter,
+    # the keyword classifier, XmlTable, the register block rules, the cache
+    # and part index, and skips parts and chapters which cannot contain
+    # requirements or registers.  The legacy engine uses the original
+    # conditioning, sentence splitting, keyword matching, register table
+    # cleaning and register block assignment, and parses every part and
+    # chapter.  compare_engines.py checks that the two engines produce
+    # identical output.  Both engines represent the text as TextSpans and
+    # register fields as RegisterFields, so these are not checked.
+    ENGINES = ["fast", "legacy"]
+
+    OUTLINE_ADD_CHAPTER = 0
+    OUTLINE_ADD_SECTION = 1
+    OUTLINE_DROP_EMPTY_CHAPTER = 2
+
+    # Stages timed by --profile, and the counters recorded for each part
+    # after each call of a stage.
+    PROFILE_STAGES = ["_condition_all_text", "_fixup_parts", "_parse_part_jobs",
+                      "parse_chapters", "parse_sections", "split_into_sentences",
+                      "parse_register_table"]
+    PROFILE_COUNTERS = {
+        "parse_sections":[("chapters", lambda parser, args, result: 1),
+                          ("sections",
+                           lambda parser, args, result: len(parser.sections))],
+        "split_into_sentences":[("sentences",
+                        lambda parser, args, result: parser.sentence_count)],
+        "parse_register_table":[("register_tables",
+                                 lambda parser, args, result: 1),
+                                ("register_rows",
+                                 lambda parser, args, result: result)]}
+
+    # Parser state that is carried from one part to the next, and the value
+    # guessed for it by worker processes.  prev_sect is not included, as
+    # requirement numbering restarts in each chapter.
+    PART_STATE = {"found_lp_serial_header":False,
+                  "multiple_part_8_reg_blocks":False,
+                  "old_section":None}
+
+    def __init__(self, create_outline, extract_registers, std_xml_file, target_part=None, rev=None, new_secs=None, cache_dir=None, jobs=1):
         self.create_outline = create_outline
         self.extract_registers = extract_registers
+        # Requirements are extracted when new sections are given, or when
+        # neither an outline nor registers are requested.
+        self.extract_reqts = (new_secs is not None
+                              or not (create_outline or extract_registers))
         self.outline = OrderedDict()
+        self.outline_ops = None
+        self.jobs = jobs
         self.registers = []
         self.input_xml = std_xml_file
         self.target_part = target_part
         self.target_number = None
         self.part_number = None
-        self.new_secs = []
+        self.new_secs = {}
         self.found_lp_serial_header = False
         self.multiple_reg_blocks = False
         self.multiple_part_8_reg_blocks = False
+        self.block_matcher = RegisterBlockMatcher(REGISTER_BLOCK_RULES)
+        self.profile = None
+        self.engine = "fast"
         if rev is None:
             self.revision = "Unknown"
             result = re.search("([0-9]\.[0-9])", self.input_xml)
@@ -66,8 +231,88 @@ class RapidIOStandardParser(object):
             self.revision = rev
         self.prev_sect = None
         self.skip_remaining_part6_chapters = False
+        self.conditioner = TextConditioner(CONDITIONING_RULES,
+                                           self._conditioning_packs())
+        self.splitter = SentenceSplitter()
+        self.set_keywords()
+        self.dump_dir = None
+        self.trace_rules = False
+        self.dump_file = None
+        self.trace_file = None
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = SpecificationCache(cache_dir)
         self.read_new_secs(new_secs)
 
+    # Select the conditioning rule packs for the specification revision.
+    # If the revision is not known, all rules are applied.
+    def _conditioning_packs(self):
+        if self.revision not in CONDITIONING_REVISIONS:
+            logging.warning("No conditioning rules for revision '%s', applying all rules." % self.revision)
+            return None
+        return [COMMON_PACK, self.revision]
+
+    # Select one of ENGINES.  Must be called before set_profile, so that the
+    # stages of the selected engine are timed.
+    def set_engine(self, engine):
+        self.engine = engine
+        if engine == "legacy":
+            self._condition_all_text = self._legacy_condition_all_text
+            self.split_into_sentences = self._legacy_split_into_sentences
+            self.classify_sentence = self._legacy_classify_sentence
+            self.table_rows = self._legacy_table_rows
+            self.append_register = self._legacy_append_register
+            self.cache = None
+
+    def print_rule_usage(self, rule_usage_filepath):
+        if rule_usage_filepath is None:
+            return
+        usage_file = open(rule_usage_filepath, 'w')
+        self.conditioner.print_rule_usage(usage_file)
+        usage_file.close()
+
+    # Time the PROFILE_STAGES of this parser, and record the
+    # PROFILE_COUNTERS for each part.
+    def set_profile(self, profile):
+        self.profile = profile
+        profile.instrument(self, self.PROFILE_STAGES, self.PROFILE_COUNTERS,
+                           lambda: self.part_name)
+
+    def print_profile(self, profile_filepath):
+        if profile_filepath is None:
+            return
+        self.profile.write(profile_filepath,
+                           [("input", self.input_xml),
+                            ("revision", self.revision),
+                            ("target_part", self.target_part),
+                            ("jobs", self.jobs)])
+
+    # Sentences containing a requirement keyword are requirements, and
+    # sentences containing only recommendation keywords are recommendations.
+    # The keywords given are added to REQT_KW and REC_KW.
+    def set_keywords(self, reqt_keywords=None, rec_keywords=None, whole_words=False):
+        self.reqt_keywords = self.REQT_KW + (reqt_keywords or [])
+        self.rec_keywords = self.REC_KW + (rec_keywords or [])
+        self.classifier = KeywordClassifier(
+                [(self.TYPE_REQUIREMENT, self.reqt_keywords),
+                 (self.TYPE_RECOMMENDATION, self.rec_keywords)],
+                whole_words)
+
+    # Returns the type of the sentence, or None if it is neither a
+    # requirement nor a recommendation.
+    def classify_sentence(self, sentence):
+        return self.classifier.classify(sentence)[0]
+
+    # The original substring checks, used by the legacy engine.  Keywords
+    # match anywhere in the sentence.
+    def _legacy_classify_sentence(self, sentence):
+        if any(sub in sentence for sub in self.reqt_keywords):
+            return self.TYPE_REQUIREMENT
+        if any(sub in sentence for sub in self.rec_keywords):
+            return self.TYPE_RECOMMENDATION
+        return None
+
+    # New sections are indexed by part, then chapter, then section name.
     def read_new_secs(self, new_secs):
         if new_secs is None:
             return
@@ -81,7 +326,33 @@ class RapidIOStandardParser(object):
             if not len(toks) == 4:
                 raise("New secs file %s line %d bad format: %s"
                     % (new_secs_file, idx, line))
-            self.new_secs.append(toks[1:])
+            part, chapter, section = toks[1:]
+            self.new_secs.setdefault(part, {}).setdefault(chapter, set()).add(section)
+
+    def _is_new_section(self):
+        return (self.section_name in
+                self.new_secs.get(self.part_name, {}).get(self.chapter_name, ()))
+
+    # Requirements are only found in new sections, and register tables are
+    # only parsed in sections whose name contains REGISTER_SECTION_MARK.
+    # Unless an outline is requested, parts and chapters which contain
+    # neither are skipped before they are split into chapters and sections.
+    def _skip_part(self, part):
+        if self.create_outline or self.engine == "legacy":
+            return False
+        if self.extract_reqts and self.part_name in self.new_secs:
+            return False
+        return not (self.extract_registers
+                    and part.find(self.REGISTER_SECTION_MARK) >= 0)
+
+    def _skip_chapter(self, chapter):
+        if self.create_outline or self.engine == "legacy":
+            return False
+        if (self.extract_reqts
+            and self.chapter_name in self.new_secs.get(self.part_name, {})):
+            return False
+        return not (self.extract_registers
+                    and chapter.find(self.REGISTER_SECTION_MARK) >= 0)
 
     # Sneaky: Remove XML but replace tags with periods.
     # This may result in many empty sentences, but it also results
@@ -96,15 +367,23 @@ class RapidIOStandardParser(object):
     def replace_xml_with_whitespace(text):
         return re.sub(r'\<[^>]+\>', " ", text)
 
-    @staticmethod
-    def remove_number_prefix(s):
-        if s[0] >= '0' and s[0] <= '9':
-            return RapidIOStandardParser.remove_number_prefix(s[1:])
-        return s
+    # Sentence boundaries are found by SentenceSplitter, which produces the
+    # same sentences as _legacy_split_into_sentences.  SentenceSplitter
+    # marks the text with control characters, so text which already
+    # contains them is split by _legacy_split_into_sentences.  Otherwise,
+    # each sentence is rendered from its span as it is parsed.
+    def split_into_sentences(self, text):
+        if SentenceSplitter.has_markers(text):
+            self._legacy_split_into_sentences(text)
+            return
+        spans = self.splitter.spans(text)
+        self.sentence_count = len(spans)
+        self.sentences = self.splitter.sentences(text, spans)
 
-    # split_into_sentences and the constants below were adapted from code at
+    # _legacy_split_into_sentences and the constants below were adapted from
+    # code at
     # https://stackoverflow.com/questions/4576077/python-split-text-on-sentences
-    def split_into_sentences(self, text):
+    def _legacy_split_into_sentences(self, text):
         CAPS = "([A-Z])"
         PREFIXES = "(Mr|St|Mrs|Ms|Dr)[.]"
         SUFFIXES = "(Inc|Ltd|Jr|Sr|Co)"
@@ -140,14 +419,51 @@ class RapidIOStandardParser(object):
         self.sentences = text.split("<stop>")
         self.sentences = self.sentences[:-1]
         self.sentences = [s.strip() for s in self.sentences]
-        self.sentences = [self.remove_number_prefix(s) for s in self.sentences]
+        self.sentences = [s.lstrip("0123456789") for s in self.sentences]
+        self.sentence_count = len(self.sentences)
+
+    # Add the register field to each register block that it belongs to,
+    # as given by the rules in register_block_rules.py.
+    def append_register(self, reg):
+        rule, blk_ids = self.block_matcher.match(reg, self.register_block_id,
+                                                 self)
+        for name, value in rule.sets:
+            setattr(self, name, value)
+        if blk_ids is None:
+            self.registers.append(reg)
+        else:
+            for blk_id in blk_ids:
+                self.registers.append(reg.in_block(blk_id))
+        if rule.field_sets:
+            for name, value in rule.field_sets.get(reg.field, ()):
+                setattr(self, name, value)
+
+    # The rows of the register table in sect.
+    def table_rows(self, sect):
+        return XmlTable(sect).rows()
+
+    # The original cleaning of register table rows, used by the legacy
+    # engine.  Each cell has XML replaced by whitespace twice, and runs of
+    # spaces replaced by a single space.
+    def _legacy_table_rows(self, sect):
+        rows = [r.strip() for r in sect.split("<TR>")]
+        for row in rows:
+            row_start = row.find("<TD>")
+            row_end = row.rfind("</TD>")
+            if row_start == -1 or row_end == -1:
+                yield TableRow(row, None)
+                continue
+            cols = [self.replace_xml_with_whitespace(c).strip()
+                    for c in row[row_start:row_end].split("</TD>")]
+            cols = [self.replace_xml_with_whitespace(col).strip() for col in cols]
+            yield TableRow(row, [re.sub(' +', ' ', col) for col in cols])
 
-    def append_rev2_regs(self, reg):
+    def _legacy_append_rev2_regs(self, reg):
         all_blk_ids = ["0x0001", "0x0002", "0x0003", "0x0009"]
         rm_saer_blk_ids = ["0x0002", "0x0009"]
         ep_blk_ids  = ["0x0001", "0x0002"]
 
-        section = reg[3]
+        section = reg.section
 
         filter_blk_ids = all_blk_ids
         if section.find("Link Maintenance") >= 0:
@@ -159,16 +475,14 @@ class RapidIOStandardParser(object):
         for blk_id in all_blk_ids:
             if blk_id not in filter_blk_ids:
                 continue
-            reg_cpy = copy.deepcopy(reg)
-            reg_cpy[4] = blk_id
-            self.registers.append(reg_cpy)
+            self.registers.append(reg.in_block(blk_id))
 
-    def append_part8_regs(self, reg):
+    def _legacy_append_part8_regs(self, reg):
         all_blk_ids = ["0x0007", "0x0017"]
         non_hs_blk_ids = ["0x0007"]
 
-        section = reg[3]
-        bit_field = reg[6]
+        section = reg.section
+        bit_field = reg.field
 
         tgt_blks = non_hs_blk_ids
         if ((section.find("Block Header") >= 0)
@@ -186,42 +500,25 @@ class RapidIOStandardParser(object):
                 tgt_blks = all_blk_ids
 
         for blk_id in tgt_blks:
-            reg_cpy = copy.deepcopy(reg)
-            reg_cpy[4] = blk_id
-            self.registers.append(reg_cpy)
-
-    # Things get a bit complicated here. 
-    #  
-    # The Rev 2.2 specifications consolidate the Part 6 register definitions
-    # separately from the block definitions, which makes it impossible to
-    # determine which register belongs to what block based on context.
-    #
-    # Even more fun, the Rev 3.2 specifications
-    # define four new register blocks which use the same LP-Serial
-    # registers as in 1.3 and 2.2, but place them at new offsets.
-    # It also defines new registers to add to the new register blocks.
-    #
-    # Parsing this condensed part of the standard results in "UNKNOWN"
-    # block types for all these registers.  The routine below figures
-    # out which registers/bit fields appear in which register blocks,
-    # and adds the registers/bit fields accordingly.
-    #
-    # This clause also takes care of some Part 11 Multicast extensions additions
-    # to existing registers in the Routing Table registers block.  Both were
-    # introduced in revision 3.2.
-    #
-    # And lastly in revision 3.2 and later, an additional "Hot Swap Only"
-    # register block was added to Part 8, via similar unparseable means.
+            self.registers.append(reg.in_block(blk_id))
 
-    def append_register(self, reg):
+    # The original register block assignment, used by the legacy engine to
+    # check the rules in register_block_rules.py.  See that file for why
+    # register fields are copied to several register blocks.
+    #
+    # The original code used an undefined ep_blk_ids for Port Response
+    # Timeout registers with register map offsets.  The end point blocks of
+    # both register maps are used here, as in the register block rules.
+    def _legacy_append_register(self, reg):
         rm1_blk_ids = ["0x0001", "0x0002", "0x0003", "0x0009"]
         rm2_blk_ids = ["0x0011", "0x0012", "0x0013", "0x0019"]
         rm_saer_blk_ids = ["0x0002", "0x0009", "0x0012", "0x0019"]
         ep_blk_ids_22  = ["0x0001", "0x0002"]
         ep_blk_ids_32  = ["0x0011", "0x0012"]
+        ep_blk_ids = ep_blk_ids_22 + ep_blk_ids_32
 
-        part = reg[1]
-        section = reg[3]
+        part = reg.part
+        section = reg.section
 
         if ((part.find("Part 11") >= 0) and
             ((section.find("Processing Elements Features CAR") < 0) and
@@ -232,10 +529,9 @@ class RapidIOStandardParser(object):
             (section.find("Multicast Associate Operation CSR") < 0)) and
             ((self.register_block_id == "UNKNOWN" or
              self.register_block_id == "STD_REG"))):
-            reg[4] = "0x000E"
+            reg.block_id = "0x000E"
             self.registers.append(reg)
             return
-        
 
         if ((section.find("LP-Serial Register Block Header") >= 0) and
            self.found_lp_serial_header):
@@ -248,19 +544,17 @@ class RapidIOStandardParser(object):
              section.find("Port General Control CSR") >= 0) and
            (self.register_block_id == "UNKNOWN" or
             self.register_block_id == "STD_REG") and
-            (reg[0] > "1.3")):
+            (reg.revision > "1.3")):
             blk_ids = rm1_blk_ids
-            if reg[0] > "2.2":
+            if reg.revision > "2.2":
                 blk_ids.extend(rm2_blk_ids)
             if "Host" in reg or "Master Enable" in reg:
                 blk_ids = ep_blk_ids_22
-                if reg[0] > "2.2":
+                if reg.revision > "2.2":
                     blk_ids.extend(ep_blk_ids_32)
             for blk_id in blk_ids:
-                reg_cpy = copy.deepcopy(reg)
-                reg_cpy[4] = blk_id
-                self.registers.append(reg_cpy)
-            if reg[6] == "EF_ID":
+                self.registers.append(reg.in_block(blk_id))
+            if reg.field == "EF_ID":
                 self.found_lp_serial_header = True
             self.multiple_reg_blocks = True
             return
@@ -268,22 +562,20 @@ class RapidIOStandardParser(object):
         if ((section.find("Port Response Timeout Control CSR") >= 0) and
             (self.register_block_id == "UNKNOWN")):
             blk_ids = ep_blk_ids_22
-            if reg[0] > "2.2":
+            if reg.revision > "2.2":
                 blk_ids.extend(ep_blk_ids_32)
 
             for blk_id in blk_ids:
-                reg_cpy = copy.deepcopy(reg)
-                reg_cpy[4] = blk_id
-                self.registers.append(reg_cpy)
+                self.registers.append(reg.in_block(blk_id))
             return
 
-        if ((reg[0] == "2.2") and (self.register_block_id == "UNKNOWN")):
-            self.append_rev2_regs(reg);
+        if ((reg.revision == "2.2") and (self.register_block_id == "UNKNOWN")):
+            self._legacy_append_rev2_regs(reg);
             return
 
-        if ((reg[0] >= "3.2") and (part.find("Part 8") >= 0)):
+        if ((reg.revision >= "3.2") and (part.find("Part 8") >= 0)):
             self.multiple_part_8_reg_blocks = True
-            self.append_part8_regs(reg)
+            self._legacy_append_part8_regs(reg)
             return
 
         self.multiple_part_8_reg_blocks = False
@@ -310,9 +602,7 @@ class RapidIOStandardParser(object):
             for blk_id in blk_ids:
                 if blk_id not in filter_blk_ids:
                     continue
-                reg_cpy = copy.deepcopy(reg)
-                reg_cpy[4] = blk_id
-                self.registers.append(reg_cpy)
+                self.registers.append(reg.in_block(blk_id))
 
     def parse_register_table(self, sect):
         # Register tables are structured as:
@@ -326,31 +616,27 @@ class RapidIOStandardParser(object):
         #
         # Each registers row should be:
         # <revision><part><chapter><section><bits><field><description>
+        #
+        # Returns the number of rows parsed.
 
-        rows = [r.strip() for r in sect.split("<TR>")]
         prev_bit = '32'
-        for row in rows:
-            logging.info("Row: '%s'" % row)
-            row_start = row.find("<TD>")
-            row_end = row.rfind("</TD>")
-            if row_start == -1 or row_end == -1:
+        row_count = 0
+        for row_count, row in enumerate(self.table_rows(sect), 1):
+            logging.info("Row: '%s'" % row.text)
+            if row.cells is None:
                 logging.info("Skipping %s: row %s"
-                             % (self.section_name, row))
+                             % (self.section_name, row.text))
                 continue
-            cols = [self.replace_xml_with_whitespace(c).strip()
-                    for c in row[row_start:row_end].split("</TD>")]
-            logging.info("Cols: '%s'" % cols)
-            cols = [self.replace_xml_with_whitespace(col).strip() for col in cols]
-            logging.info("Cols: '%s'" % cols)
-            if cols[0][0] < '0' or cols[0][0] > '9':
+            logging.info("Cols: '%s'" % row.cells)
+            if row.cells[0][0] < '0' or row.cells[0][0] > '9':
                 logging.info("Skipping %s: row %s"
-                             % (self.section_name, row))
+                             % (self.section_name, row.text))
                 continue
             # The amount of XML varies in each revision of the standard,
             # which causes inconsistent spacing in register descriptions.
-            # The clause below ensures that a single space exists between
-            # each word in a column.
-            cols = [re.sub(' +', ' ', col) for col in cols if not col == '']
+            # table_rows() ensures that a single space exists between each
+            # word in a column.
+            cols = [col for col in row.cells if not col == '']
             # Attempt to find the register block ID for this set of registers.
             if (self.section_name.find("Block Header") >= 0
                 and cols[0].startswith('16')
@@ -365,10 +651,10 @@ class RapidIOStandardParser(object):
                 # identified as part of this register block.
                 if (not self.multiple_reg_blocks
                 and not self.multiple_part_8_reg_blocks):
-                    self.registers[-1][4] = self.register_block_id
-            reg = [self.revision, self.part_name, self.chapter_name,
-                   self.section_name, self.register_block_id]
-            reg.extend(cols)
+                    self.registers[-1].set_block_id(self.register_block_id)
+            reg = RegisterField((self.revision, self.part_name,
+                                 self.chapter_name, self.section_name),
+                                self.register_block_id, tuple(cols))
             # The Revision 3.2 Timestamp registers have some funky formatting,
             # which causes a single table row to be split over multiple XML
             # table rows.  The clause below attempts to fix that...
@@ -377,7 +663,7 @@ class RapidIOStandardParser(object):
                     self.registers[-1].extend(cols)
                     continue
             prev_bit = cols[0]
-            logging.info("Register: '%s'" % reg)
+            logging.info("Register: '%s'" % list(reg))
 
             self.append_register(reg)
 
@@ -385,12 +671,12 @@ class RapidIOStandardParser(object):
             # Terminate parsing of the register table when bit "31" is seen.
             if cols[0].find('31') >= 0:
                 break
+        return row_count
 
     def parse_sections(self):
-        REQT_KW = ["must", "shall", "Do not depend"]
-        REC_KW = ["should", "recommend"]
         SECTION_END = "</"
 
+        reqt_num = 0
         self.section_name = self.chapter_name
 
         for sect_idx, sect in enumerate(self.sections):
@@ -398,7 +684,7 @@ class RapidIOStandardParser(object):
                 logging.debug("6.25 Sect-1: %s" % self.sections[sect_idx-1])
                 logging.debug("6.25 Sect0: %s" % sect)
                 logging.debug("6.25 Sect+1: %s" % self.sections[sect_idx+1])
-                self.sections[sect_idx-1] += ">6." + sect
+                self.sections[sect_idx-1] = self.sections[sect_idx-1].concat(">6.", sect)
                 del self.sections[sect_idx]
                 logging.debug("6.25 NewSect-1: %s" % self.sections[sect_idx -1])
                 break
@@ -408,19 +694,20 @@ class RapidIOStandardParser(object):
                 logging.debug("6.25 Nect-1: %s" % self.sections[sect_idx-1])
                 logging.debug("6.25 Nect0: %s" % sect)
                 logging.debug("6.25 Nect+1: %s" % self.sections[sect_idx+1])
-                self.sections[sect_idx-1] += ">6." + sect
+                self.sections[sect_idx-1] = self.sections[sect_idx-1].concat(">6.", sect)
                 del self.sections[sect_idx]
                 logging.debug("6.25 NewNect-1: %s" % self.sections[sect_idx -1])
                 break
 
         self.register_block_id = "STD_REG"
         for sect in self.sections:
-            if self.skip_remaining_part6_chapters:
+            if self._skip_remaining_sections():
                 break
-            if sect[0] >= '0' and sect[0] <= '9':
-                sect = self.section_number + sect
+            first_char = sect.slice(0, 1).text()
+            if first_char >= '0' and first_char <= '9':
+                sect = sect.prepend(self.section_number)
                 heading_end = sect.find(SECTION_END)
-                temp = sect[:heading_end].strip()
+                temp = sect.slice(0, heading_end).text().strip()
                 temp = re.sub("  +", " ", temp)
                 temp = self.remove_xml(temp).strip()
                 tokens = [tok.strip() for tok in temp.split(' ')]
@@ -467,29 +754,32 @@ class RapidIOStandardParser(object):
                             skip_outline = True
 
                         if self.create_outline and not skip_outline:
-                            self.outline[self.part_name][self.chapter_name].append(self.section_name)
+                            self._update_outline(self.OUTLINE_ADD_SECTION,
+                                    self.part_name, self.chapter_name,
+                                    self.section_name)
                         self.old_section = self.section_name
                     else:
-                        logging.debug("Skipping sect: %s" % sect[0:100])
+                        logging.debug("Skipping sect: %s" % sect.slice(0, 100))
 
             # Extract registers for all specification revisions...
             if self.extract_registers:
-                if "Offset" in self.section_name:
-                    self.parse_register_table(sect)
+                if self.REGISTER_SECTION_MARK in self.section_name:
+                    self.parse_register_table(sect.text())
+
+            if not self.extract_reqts or self.skip_remaining_part6_chapters:
                 continue
 
             # Only parse requirements for new sections...
-            if not [self.part_name, self.chapter_name, self.section_name] in self.new_secs:
+            if not self._is_new_section():
                 continue
 
             if self.prev_sect != self.section_name:
                 reqt_num = 0
                 self.prev_sect = self.section_name
 
-            sect = self.remove_xml(sect)
+            sect = self.remove_xml(sect.text())
             self.split_into_sentences(sect[heading_end + len(SECTION_END):])
             for s in self.sentences:
-                s_type = None
                 # Skip Part 3 programming model informative annex, as it does
                 # not contain any requirements.
                 if s.startswith("Annex A Dev32 Hierarchical Programming Model"):
@@ -499,10 +789,7 @@ class RapidIOStandardParser(object):
                     logging.critical("Skipping part 6 chapters!")
                     self.skip_remaining_part6_chapters = True
                     break
-                if any(sub in s for sub in REQT_KW):
-                    s_type = self.TYPE_REQUIREMENT
-                elif any(sub in s for sub in REC_KW):
-                    s_type = self.TYPE_RECOMMENDATION
+                s_type = self.classify_sentence(s)
                 if s_type is None:
                     continue
                 reqt_num += 1
@@ -523,13 +810,13 @@ class RapidIOStandardParser(object):
         self.section_number = None
         self.section_prefix = None
         for chapter in self.chapters:
-            if self.skip_remaining_part6_chapters:
+            if self._skip_remaining_sections():
                break
-            chapter = "Chapter " + chapter
+            chapter = chapter.prepend("Chapter ")
             end_idx = chapter.find(CH_END)
-            new_chapter_name = chapter[:end_idx].strip()
+            new_chapter_name = chapter.slice(0, end_idx).text().strip()
             end_idx += len(CH_END)
-            end_idx += chapter[end_idx:].find('>') + len('>')
+            end_idx += chapter.slice(end_idx).find('>') + len('>')
             chapter_number_found = re.search(r"Chapter ([0-9]+) ", new_chapter_name)
             if chapter_number_found:
                 self.chapter_number = chapter_number_found.group(1).strip()
@@ -538,60 +825,241 @@ class RapidIOStandardParser(object):
                 logging.info("chapter_name: '" + self.chapter_name + "'")
                 logging.info("part_name: '" + self.part_name + "'")
                 if self.create_outline and not self.part_name == '':
-                   self.outline[self.part_name].update({self.chapter_name:[]})
+                   self._update_outline(self.OUTLINE_ADD_CHAPTER,
+                                        self.part_name, self.chapter_name)
             if self.chapter_number is None or self.part_name == "":
-                logging.info("No chapter number/part name found yet, skipping " + chapter[0:50])
+                logging.info("No chapter number/part name found yet, skipping " + chapter.slice(0, 50).text())
+                continue
+            if self._skip_chapter(chapter):
+                logging.debug("No new or register sections, skipping "
+                              + self.chapter_name)
                 continue
             self.section_number = self.chapter_number + "."
             self.section_prefix = r">" + self.chapter_number + r"."
-            self.sections = chapter[end_idx:].split(self.section_prefix)
+            self.sections = chapter.slice(end_idx).split(self.section_prefix)
             logging.debug("Parse Sections: %s %s %d" % (self.section_number, self.section_prefix, len(self.sections)))
             self.multiple_reg_blocks = False
             self.parse_sections()
             if self.create_outline:
-                if len(self.outline[self.part_name][self.chapter_name]) == 0:
-                    del self.outline[self.part_name][self.chapter_name]
+                self._update_outline(self.OUTLINE_DROP_EMPTY_CHAPTER,
+                                     self.part_name, self.chapter_name)
+
+    # All changes to the outline of a part are made here, so that the
+    # changes made by a worker process can be recorded and then replayed
+    # in document order by the main process.
+    def _update_outline(self, op, part_name, chapter_name, section_name=None):
+        if self.outline_ops is not None:
+            self.outline_ops.append((op, part_name, chapter_name, section_name))
+        if op == self.OUTLINE_ADD_CHAPTER:
+            self.outline[part_name].update({chapter_name:[]})
+        elif op == self.OUTLINE_ADD_SECTION:
+            self.outline[part_name][chapter_name].append(section_name)
+        elif len(self.outline[part_name][chapter_name]) == 0:
+            del self.outline[part_name][chapter_name]
+
+    def _parse_part(self, part_idx, part_name_len):
+        self.skip_remaining_part6_chapters = False
+        part = self.parts[part_idx].prepend(self.PART_HEADER)
+        self.chapters = part.slice(part_name_len).split('>Chapter ')
+        self.parse_chapters()
+
+    # Parse one part in a worker process, starting with unknown values for
+    # the state left by previous parts.  Returns the requirements, registers
+    # and outline changes for the part, the state left by the part, and the
+    # profile of the part when profiling.
+    def parse_part_speculatively(self, job):
+        part_idx, part_name, part_name_len = job
+        self.part_name = part_name
+        self.reqts = []
+        self.outline = OrderedDict({part_name:OrderedDict()})
+        self.outline_ops = []
+        self.prev_sect = None
+        guesses_used = set()
+        for name in self.PART_STATE:
+            setattr(self, name, UnknownState(name, guesses_used,
+                                             self.PART_STATE[name]))
+        self.registers = [UnknownState("registers", guesses_used)]
+        if self.profile is not None:
+            self.profile.reset()
+        self._parse_part(part_idx, part_name_len)
+        state = dict([(name, getattr(self, name)) for name in self.PART_STATE
+                      if not isinstance(getattr(self, name), UnknownState)])
+        profile_data = None
+        if self.profile is not None:
+            profile_data = self.profile.data()
+        return (self.reqts, self.registers[1:], self.outline_ops, state,
+                guesses_used, profile_data)
+
+    # Parse the parts using a pool of worker processes, then merge the
+    # results in document order.  Parts which depend on the state left by
+    # previous parts are parsed again in document order, so the results
+    # are identical to parsing all parts serially.
+    def _parse_part_jobs(self, part_jobs):
+        global _job_parser
+        _job_parser = self
+        pool = multiprocessing.Pool(self.jobs)
+        try:
+            results = pool.map(_parse_part_job, part_jobs, 1)
+        finally:
+            pool.close()
+            pool.join()
+            _job_parser = None
+
+        for job, result in zip(part_jobs, results):
+            part_idx, self.part_name, part_name_len = job
+            if result is not None:
+                for name in result[4]:
+                    if getattr(self, name) != self.PART_STATE[name]:
+                        logging.info("Part %d will be parsed serially: "
+                                     "'%s' guessed incorrectly"
+                                     % (part_idx, name))
+                        result = None
+                        break
+            if result is None:
+                self._parse_part(part_idx, part_name_len)
+                continue
+            (reqts, registers, outline_ops, state, guesses_used,
+             profile_data) = result
+            if profile_data is not None:
+                self.profile.merge(profile_data)
+            self.reqts.extend(reqts)
+            self.registers.extend(registers)
+            for op in outline_ops:
+                self._update_outline(*op)
+            for name in state:
+                setattr(self, name, state[name])
+
+    # The requirements parsing stops at the Part 6 annexes, which do not
+    # contain requirements.  The outline and registers still need the
+    # remaining sections, so only stop when requirements are all that is
+    # being extracted.
+    def _skip_remaining_sections(self):
+        return (self.skip_remaining_part6_chapters
+                and not (self.create_outline or self.extract_registers))
+
+    # Each of the print routines below writes to the named file, or to
+    # standard output if no file is named.  This allows the outline,
+    # requirements and registers to be written from a single parse of the
+    # specification.
+    @staticmethod
+    def _open_output(output_filepath):
+        if output_filepath is None:
+            return sys.stdout
+        return open(output_filepath, 'w')
+
+    @staticmethod
+    def _close_output(output):
+        if output is not sys.stdout:
+            output.close()
 
-    def print_registers(self):
-        if (not self.extract_registers) or self.create_outline:
+    def print_registers(self, registers_filepath=None):
+        if not self.extract_registers:
             return
+        output = self._open_output(registers_filepath)
         if len(self.registers) == 0:
-            print ("No registers found for " + self.input_xml)
+            output.write("No registers found for " + self.input_xml + "\n")
+            self._close_output(output)
             return 0
 
-        print(REGISTERS_HEADER)
+        output.write(REGISTERS_HEADER + "\n")
         for reg in self.registers:
-            print ("'%s'" % "', '".join(reg))
+            output.write("'%s'\n" % "', '".join(reg))
+        self._close_output(output)
 
-    def print_reqts(self):
-        if self.create_outline or self.extract_registers:
+    def print_reqts(self, reqts_filepath=None):
+        if not self.extract_reqts:
             return
+        output = self._open_output(reqts_filepath)
         if len(self.reqts) == 0:
-            print ("No requirements found for " + self.input_xml)
+            output.write("No requirements found for " + self.input_xml + "\n")
+            self._close_output(output)
             return 0
 
         header_items = [item.strip() for item in REQUIREMENTS_HEADER.split(",")]
-        print("'%s'" % "', '".join(header_items))
+        output.write("'%s'\n" % "', '".join(header_items))
         for reqt in self.reqts:
-            print ("'%s'" % "', '".join(reqt))
+            output.write("'%s'\n" % "', '".join(reqt))
+        self._close_output(output)
 
-    def print_outline(self):
-        if (not self.create_outline) or self.extract_registers:
+    # Write the keywords that determined the type of each requirement, as
+    # "keyword[start:end]" where start and end are offsets in the sentence.
+    def print_keywords(self, keywords_filepath=None):
+        if keywords_filepath is None or not self.extract_reqts:
             return
+        output = self._open_output(keywords_filepath)
+        header_items = [item.strip() for item in KEYWORDS_HEADER.split(",")]
+        output.write("'%s'\n" % "', '".join(header_items))
+        sentence_idx = self.REQTS[RequirementFields.SENTENCE]
+        for reqt in self.reqts:
+            s_type, found = self.classifier.classify(reqt[sentence_idx])
+            keywords = " ".join(["%s[%d:%d]" % (keyword, start, end)
+                                 for k_type, keyword, start, end in found])
+            output.write("'%s'\n" % "', '".join(reqt[:sentence_idx]
+                                                 + [keywords]))
+        self._close_output(output)
+
+    def print_outline(self, outline_filepath=None):
+        if not self.create_outline:
+            return
+        output = self._open_output(outline_filepath)
         if len(self.outline) == 0:
-            print ("No outline available")
+            output.write("No outline available\n")
+            self._close_output(output)
             return 0
 
         header_items = [item.strip() for item in OUTLINE_HEADER.split(",")]
-        print("'%s'" % "', '".join(header_items))
+        output.write("'%s'\n" % "', '".join(header_items))
         for part in self.outline:
             for chapter in self.outline[part]:
                 for section in self.outline[part][chapter]:
-                    print("'" + self.revision + "', '" +  part + "', '" + chapter + "', '" + section + "'")
+                    output.write("'" + self.revision + "', '" +  part + "', '" + chapter + "', '" + section + "'\n")
+        self._close_output(output)
 
     # Perform character substitutions to simplify parsing of text and correct
     # some text conversion errors...
+    #
+    # The substitutions are defined in conditioning_rules.py.
     def _condition_all_text(self):
+        self.all_text = self._condition(self.all_text)
+
+    # Condition text, writing the result to the conditioned text dump and
+    # the matches of each rule to the rule trace, if they were requested.
+    # Text is written as it is conditioned, so a specification conditioned
+    # in chunks is written one chunk at a time.
+    def _condition(self, text):
+        text = self.conditioner.condition(text, self.trace_file)
+        if self.dump_file is not None:
+            self.dump_file.write(text)
+        return text
+
+    # The cache and part index are not used while tracing or counting rule
+    # matches, as conditioning must actually be done.
+    def _conditioning_observed(self):
+        return self.conditioner.count_matches or self.trace_file is not None
+
+    def _open_dumps(self):
+        if self.dump_dir is None:
+            return
+        if not os.path.isdir(self.dump_dir):
+            os.makedirs(self.dump_dir)
+        dump_path = os.path.join(self.dump_dir,
+                                 os.path.basename(self.input_xml))
+        self.dump_file = open(dump_path + ".output", "w")
+        if self.trace_rules:
+            self.trace_file = open(dump_path + ".trace", "w")
+            self.trace_file.write(TRACE_HEADER + "\n")
+
+    def _close_dumps(self):
+        for dump in (self.dump_file, self.trace_file):
+            if dump is not None:
+                dump.close()
+        self.dump_file = None
+        self.trace_file = None
+
+    # Original sequence of substitutions performed by _condition_all_text.
+    # Retained as the reference implementation for benchmark_conditioning.py,
+    # which checks that the conditioning rules produce identical output.
+    def _legacy_condition_all_text(self):
         # Remove carriage returns, newlines, and tabs.
         self.all_text = re.sub('\n', ' ', self.all_text)
         self.all_text = re.sub('\r', ' ', self.all_text)
@@ -914,59 +1382,156 @@ class RapidIOStandardParser(object):
 
     # Work around embedded specification part references in
     # Version 4.0, Part 10 Chapter 5
+    # Parts which do not contain a chapter heading are appended to the
+    # previous part.  Each part is recorded as a list of (start, end)
+    # segments of all_text.
     def _fixup_parts(self):
-        new_parts = []
+        chapter_number = re.compile(r"Chapter ([0-9]*) ")
+        self.part_segments = []
         for i, part in enumerate(self.parts):
-            logging.info("Part %d:'%s'" % (i, part[0:50]))
-            chapter_number_found = re.search(r"Chapter ([0-9]*) ", part)
+            logging.info("Part %d:'%s'" % (i, part.slice(0, 50)))
+            chapter_number_found = chapter_number.search(part.buffer,
+                                                         part.start, part.end)
             if chapter_number_found:
                 logging.info("    Added")
-                new_parts.append(part)
+                self.part_segments.append([(part.start, part.end)])
             else:
-                if len(new_parts) > 0:
-                   new_parts[-1] += part
+                if len(self.part_segments) > 0:
+                   self.part_segments[-1].append((part.start, part.end))
+                   first_start = self.part_segments[-1][0][0]
                    logging.info("    Appended to part %d:'%s'"
-                                      % (i-1, new_parts[-1][0:50]))
+                                      % (i-1, self.all_text[first_start:first_start + 50]))
                 else:
                    logging.info("    Dropped.")
-        self.parts = new_parts
+
+    # Parts consisting of a single segment are spans of all_text.  Parts
+    # with multiple segments must be copied.
+    def _parts_from_segments(self):
+        self.parts = []
+        for segments in self.part_segments:
+            if len(segments) == 1:
+                start, end = segments[0]
+                self.parts.append(TextSpan(self.all_text, start, end))
+                continue
+            self.parts.append(TextSpan("".join([self.all_text[start:end]
+                                                for start, end in segments])))
+
+    # Condition the text of the specification and split it into parts,
+    # or load the result from the cache.  The cache is not used when
+    # conditioning rule matches are being counted.
+    def _condition_and_split_parts(self, part_header):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = SpecificationCache.key(self.all_text,
+                                        self.conditioner.rules_version())
+            if not self._conditioning_observed():
+                cached = self.cache.load(cache_key)
+                if cached is not None:
+                    self.all_text, self.part_segments = cached
+                    if self.dump_file is not None:
+                        self.dump_file.write(self.all_text)
+                    return
+
+        self._condition_all_text()
+        self.parts = TextSpan(self.all_text).split( ">" + part_header)
+        self._fixup_parts()
+        if cache_key is not None:
+            self.cache.save(cache_key, self.all_text, self.part_segments)
+
+    def _is_target_part(self, part_number, part_annex):
+        return (int(part_number) == int(self.target_number)
+                and self.target_is_annex == part_annex)
+
+    # Condition only the chunks of the XML file that contain the target
+    # part, as recorded in the part index, then parse the target part.
+    def _parse_indexed_parts(self, xml_text, cuts, parts):
+        targets = [part for part in parts if self._is_target_part(part[1], part[2])]
+        if not targets:
+            return
+        starts = [start for part in targets for start, end in part[4]]
+        ends = [end for part in targets for start, end in part[4]]
+        first, last = PartIndex.cut_range(cuts,
+                        max(0, min(starts) - len(">" + self.PART_HEADER)),
+                        max(ends))
+        self.all_text = "".join([self._condition(
+                            PartIndex.chunk_text(xml_text, cuts[i][0],
+                                    cuts[i + 1][0], self.TEXT_HEAD, self.TEXT_TAIL))
+                                 for i in range(first, last)])
+        text_base = cuts[first][1]
+        self.part_segments = [[(start - text_base, end - text_base)
+                               for start, end in part[4]]
+                              for part in targets]
+        self._parts_from_segments()
+
+        part_jobs = []
+        for part_idx, part in enumerate(targets):
+            self.part_name, self.part_number, self.part_annex, name_len = part[:4]
+            if self.create_outline and self.part_name not in self.outline:
+                self.outline.update({self.part_name:OrderedDict()})
+            if self.jobs > 1:
+                part_jobs.append((part_idx, self.part_name, name_len))
+                continue
+            self._parse_part(part_idx, name_len)
+        if len(part_jobs):
+            self._parse_part_jobs(part_jobs)
 
     def parse_parts(self):
-        part_header = "RapidIO Interconnect Specification "
         annex = "Annex"
         self.reqts = []
 
-        target_number = None
-        target_is_annex = None
-
-        found_number = re.search(" ([0-9]*)", self.target_part)
-        if found_number:
-            self.target_number = int(found_number.group(1))
-            self.target_is_annex = self.part_num.find(annex) >= 0
-            logging.info("target_number " + self.target_number)
-            logging.info("target_is_annex " + self.target_is_annex)
+        self.target_number = None
+        self.target_is_annex = None
+        if self.target_part is not None:
+            found_number = re.search(" ([0-9]+)", self.target_part)
+            if found_number:
+                self.target_number = int(found_number.group(1))
+                self.target_is_annex = self.target_part.find(annex) >= 0
+                logging.info("target_number %d" % self.target_number)
+                logging.info("target_is_annex %s" % self.target_is_annex)
 
         spec_file = open(self.input_xml)
-        self.all_text = spec_file.read()
+        xml_text = spec_file.read()
         spec_file.close()
 
-        self.all_text = " " + self.all_text + "  "
-        self._condition_all_text()
-        output_xml = self.input_xml + ".output"
-
-        output = open(output_xml, "w")
-        output.write(self.all_text)
-        output.close()
-
-        self.parts = self.all_text.split( ">" + part_header)
-        self._fixup_parts()
+        self.all_text = self.TEXT_HEAD + xml_text + self.TEXT_TAIL
+
+        self._open_dumps()
+        try:
+            self._parse_all_parts(xml_text)
+        finally:
+            self._close_dumps()
+
+    def _parse_all_parts(self, xml_text):
+        part_header = self.PART_HEADER
+
+        # When parsing one part, the part index avoids conditioning the
+        # whole specification.  The index is kept in the cache directory,
+        # is built by the first run that parses one part, and is not used
+        # when observing conditioning.
+        part_index = None
+        indexed_parts = []
+        if (self.target_number is not None and self.cache is not None
+                and not self._conditioning_observed()):
+            part_index = PartIndex(self.input_xml, self.cache.cache_dir)
+            index_key = SpecificationCache.key(self.all_text,
+                                        self.conditioner.rules_version())
+            index_entry = part_index.load(index_key)
+            if index_entry is not None:
+                self._parse_indexed_parts(xml_text, *index_entry)
+                return
+
+        self._condition_and_split_parts(part_header)
+
+        # The parts, chapters and sections of the specification are spans
+        # of all_text.  Text is only copied when it is needed.
+        self._parts_from_segments()
         self.part_name = ''
         self.part_number = ''
         self.part_annex = False
-        for part in self.parts:
-            self.skip_remaining_part6_chapters = False
-            part = part_header + part
-            new_part_name = part[:part.find('<')].strip()
+        part_jobs = []
+        for part_idx, part in enumerate(self.parts):
+            part = part.prepend(part_header)
+            new_part_name = part.slice(0, part.find('<')).text().strip()
             # Jiggery pokery below is required to weed out references to
             # specification parts found within other parts of the specification.
             # This is dependent on all of these references always being backward
@@ -981,7 +1546,7 @@ class RapidIOStandardParser(object):
                     (new_part_name, new_part_number, new_part_annex))
                 # Always skip Part 4, Parallel RapidIO
                 if new_part_number == 4 and not new_part_annex:
-                    logging.info("Skipping part 4: %s" % part[0:50])
+                    logging.info("Skipping part 4: %s" % part.slice(0, 50))
                     continue
                 # Always skip Annex 1 and 2
                 if new_part_number < 3 and new_part_annex:
@@ -1003,13 +1568,31 @@ class RapidIOStandardParser(object):
             if self.target_number is not None:
                 if self.part_number is None or self.part_number == '':
                     continue
-                sys.stdout.flush()
-                if ((not int(self.part_number) == int(self.target_number))
-                    or not (self.target_is_annex == self.part_annex)):
-                    del self.outline[self.part_name]
+                indexed_parts.append((self.part_name, self.part_number,
+                                      self.part_annex, len(new_part_name),
+                                      self.part_segments[part_idx]))
+                if not self._is_target_part(self.part_number, self.part_annex):
+                    self.outline.pop(self.part_name, None)
                     continue
-            self.chapters = part[len(new_part_name):].split('>Chapter ')
-            self.parse_chapters()
+            if self._skip_part(self.parts[part_idx]):
+                logging.debug("No new or register sections, skipping "
+                              + self.part_name)
+                continue
+            if self.jobs > 1:
+                part_jobs.append((part_idx, self.part_name, len(new_part_name)))
+                continue
+            self._parse_part(part_idx, len(new_part_name))
+
+        if len(part_jobs):
+            self._parse_part_jobs(part_jobs)
+
+        if part_index is not None:
+            cuts = PartIndex.find_cuts(self.conditioner, xml_text, self.all_text,
+                                       self.TEXT_HEAD, self.TEXT_TAIL)
+            if cuts is None:
+                logging.warning("Could not index the parts of '%s'" % self.input_xml)
+            else:
+                part_index.save(index_key, cuts, indexed_parts)
 
 def create_parser():
     parser = OptionParser()
@@ -1043,6 +1626,79 @@ def create_parser():
             action = 'store_true', default=False,
             help = 'Parse register tables and output register file.',
             metavar = 'FLAG')
+    parser.add_option('-O', '--outline_file',
+            dest = 'outline_filepath',
+            action = 'store', type = 'string', default=None,
+            help = 'Create an outline of the standard, and write it to this file.',
+            metavar = 'FILE')
+    parser.add_option('-R', '--reqts_file',
+            dest = 'reqts_filepath',
+            action = 'store', type = 'string', default=None,
+            help = 'Write the requirements for the new sections to this file.',
+            metavar = 'FILE')
+    parser.add_option('-E', '--registers_file',
+            dest = 'registers_filepath',
+            action = 'store', type = 'string', default=None,
+            help = 'Parse register tables and write the registers to this file.',
+            metavar = 'FILE')
+    parser.add_option('-k', '--reqt_keyword',
+            dest = 'reqt_keywords',
+            action = 'append', type = 'string', default = [],
+            help = 'Sentences containing this keyword are requirements, in addition to "%s".  May be repeated.' % '", "'.join(RapidIOStandardParser.REQT_KW),
+            metavar = 'KEYWORD')
+    parser.add_option('-m', '--rec_keyword',
+            dest = 'rec_keywords',
+            action = 'append', type = 'string', default = [],
+            help = 'Sentences containing this keyword are recommendations, in addition to "%s".  May be repeated.' % '", "'.join(RapidIOStandardParser.REC_KW),
+            metavar = 'KEYWORD')
+    parser.add_option('-w', '--whole_words',
+            dest = 'whole_words',
+            action = 'store_true', default=False,
+            help = 'Only match requirement and recommendation keywords that are whole words.',
+            metavar = 'FLAG')
+    parser.add_option('-K', '--keywords_file',
+            dest = 'keywords_filepath',
+            action = 'store', type = 'string', default=None,
+            help = 'Write the keywords found in each requirement to this file.',
+            metavar = 'FILE')
+    parser.add_option('-u', '--rule_usage',
+            dest = 'rule_usage_filepath',
+            action = 'store', type = 'string', default=None,
+            help = 'Write the number of matches of each text conditioning rule to this file.',
+            metavar = 'FILE')
+    parser.add_option('-j', '--jobs',
+            dest = 'jobs',
+            action = 'store', type = 'int', default=1,
+            help = 'Number of processes used to parse the parts of the specification.  Default is 1.',
+            metavar = 'N')
+    parser.add_option('-d', '--dump_conditioned',
+            dest = 'dump_dir',
+            action = 'store', type = 'string', default=None,
+            help = 'Write the conditioned text of the specification to <xml file name>.output in this directory.',
+            metavar = 'DIR')
+    parser.add_option('-t', '--trace_rules',
+            dest = 'trace_rules',
+            action = 'store_true', default=False,
+            help = 'Also write every match of every conditioning rule to <xml file name>.trace in the dump directory.',
+            metavar = 'FLAG')
+    parser.add_option('-P', '--profile',
+            dest = 'profile_filepath',
+            action = 'store', type = 'string',
+            help = 'Write the time taken by each stage of parsing, and the '
+                   'sections, sentences and register rows parsed in each '
+                   'part, to this JSON file.',
+            metavar = 'FILE')
+    parser.add_option('-g', '--engine',
+            dest = 'engine',
+            action = 'store', type = 'choice', default = 'fast',
+            choices = RapidIOStandardParser.ENGINES,
+            help = 'Parsing engine, fast or legacy.  The legacy engine uses the original text conditioning, sentence splitting, keyword matching, register table cleaning and register block assignment, and does not use the cache or the part index.  Default is fast.',
+            metavar = 'ENGINE')
+    parser.add_option('-c', '--cache_dir',
+            dest = 'cache_dir',
+            action = 'store', type = 'string', default=None,
+            help = 'Directory used to cache the conditioned text of each specification.',
+            metavar = 'DIR')
     return parser
 
 def validate_options(options):
@@ -1062,10 +1718,48 @@ def validate_options(options):
             print ("New sections File '" + options.new_secs_filepath +"' does not exist.")
             sys.exit()
 
-    if options.create_outline and options.extract_registers:
-        print ("Cannot create outline and extract registers simultaneously.")
+    if options.cache_dir is not None:
+        if os.path.exists(options.cache_dir) and not os.path.isdir(options.cache_dir):
+            print ("Cache directory '" + options.cache_dir + "' is not a directory.")
+            sys.exit()
+
+    if options.dump_dir is not None:
+        if os.path.exists(options.dump_dir) and not os.path.isdir(options.dump_dir):
+            print ("Dump directory '" + options.dump_dir + "' is not a directory.")
+            sys.exit()
+
+    if options.trace_rules and options.dump_dir is None:
+        print ("Must enter dump directory to trace conditioning rules.")
         sys.exit()
 
+    if options.engine == "legacy":
+        if options.rule_usage_filepath is not None or options.dump_dir is not None:
+            print ("The legacy engine does not use the conditioning rules.")
+            sys.exit()
+        if options.whole_words:
+            print ("The legacy engine does not match whole words.")
+            sys.exit()
+
+    if options.jobs < 1:
+        print ("Number of jobs must be at least 1.")
+        sys.exit()
+
+    if options.outline_filepath is not None:
+        options.create_outline = True
+
+    if options.registers_filepath is not None:
+        options.extract_registers = True
+
+    if options.reqts_filepath is not None:
+        if options.new_secs_filepath is None:
+            print ("Must enter new sections file to write requirements file.")
+            sys.exit()
+
+    if options.keywords_filepath is not None:
+        if options.new_secs_filepath is None:
+            print ("Must enter new sections file to write keywords file.")
+            sys.exit()
+
     return options
 
 def main(argv = None):
@@ -1083,16 +1777,34 @@ def main(argv = None):
 
     options = validate_options(options)
 
+    profile = None
+    if options.profile_filepath is not None:
+        profile = StageProfile()
+
     std_parser = RapidIOStandardParser(options.create_outline,
                                        options.extract_registers,
                                        options.filename_of_standard,
                                        options.target_part,
                                        options.override_revision,
-                                       options.new_secs_filepath)
+                                       options.new_secs_filepath,
+                                       options.cache_dir,
+                                       options.jobs)
+    std_parser.set_keywords(options.reqt_keywords, options.rec_keywords,
+                            options.whole_words)
+    if options.rule_usage_filepath is not None:
+        std_parser.conditioner.count_matches = True
+    std_parser.dump_dir = options.dump_dir
+    std_parser.trace_rules = options.trace_rules
+    std_parser.set_engine(options.engine)
+    if profile is not None:
+        std_parser.set_profile(profile)
     std_parser.parse_parts()
-    std_parser.print_reqts()
-    std_parser.print_registers()
-    std_parser.print_outline()
+    std_parser.print_reqts(options.reqts_filepath)
+    std_parser.print_registers(options.registers_filepath)
+    std_parser.print_outline(options.outline_filepath)
+    std_parser.print_keywords(options.keywords_filepath)
+    std_parser.print_rule_usage(options.rule_usage_filepath)
+    std_parser.print_profile(options.profile_filepath)
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Index of the parts of a RapidIO specification XML file.
+
+    Parts are found by splitting the conditioned text of the whole
+    specification, so parsing one part ("parse_rapidio_standard.py -p")
+    would otherwise condition the whole file.  The part index is a file,
+    <xml file name>.parts, kept in the cache directory, which records:
+    - Cuts: (XML offset, conditioned text offset) pairs which divide the
+      XML file into chunks.  Conditioning each chunk separately produces
+      exactly the conditioned text of the whole file.
+    - Parts: the name, number and annex flag of each part, the length of
+      its name, and the conditioned text segments of the part.
+
+    To parse one part, only the chunks that contain the segments of that
+    part are read from the XML file and conditioned.
+
+    Cuts are placed between XML elements, roughly every CHUNK_SIZE bytes.
+    A few conditioning rules match text on both sides of an element
+    boundary, so every chunk is checked against the conditioned text of
+    the whole file, and cuts which change the conditioned text are dropped.
+
+    Each index entry is keyed by the same digest as SpecificationCache
+    entries, so stale entries are never used.  The sidecar holds entries
+    for up to MAX_ENTRIES keys, as each specification revision applies
+    different conditioning rules.
+
+    The index only speeds up parsing, so failing to write it is logged as a
+    warning and never stops a run.
+"""
+
+import bisect
+import logging
+import marshal
+import os
+import re
+
+class PartIndex(object):
+    # Increment when the content of an index entry changes.
+    INDEX_VERSION = 1
+    INDEX_SUFFIX = ".parts"
+    MAX_ENTRIES = 8
+    CHUNK_SIZE = 32 * 1024
+    # Maximum number of candidate cuts merged into one chunk before giving
+    # up on building the index.
+    MAX_MERGES = 64
+
+    CUT_CANDIDATE = re.compile(r"\n(?=<)")
+
+    def __init__(self, xml_filepath, index_dir):
+        self.xml_filepath = xml_filepath
+        self.index_path = os.path.join(index_dir,
+                    os.path.basename(xml_filepath) + self.INDEX_SUFFIX)
+
+    def _load_entries(self):
+        if not os.path.isfile(self.index_path):
+            return {}
+        try:
+            index_file = open(self.index_path, 'rb')
+            version, entries = marshal.loads(index_file.read())
+            index_file.close()
+        except (IOError, EOFError, ValueError, TypeError) as e:
+            logging.warning("Ignoring unreadable part index '%s': %s"
+                            % (self.index_path, e))
+            return {}
+        if version != self.INDEX_VERSION:
+            return {}
+        return entries
+
+    # Return the cuts and parts saved for key, or None if there is no
+    # usable entry.
+    def load(self, key):
+        entry = self._load_entries().get(key)
+        if entry is None:
+            return None
+        logging.info("Loaded part index '%s'" % self.index_path)
+        cuts, parts, serial = entry
+        return cuts, parts
+
+    # The least recently saved entries are dropped to make room for a new
+    # entry.  The index is written to a temporary file and renamed, so that
+    # an interrupted run never leaves a partial index.
+    def save(self, key, cuts, parts):
+        entries = self._load_entries()
+        entries.pop(key, None)
+        while len(entries) >= self.MAX_ENTRIES:
+            del entries[min(entries, key=lambda k: entries[k][2])]
+        serial = max([e[2] for e in entries.values()] + [0]) + 1
+        entries[key] = (cuts, parts, serial)
+        temp_path = self.index_path + ".tmp"
+        try:
+            index_dir = os.path.dirname(self.index_path)
+            if not os.path.isdir(index_dir):
+                os.makedirs(index_dir)
+            index_file = open(temp_path, 'wb')
+            try:
+                index_file.write(marshal.dumps((self.INDEX_VERSION, entries)))
+            finally:
+                index_file.close()
+            os.rename(temp_path, self.index_path)
+        except (IOError, OSError) as e:
+            logging.warning("Could not save part index '%s': %s"
+                            % (self.index_path, e))
+            if os.path.isfile(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return
+        logging.info("Saved part index '%s'" % self.index_path)
+
+    # The text of the chunk from XML offset start to end, including the
+    # padding added to the start and end of the whole file.
+    @staticmethod
+    def chunk_text(xml_text, start, end, head, tail):
+        text = xml_text[start:end]
+        if start == 0:
+            text = head + text
+        if end == len(xml_text):
+            text = text + tail
+        return text
+
+    # Return the list of (XML offset, conditioned offset) cuts for
+    # xml_text, or None if no cuts could be found.  conditioned_text is
+    # the result of conditioning head + xml_text + tail.
+    @classmethod
+    def find_cuts(cls, conditioner, xml_text, conditioned_text, head, tail):
+        candidates = [0]
+        for match in cls.CUT_CANDIDATE.finditer(xml_text):
+            if match.end() - candidates[-1] >= cls.CHUNK_SIZE:
+                candidates.append(match.end())
+        if candidates[-1] != len(xml_text):
+            candidates.append(len(xml_text))
+
+        # cut_idxs holds the index in candidates of each cut.  Each chunk
+        # ends at the first candidate from min_end_idx which gives the
+        # same text as conditioning the whole file.
+        cuts = [(0, 0)]
+        cut_idxs = [0]
+        min_end_idx = 1
+        while cut_idxs[-1] < len(candidates) - 1:
+            xml_start, text_start = cuts[-1]
+            chunk = None
+            for end_idx in range(min_end_idx, min(min_end_idx + cls.MAX_MERGES,
+                                                  len(candidates))):
+                chunk = conditioner.condition(cls.chunk_text(xml_text,
+                                xml_start, candidates[end_idx], head, tail))
+                if conditioned_text.startswith(chunk, text_start):
+                    break
+                chunk = None
+            if chunk is None:
+                # The cut at the start of this chunk changes the text after
+                # it.  Drop the cut, merging this chunk with the previous.
+                if len(cuts) == 1:
+                    return None
+                cuts.pop()
+                min_end_idx = cut_idxs.pop() + 1
+                continue
+            cuts.append((candidates[end_idx], text_start + len(chunk)))
+            cut_idxs.append(end_idx)
+            min_end_idx = end_idx + 1
+        if cuts[-1][1] != len(conditioned_text):
+            return None
+        return cuts
+
+    # Return the range of cuts [first, last] containing the conditioned
+    # text from start to end.
+    @staticmethod
+    def cut_range(cuts, start, end):
+        text_offsets = [text_offset for xml_offset, text_offset in cuts]
+        first = bisect.bisect_right(text_offsets, start) - 1
+        last = bisect.bisect_left(text_offsets, end)
+        return first, min(last, len(cuts) - 1)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Register block rules used to copy register fields to the register
+    blocks that they belong to.  See register_blocks.py.
+
+    Things get a bit complicated here.
+
+    The Rev 2.2 specifications consolidate the Part 6 register definitions
+    separately from the block definitions, which makes it impossible to
+    determine which register belongs to what block based on context.
+
+    Even more fun, the Rev 3.2 specifications define four new register
+    blocks which use the same LP-Serial registers as in 1.3 and 2.2, but
+    place them at new offsets.  They also define new registers to add to
+    the new register blocks.  The sections for these registers name the
+    offset of the register in each register map, "RM-I" and "RM-II".
+
+    Parsing this condensed part of the standard results in "UNKNOWN"
+    block types for all these registers.  The rules below figure out which
+    registers/bit fields appear in which register blocks, and add the
+    registers/bit fields accordingly.
+
+    The rules also take care of some Part 11 Multicast extensions additions
+    to existing registers in the Routing Table registers block.  Both were
+    introduced in revision 3.2.
+
+    And lastly in revision 3.2 and later, an additional "Hot Swap Only"
+    register block was added to Part 8, via similar unparseable means.
+
+    Rules are tried in the order listed, and the first rule that matches
+    gives the block IDs for the register field.  Rules which depend on the
+    block ID found in the text name the parser's register_block_id values
+    "UNKNOWN" and "STD_REG".
+"""
+
+from register_blocks import BlockRule
+
+RM1_BLK_IDS = ("0x0001", "0x0002", "0x0003", "0x0009")
+RM2_BLK_IDS = ("0x0011", "0x0012", "0x0013", "0x0019")
+RM1_SAER_BLK_IDS = ("0x0002", "0x0009")
+RM2_SAER_BLK_IDS = ("0x0012", "0x0019")
+EP_BLK_IDS_22 = ("0x0001", "0x0002")
+EP_BLK_IDS_32 = ("0x0011", "0x0012")
+PART8_BLK_IDS = ("0x0007", "0x0017")
+PART8_NON_HS_BLK_IDS = ("0x0007",)
+MULTICAST_BLK_IDS = ("0x000E",)
+
+UNKNOWN = ("UNKNOWN",)
+UNKNOWN_OR_STD = ("UNKNOWN", "STD_REG")
+
+LP_SERIAL_HEADER = "LP-Serial Register Block Header"
+
+# Registers which Part 11 adds to the Routing Table registers block.
+# Other Part 11 registers keep their block.
+MULTICAST_SECTIONS = ("Processing Elements Features CAR",
+                      "Switch Multicast Support CAR",
+                      "Switch Multicast Information CAR",
+                      "Multicast Mask Port CSR",
+                      "Multicast Associate Select CSR",
+                      "Multicast Associate Operation CSR")
+
+# The LP-Serial register blocks.  End points have only the first two.
+LP_SERIAL = dict(sections=[(LP_SERIAL_HEADER,
+                            "Port Link Timeout Control CSR",
+                            "Port General Control CSR")],
+                 current_blocks=UNKNOWN_OR_STD,
+                 sets=[("multiple_reg_blocks", True)],
+                 field_sets={"EF_ID":[("found_lp_serial_header", True)]})
+EP_FIELDS = ("Host", "Master Enable")
+
+PORT_RESPONSE_TIMEOUT = dict(sections=["Port Response Timeout Control CSR"],
+                             current_blocks=UNKNOWN)
+
+REV2 = dict(revision="2.2", current_blocks=UNKNOWN)
+SAER_SECTIONS = ("Link Maintenance", "ackID")
+
+# Part 8 registers which are also in the Hot Swap Only register block.
+PART8 = dict(since="3.2", parts=["Part 8"],
+             sets=[("multiple_part_8_reg_blocks", True)])
+PART8_HS_SECTIONS = ("Block Header",
+                     "Block CAR",
+                     "Target deviceID",
+                     "Packet Time-to-live",
+                     "Transmission Control",
+                     "Link Uninit Discard Timer")
+PART8_HS_ERROR_SECTIONS = ("Port n Error Detect",
+                           "Port n Error Rate Enable")
+
+REGISTER_MAP = dict(sets=[("multiple_part_8_reg_blocks", False)])
+
+REGISTER_BLOCK_RULES = [
+    BlockRule(MULTICAST_BLK_IDS, parts=["Part 11"],
+              not_sections=MULTICAST_SECTIONS,
+              current_blocks=UNKNOWN_OR_STD),
+
+    # Only the first LP-Serial register block header is copied to each
+    # LP-Serial register block.
+    BlockRule(None, sections=[LP_SERIAL_HEADER],
+              state="found_lp_serial_header",
+              sets=[("multiple_reg_blocks", False)]),
+
+    BlockRule(EP_BLK_IDS_22 + EP_BLK_IDS_32, after="2.2", values=EP_FIELDS,
+              **LP_SERIAL),
+    BlockRule(EP_BLK_IDS_22, after="1.3", values=EP_FIELDS, **LP_SERIAL),
+    BlockRule(RM1_BLK_IDS + RM2_BLK_IDS, after="2.2", **LP_SERIAL),
+    BlockRule(RM1_BLK_IDS, after="1.3", **LP_SERIAL),
+
+    BlockRule(EP_BLK_IDS_22 + EP_BLK_IDS_32, after="2.2",
+              **PORT_RESPONSE_TIMEOUT),
+    BlockRule(EP_BLK_IDS_22, **PORT_RESPONSE_TIMEOUT),
+
+    # Rev 2.2 Part 6 registers.
+    BlockRule(EP_BLK_IDS_22, sections=["Port Response Timeout"], **REV2),
+    BlockRule(RM1_SAER_BLK_IDS, sections=[SAER_SECTIONS], **REV2),
+    BlockRule(RM1_BLK_IDS, **REV2),
+
+    BlockRule(PART8_BLK_IDS, sections=[PART8_HS_SECTIONS], **PART8),
+    BlockRule(PART8_BLK_IDS, sections=[PART8_HS_ERROR_SECTIONS],
+              fields=["Link", "Uninit"], **PART8),
+    BlockRule(PART8_NON_HS_BLK_IDS, **PART8),
+
+    # Rev 3.2 and later Part 6 registers, at the offsets given for each
+    # register map.
+    BlockRule({"RM-I":EP_BLK_IDS_22, "RM-II":EP_BLK_IDS_32},
+              sections=["RM-I", "Port Response Timeout"], **REGISTER_MAP),
+    BlockRule({"RM-I":RM1_SAER_BLK_IDS, "RM-II":RM2_SAER_BLK_IDS},
+              sections=["RM-I", SAER_SECTIONS], **REGISTER_MAP),
+    BlockRule({"RM-I":RM1_BLK_IDS, "RM-II":RM2_BLK_IDS},
+              sections=["RM-I"], **REGISTER_MAP),
+
+    # All other registers keep their block.
+    BlockRule(None, **REGISTER_MAP),
+]
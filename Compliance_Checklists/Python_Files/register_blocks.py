@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Table driven register block assignment for RapidIO register tables.
+
+    Some register tables in the specification define fields which belong
+    to several register blocks, or to a block which cannot be determined
+    from the text around the table.  The rules in register_block_rules.py
+    give the register blocks that each register field is copied to.
+
+    Rules are tried in table order, and the first rule whose conditions
+    are all met gives the block IDs for the field.  A rule without block
+    IDs keeps the block ID found in the text.  Block IDs may also be a
+    dictionary from register map names, e.g. "RM-I" and "RM-II", to
+    block IDs, in which case the field is copied to the blocks of every
+    register map named in the section, in the order that they are named.
+
+    Every string in the rules is compiled into a single regular expression,
+    which finds all of the strings in a part or section name.
+    Every register field in a section has the same part and section name,
+    so the rules which can match a section are found once per section, and
+    each field is only tested against the conditions which depend on the
+    field itself or on the parser state.
+"""
+
+import re
+
+class BlockRule(object):
+    # block_ids - tuple of block IDs, dictionary of register map name to
+    #             block IDs, or None to keep the block ID found in the text.
+    # parts - the part name contains one of these strings.
+    # sections - the section name contains each of these.  A tuple
+    #            element is met if the section contains any of its strings.
+    # not_sections - the section name contains none of these strings.
+    # fields - the field name contains all of these strings.
+    # values - a column of the register field equals one of these strings.
+    # current_blocks - the block ID found in the text is one of these.
+    # after, since, revision - the revision is after, at or after, or equal
+    #                          to this revision.
+    # state - the parser attribute which must be true.
+    # sets - (attribute, value) pairs set on the parser.
+    # field_sets - field name to (attribute, value) pairs set on the parser.
+    def __init__(self, block_ids, parts=(), sections=(), not_sections=(),
+                 fields=(), values=(), current_blocks=(), after=None,
+                 since=None, revision=None, state=None, sets=(),
+                 field_sets=None):
+        self.block_ids = block_ids
+        self.parts = parts
+        self.sections = sections
+        self.not_sections = not_sections
+        self.fields = fields
+        self.values = values
+        self.current_blocks = current_blocks
+        self.after = after
+        self.since = since
+        self.revision = revision
+        self.state = state
+        self.sets = sets
+        self.field_sets = field_sets
+
+    def strings(self):
+        strings = list(self.parts) + list(self.not_sections) + list(self.fields)
+        for section in self.sections:
+            if isinstance(section, tuple):
+                strings.extend(section)
+            else:
+                strings.append(section)
+        if isinstance(self.block_ids, dict):
+            strings.extend(self.block_ids.keys())
+        return strings
+
+    def revision_matches(self, revision):
+        if self.after is not None and not revision > self.after:
+            return False
+        if self.since is not None and not revision >= self.since:
+            return False
+        if self.revision is not None and not revision == self.revision:
+            return False
+        return True
+
+    # part_found is the set of strings found in the part name.
+    def part_matches(self, part_found):
+        return not self.parts or bool(part_found.intersection(self.parts))
+
+    # section_found is the set of strings found in the section name.
+    def section_matches(self, section_found):
+        for section in self.sections:
+            if isinstance(section, tuple):
+                if not section_found.intersection(section):
+                    return False
+            elif section not in section_found:
+                return False
+        return not section_found.intersection(self.not_sections)
+
+class RegisterBlockMatcher(object):
+    def __init__(self, rules):
+        self.rules = rules
+        strings = set()
+        for rule in rules:
+            strings.update(rule.strings())
+        # At each position the longest string is matched, and every string
+        # which is a prefix of it is also found there.
+        strings = sorted(strings, key=len, reverse=True)
+        self.pattern = re.compile("|".join([re.escape(s) for s in strings]))
+        self.prefixes = dict([(s, [p for p in strings if s.startswith(p)])
+                              for s in strings])
+        self.map_patterns = {}
+        for rule in rules:
+            if isinstance(rule.block_ids, dict):
+                names = sorted(rule.block_ids, key=len, reverse=True)
+                self.map_patterns[rule] = re.compile(
+                        "|".join([re.escape(name) for name in names]))
+        self.part_rules = {}
+        self.candidates = {}
+
+    # Matches may overlap, so each search starts just after the start of
+    # the previous match.
+    def _found(self, text):
+        found = set()
+        match = self.pattern.search(text)
+        while match:
+            found.update(self.prefixes[match.group()])
+            match = self.pattern.search(text, match.start() + 1)
+        return found
+
+    # Return the block IDs of the register maps named in section.
+    def _map_block_ids(self, rule, section):
+        ids = []
+        for name in self.map_patterns[rule].findall(section):
+            ids.extend(rule.block_ids[name])
+        return tuple(ids)
+
+    # Return the rules whose revision and part conditions are met.
+    def _part_rules(self, revision, part):
+        key = (revision, part)
+        rules = self.part_rules.get(key)
+        if rules is None:
+            part_found = self._found(part)
+            rules = [rule for rule in self.rules
+                     if rule.revision_matches(revision)
+                     and rule.part_matches(part_found)]
+            self.part_rules[key] = rules
+        return rules
+
+    # Return the list of (rule, block IDs) for the rules whose revision,
+    # part and section conditions are met.
+    def _candidates(self, revision, part, section):
+        key = (revision, part, section)
+        candidates = self.candidates.get(key)
+        if candidates is None:
+            section_found = self._found(section)
+            candidates = []
+            for rule in self._part_rules(revision, part):
+                if not rule.section_matches(section_found):
+                    continue
+                block_ids = rule.block_ids
+                if isinstance(block_ids, dict):
+                    block_ids = self._map_block_ids(rule, section)
+                candidates.append((rule, block_ids))
+            self.candidates[key] = candidates
+        return candidates
+
+    # Return the first rule which matches reg, and the block IDs that reg
+    # should be copied to, or None to keep its block ID.  current_block is
+    # the block ID found in the text, and the state conditions of the rules
+    # are attributes of state.
+    def match(self, reg, current_block, state):
+        for rule, block_ids in self._candidates(reg.revision, reg.part,
+                                                reg.section):
+            if rule.current_blocks and current_block not in rule.current_blocks:
+                continue
+            if rule.fields:
+                found = self._found(reg.field)
+                if [s for s in rule.fields if s not in found]:
+                    continue
+            if rule.values and not [v for v in reg if v in rule.values]:
+                continue
+            if rule.state is not None and not getattr(state, rule.state):
+                continue
+            return rule, block_ids
+        return None, None
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Sentence splitter for requirement extraction.
+
+    Splits the text of a specification section into sentences, returning
+    (start, end) spans of the text.  The sentence boundaries are identical
+    to those found by RapidIOStandardParser._legacy_split_into_sentences,
+    which was adapted from code at
+    https://stackoverflow.com/questions/4576077/python-split-text-on-sentences
+
+    The legacy splitter rewrites the text with <prd> and <stop> markers
+    using a sequence of regular expressions, then splits on <stop>.  This
+    splitter applies the same sequence of regular expressions, precompiled,
+    but every replacement has the same length as the text it replaces:
+    - Periods which do not end a sentence are replaced by PERIOD.
+    - Ellipses and "i.e." are replaced by runs of ELLIPSIS and FOR_EXAMPLE.
+    - Periods removed by the legacy splitter are replaced by STOP.
+    - Sentence ends inserted between characters are kept in a list.
+    Offsets in the marked text are therefore offsets in the original text.
+    Expressions which cannot match, such as those for acronyms when the
+    text contains none, are skipped.  Expressions which start with a
+    character class are slow to search for, so those which protect a single
+    period are replaced by equivalent expressions which start with the
+    period.  Matches of the original expressions do not overlap, so
+    overlapping matches of the replacements are ignored.
+
+    spans() returns the span of each sentence.  sentences() renders the
+    span of each sentence as the same string as the legacy splitter,
+    including the "<ellipsis>", "<for example>" and "<quote>" placeholders
+    that it leaves in the text.  Sentences are rendered as they are used,
+    from the marked text of the last call to spans().  Text which already
+    contains one of the marker characters cannot be split, and must be
+    split by the legacy splitter; has_markers() identifies such text.
+"""
+
+import re
+
+PERIOD = "\x01"
+ELLIPSIS = "\x02"
+FOR_EXAMPLE = "\x03"
+STOP = "\x04"
+BOUNDARY = "\x05"
+MARKERS = PERIOD + ELLIPSIS + FOR_EXAMPLE + STOP + BOUNDARY
+
+CAPS = "([A-Z])"
+PREFIXES = "(Mr|St|Mrs|Ms|Dr)[.]"
+SUFFIXES = "(Inc|Ltd|Jr|Sr|Co)"
+STARTERS = "(Mr|Mrs|Ms|Dr|He\s|She\s|It\s|They\s|Their\s|Our\s|We\s|But\s|However\s|That\s|This\s|Wherever)"
+ACRONYMS = "([A-Z][.][A-Z][.](?:[A-Z][.])?)"
+WEBSITES = "[.](com|net|org|io|gov)"
+DIGITS = "([0-9])"
+
+PREFIX_PERIOD = re.compile(PREFIXES)
+ELLIPSIS_PERIODS = re.compile(r"\.\.+")
+FOR_EXAMPLE_PERIODS = re.compile(r"i\.e\.")
+WEBSITE_PERIOD = re.compile(WEBSITES)
+# DIGITS + "[.]" + DIGITS
+DECIMAL_PERIOD = re.compile("[.](?<=[0-9][.])(?=[0-9])")
+# "\s" + CAPS + "[.] "
+INITIAL_PERIOD = re.compile("[.](?<=\s[A-Z][.])(?= )")
+ACRONYM = re.compile("[.](?<=[A-Z][.])(?=[A-Z][.])")
+ACRONYM_END = re.compile(ACRONYMS + " " + STARTERS)
+THREE_LETTER_ACRONYM = re.compile(CAPS + "[.]" + CAPS + "[.]" + CAPS + "[.]")
+TWO_LETTER_ACRONYM = re.compile(CAPS + "[.]" + CAPS + "[.]")
+SUFFIX_END = re.compile(" " + SUFFIXES + "[.] " + STARTERS)
+SUFFIX_PERIOD = re.compile(" " + SUFFIXES + "[.]")
+# " " + CAPS + "[.]"
+CAPITAL_PERIOD = re.compile("[.](?<= [A-Z][.])")
+SENTENCE_END = re.compile("[.?!" + STOP + "]")
+
+ELLIPSIS_RUN = re.compile(ELLIPSIS + "+")
+FOR_EXAMPLE_RUN = FOR_EXAMPLE * len("i.e.")
+SUFFIX_PERIODS = [" %s." % suffix for suffix in SUFFIXES[1:-1].split("|")]
+NUMBER_PREFIX = "0123456789"
+
+class SentenceSplitter(object):
+    def __init__(self):
+        self._marked = None
+
+    # Replace the period matched by pattern with PERIOD, where the original
+    # expression matched "before" characters before the period and "after"
+    # characters after it.  If space is True, the first character of the
+    # original match is replaced by a space.
+    @staticmethod
+    def _mark_periods(text, pattern, before, after, space=False):
+        pieces = []
+        copied = 0
+        match_end = 0
+        for match in pattern.finditer(text):
+            period = match.start()
+            if period - before < match_end:
+                continue
+            match_end = period + after + 1
+            if space:
+                pieces.append(text[copied:period - before])
+                pieces.append(" ")
+                copied = period - before + 1
+            pieces.append(text[copied:period])
+            pieces.append(PERIOD)
+            copied = period + 1
+        if not pieces:
+            return text
+        pieces.append(text[copied:])
+        return "".join(pieces)
+
+    # Returns the marked text, and the sorted list of offsets at which the
+    # acronym expression inserts a sentence end.
+    def _mark(self, text):
+        ends = []
+        if "." in text:
+            text = PREFIX_PERIOD.sub("\\1" + PERIOD, text)
+            if ".." in text:
+                text = ELLIPSIS_PERIODS.sub(
+                            lambda m: ELLIPSIS * len(m.group(0)), text)
+            if "i.e." in text:
+                text = FOR_EXAMPLE_PERIODS.sub(FOR_EXAMPLE_RUN, text)
+            text = WEBSITE_PERIOD.sub(PERIOD + "\\1", text)
+            text = self._mark_periods(text, DECIMAL_PERIOD, 1, 1)
+            if "Ph.D" in text:
+                text = text.replace("Ph.D.", "Ph" + PERIOD + "D" + PERIOD)
+            text = self._mark_periods(text, INITIAL_PERIOD, 2, 1, space=True)
+            if ACRONYM.search(text):
+                ends = [m.end(1) for m in ACRONYM_END.finditer(text)]
+                text = THREE_LETTER_ACRONYM.sub(
+                        "\\1" + PERIOD + "\\2" + PERIOD + "\\3" + PERIOD, text)
+                text = TWO_LETTER_ACRONYM.sub(
+                        "\\1" + PERIOD + "\\2" + PERIOD, text)
+            if [suffix for suffix in SUFFIX_PERIODS if suffix in text]:
+                text = SUFFIX_END.sub(" \\1" + STOP + " \\2", text)
+                text = SUFFIX_PERIOD.sub(" \\1" + PERIOD, text)
+            text = self._mark_periods(text, CAPITAL_PERIOD, 2, 0)
+        return text, ends
+
+    @staticmethod
+    def has_markers(text):
+        return bool([marker for marker in MARKERS if marker in text])
+
+    # Returns the (start, end) span of each sentence in text.  Text after
+    # the last sentence end is not a sentence.  A period removed by the
+    # legacy splitter is marked by STOP, which ends the span.
+    def spans(self, text):
+        if self.has_markers(text):
+            raise ValueError("Text contains sentence splitter markers")
+        marked, ends = self._mark(text)
+        self._marked = (text, marked)
+        ends.extend([m.end() for m in SENTENCE_END.finditer(marked)])
+        ends.sort()
+        starts = [0] + ends[:-1]
+        return zip(starts, ends)
+
+    def _marked_text(self, text):
+        if self._marked is not None and self._marked[0] is text:
+            return self._marked[1]
+        return self._mark(text)[0]
+
+    # Returns the text of the sentence from start to end of marked, stripped
+    # of whitespace and leading digits.
+    @staticmethod
+    def _render(marked, start, end):
+        sentence = marked[start:end]
+        if STOP in sentence:
+            sentence = sentence.replace(STOP, "")
+        if PERIOD in sentence:
+            sentence = sentence.replace(PERIOD, ".")
+        if ELLIPSIS in sentence:
+            sentence = ELLIPSIS_RUN.sub("<ellipsis>", sentence)
+        if FOR_EXAMPLE in sentence:
+            sentence = sentence.replace(FOR_EXAMPLE_RUN, "<for example>")
+        if '"' in sentence:
+            sentence = sentence.replace('"', "<quote>")
+        return sentence.strip().lstrip(NUMBER_PREFIX)
+
+    # Returns an iterator over the text of the sentence of each span of
+    # text, by default all sentences.  Each sentence is rendered when the
+    # iterator reaches it.
+    def sentences(self, text, spans=None):
+        if spans is None:
+            spans = self.spans(text)
+        marked = self._marked_text(text)
+        return (self._render(marked, start, end) for start, end in spans)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    On disk cache of conditioned RapidIO specification text.
+
+    Conditioning a specification and splitting it into parts takes most of
+    the time required to parse it.  The cache stores the conditioned text
+    and the (start, end) offsets of each part, so that later runs using the
+    same XML file and the same conditioning rules skip straight to parsing
+    chapters and sections.
+
+    Each cache entry is named by a SHA-1 digest of the cache format version,
+    the version of the conditioning rules applied, and the content of the
+    XML file.  Changing any of these results in a new entry, so stale
+    entries are never used.  Entries are marshalled and compressed with
+    zlib.
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import zlib
+
+class SpecificationCache(object):
+    # Increment when the content of a cache entry changes.
+    CACHE_VERSION = 1
+    CACHE_SUFFIX = ".cache"
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def key(cls, xml_text, rules_version):
+        digest = hashlib.sha1()
+        digest.update(str(cls.CACHE_VERSION) + "\n")
+        digest.update(rules_version + "\n")
+        digest.update(xml_text)
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + self.CACHE_SUFFIX)
+
+    # Return the conditioned text and list of part segments saved for key,
+    # or None if there is no usable entry.
+    def load(self, key):
+        entry_path = self._entry_path(key)
+        if not os.path.isfile(entry_path):
+            return None
+        try:
+            entry_file = open(entry_path, 'rb')
+            entry = entry_file.read()
+            entry_file.close()
+            entry_key, all_text, part_segments = marshal.loads(
+                                                    zlib.decompress(entry))
+        except (IOError, EOFError, ValueError, TypeError, zlib.error) as e:
+            logging.warning("Ignoring unreadable cache entry '%s': %s"
+                            % (entry_path, e))
+            return None
+        if entry_key != key:
+            logging.warning("Ignoring mismatched cache entry '%s'"
+                            % entry_path)
+            return None
+        logging.info("Loaded cache entry '%s'" % entry_path)
+        return all_text, part_segments
+
+    # The entry is written to a temporary file and renamed, so that an
+    # interrupted run never leaves a partial entry.  The cache only speeds
+    # up parsing, so failing to write an entry is logged as a warning.
+    def save(self, key, all_text, part_segments):
+        entry_path = self._entry_path(key)
+        temp_path = entry_path + ".tmp"
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            entry_file = open(temp_path, 'wb')
+            try:
+                entry_file.write(zlib.compress(
+                            marshal.dumps((key, all_text, part_segments))))
+            finally:
+                entry_file.close()
+            os.rename(temp_path, entry_path)
+        except (IOError, OSError) as e:
+            logging.warning("Could not save cache entry '%s': %s"
+                            % (entry_path, e))
+            if os.path.isfile(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return
+        logging.info("Saved cache entry '%s'" % entry_path)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Wall time and call counts for the stages of a parser, and counters of
+    the work done in each part of a specification.
+
+    Stages are methods of the parser.  instrument() replaces each method of
+    one parser object with a wrapper that times it, so parsers which are
+    not profiled are unchanged.  Stage times include the time spent in any
+    other stage called by the stage, i.e. parse_chapters includes
+    parse_sections.
+
+    Counters may be given for a stage.  Each counter function is called
+    after each call of the stage with the parser, the arguments and the
+    result of the call, and returns the amount to add to the counter for
+    the part being parsed.
+
+    Parts parsed by worker processes are profiled in the worker.  The
+    worker returns data() with its results, and the main process adds it
+    with merge().  Stage times of parts parsed in parallel add up to more
+    than the wall time of the run.
+"""
+
+import json
+import time
+from collections import OrderedDict
+
+class StageProfile(object):
+    def __init__(self):
+        self.start = time.time()
+        self.reset()
+
+    def reset(self):
+        self.stages = OrderedDict()
+        self.parts = OrderedDict()
+
+    def _stage(self, name):
+        return self.stages.setdefault(name, OrderedDict([("calls", 0),
+                                                         ("seconds", 0.0)]))
+
+    # Time each call of each method named in stages.  counters maps a stage
+    # name to a list of (counter name, counter function).  part_name returns
+    # the name of the part being parsed.
+    def instrument(self, obj, stages, counters, part_name):
+        for name in stages:
+            self._stage(name)
+            setattr(obj, name, self._timed(name, getattr(obj, name),
+                                           counters.get(name, []), obj,
+                                           part_name))
+
+    def _timed(self, name, method, counters, obj, part_name):
+        def timed(*args, **kwargs):
+            start = time.time()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                stage = self._stage(name)
+                stage["calls"] += 1
+                stage["seconds"] += time.time() - start
+            for counter_name, count in counters:
+                self.count(part_name(), counter_name, count(obj, args, result))
+            return result
+        return timed
+
+    def count(self, part, counter_name, amount):
+        counters = self.parts.setdefault(part, OrderedDict())
+        counters[counter_name] = counters.get(counter_name, 0) + amount
+
+    def data(self):
+        return (self.stages, self.parts)
+
+    def merge(self, data):
+        stages, parts = data
+        for name in stages:
+            stage = self._stage(name)
+            stage["calls"] += stages[name]["calls"]
+            stage["seconds"] += stages[name]["seconds"]
+        for part in parts:
+            for counter_name in parts[part]:
+                self.count(part, counter_name, parts[part][counter_name])
+
+    # Write the profile, and any other information about the run, as JSON.
+    def write(self, filepath, info):
+        report = OrderedDict(info)
+        report["wall_seconds"] = time.time() - self.start
+        report["stages"] = self.stages
+        report["parts"] = self.parts
+        output = open(filepath, 'w')
+        json.dump(report, output, indent=2)
+        output.write("\n")
+        output.close()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Table driven text conditioning for RapidIO specification XML files.
+
+    Applies an ordered table of substitution rules (see conditioning_rules.py)
+    to the text of a specification.  The result is identical to calling
+    re.sub() for each rule in turn, but:
+    - Every rule is compiled once, when the conditioner is created.
+    - Every rule has a set of literal characters that every match must
+      contain.  The rule is skipped when those characters are not in the
+      text, so rules for other specification revisions cost a single
+      substring search.
+    - Plain string rules are applied with str.replace().
+    - Rules which start with a repeated character class, i.e. "\s+</P>...",
+      are matched by searching for the remainder of the pattern and then
+      extending the match backwards over the character class.  Python's
+      regular expression engine would otherwise attempt a match at every
+      whitespace character in the document.
+
+    Each rule belongs to one or more rule packs.  A conditioner may be
+    created for a subset of the packs, i.e. the common pack and the pack for
+    a specification revision, in which case only the rules in those packs
+    are applied.  The rules are still applied in table order.  The number of
+    matches of each rule can be counted, so that rules which are no longer
+    needed can be found.
+
+    condition() can also write a trace of every match of every rule, giving
+    the offset of the match in the text that the rule was applied to, the
+    matched text and its replacement.
+"""
+
+import hashlib
+import re
+import sre_compile
+import sre_constants
+import sre_parse
+
+COMMON_PACK = "common"
+TRACE_HEADER = "'Rule', 'Pattern', 'Offset', 'Before', 'After'"
+
+class ConditioningRule(object):
+    def __init__(self, pattern, replacement, packs, literal=False, count=0):
+        self.pattern = pattern
+        self.replacement = replacement
+        self.packs = packs
+        self.literal = literal
+        self.count = count
+
+    def __str__(self):
+        return "'%s' -> '%s'" % (self.pattern, self.replacement)
+
+class CompiledRule(object):
+    LITERAL = "literal"
+    REGEX = "regex"
+    LEADING_CLASS = "leading_class"
+
+    REGEX_SPECIAL_CHARS = ".^$*+?{}[]\\|()"
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.kind = self.LITERAL
+        self.required = rule.pattern
+        self.regex = None
+        self.lead = None
+        self.lead_min = 0
+        self.core = None
+        self.matches = 0
+
+        if rule.literal:
+            return
+        # re.sub() processes backslash escapes in the replacement.
+        if (not [c for c in rule.pattern if c in self.REGEX_SPECIAL_CHARS]
+            and rule.replacement.find("\\") < 0):
+            return
+
+        self.kind = self.REGEX
+        self.regex = re.compile(rule.pattern)
+        parsed = sre_parse.parse(rule.pattern)
+        self.required = self._required_literal(parsed)
+        if rule.replacement.find("\\") < 0 and not rule.count:
+            self._split_leading_class(parsed)
+
+    # Return the longest sequence of literal characters found at the top
+    # level of the pattern.  Every match of the pattern contains these
+    # characters.
+    @staticmethod
+    def _required_literal(parsed):
+        best = ""
+        run = []
+        for op, av in parsed.data:
+            if op == sre_constants.LITERAL:
+                run.append(chr(av))
+                continue
+            if len(run) > len(best):
+                best = "".join(run)
+            run = []
+        if len(run) > len(best):
+            best = "".join(run)
+        return best
+
+    # A pattern of the form "<class>*<literal>..." or "<class>+<literal>...",
+    # where <literal> is not a member of <class>, can only start a match at
+    # the beginning of the run of <class> characters immediately preceding
+    # a match of "<literal>...".  Split the pattern into the leading
+    # character class and the remainder (the core) of the pattern.
+    def _split_leading_class(self, parsed):
+        items = parsed.data
+        if len(items) < 2:
+            return
+        op, av = items[0]
+        if op != sre_constants.MAX_REPEAT:
+            return
+        min_count, max_count, repeated = av
+        if max_count != sre_constants.MAXREPEAT or len(repeated.data) != 1:
+            return
+        if repeated.data[0][0] not in (sre_constants.IN,
+                                       sre_constants.LITERAL):
+            return
+        if items[1][0] != sre_constants.LITERAL:
+            return
+        lead = sre_compile.compile(
+                    sre_parse.SubPattern(parsed.pattern, [repeated.data[0]]))
+        if lead.match(chr(items[1][1])):
+            return
+        self.kind = self.LEADING_CLASS
+        self.lead = lead
+        self.lead_min = min_count
+        self.core = sre_compile.compile(
+                    sre_parse.SubPattern(parsed.pattern, items[1:]))
+
+    def _sub_leading_class(self, text):
+        pieces = []
+        pos = 0
+        search_from = 0
+        while True:
+            found = self.core.search(text, search_from)
+            if not found:
+                break
+            start = found.start()
+            while start > pos and self.lead.match(text, start - 1):
+                start -= 1
+            if found.start() - start < self.lead_min:
+                search_from = found.start() + 1
+                continue
+            pieces.append(text[pos:start])
+            pieces.append(self.rule.replacement)
+            pos = found.end()
+            search_from = pos
+        if not pieces:
+            return text
+        self.matches += len(pieces) // 2
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+    # Return (offset, matched text, replacement) for each match of the rule
+    # in text.  This finds the same matches as apply(), more slowly.
+    def find_matches(self, text):
+        if self.required not in text:
+            return []
+        found = []
+        if self.kind == self.LITERAL:
+            offset = text.find(self.rule.pattern)
+            while offset >= 0 and not (self.rule.count
+                                       and len(found) >= self.rule.count):
+                found.append((offset, self.rule.pattern, self.rule.replacement))
+                offset = text.find(self.rule.pattern,
+                                   offset + len(self.rule.pattern))
+            return found
+        for match in self.regex.finditer(text):
+            if self.rule.count and len(found) >= self.rule.count:
+                break
+            found.append((match.start(), match.group(0),
+                          match.expand(self.rule.replacement)))
+        return found
+
+    def in_packs(self, packs):
+        return bool([pack for pack in self.rule.packs if pack in packs])
+
+    # Counting the matches of a plain string rule costs an additional
+    # search of the text, so it is only done if count_matches is True.
+    def apply(self, text, count_matches=False):
+        if self.required not in text:
+            return text
+        if self.kind == self.LITERAL:
+            if count_matches:
+                found = text.count(self.rule.pattern)
+                if self.rule.count:
+                    found = min(found, self.rule.count)
+                self.matches += found
+            if self.rule.count:
+                return text.replace(self.rule.pattern, self.rule.replacement,
+                                    self.rule.count)
+            return text.replace(self.rule.pattern, self.rule.replacement)
+        if self.kind == self.LEADING_CLASS:
+            return self._sub_leading_class(text)
+        text, found = self.regex.subn(self.rule.replacement, text,
+                                      self.rule.count)
+        self.matches += found
+        return text
+
+class TextConditioner(object):
+    # packs is a list of rule pack names.  Only rules belonging to at least
+    # one of the packs are applied.  If packs is None, all rules are applied.
+    def __init__(self, rules, packs=None):
+        self.packs = packs
+        self.count_matches = False
+        self.rules = [CompiledRule(rule) for rule in rules]
+        if packs is not None:
+            self.rules = [rule for rule in self.rules if rule.in_packs(packs)]
+
+    # Return a digest identifying the rules applied by this conditioner.
+    # The digest changes whenever a rule is added, removed, reordered or
+    # modified.
+    def rules_version(self):
+        digest = hashlib.sha1()
+        for rule in self.rules:
+            digest.update(repr((rule.rule.pattern, rule.rule.replacement,
+                                rule.rule.literal, rule.rule.count)))
+        return digest.hexdigest()
+
+    # If trace_file is not None, every match of every rule is written to it,
+    # one line per match.  Rules are numbered in the order they are applied.
+    def condition(self, text, trace_file=None):
+        for rule_idx, rule in enumerate(self.rules):
+            if trace_file is not None:
+                for offset, before, after in rule.find_matches(text):
+                    trace_file.write("'%d', %s, '%d', %s, %s\n"
+                                     % (rule_idx, repr(rule.rule.pattern),
+                                        offset, repr(before), repr(after)))
+            text = rule.apply(text, self.count_matches)
+        return text
+
+    # Write one line per applied rule, giving the packs the rule belongs to,
+    # the number of matches found by all calls to condition() while
+    # count_matches was True, the pattern and the replacement.
+    def print_rule_usage(self, out_file):
+        out_file.write("'Packs', 'Matches', 'Pattern', 'Replacement'\n")
+        for rule in self.rules:
+            out_file.write("'%s', '%d', %s, %s\n"
+                           % (" ".join(rule.rule.packs), rule.matches,
+                              repr(rule.rule.pattern),
+                              repr(rule.rule.replacement)))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Zero copy views of the conditioned text of a specification.
+
+    A TextSpan is a (start, end) range within a buffer, optionally preceded
+    by a short prefix string.  The value of a span is:
+
+        prefix + buffer[start:end]
+
+    The parser splits the specification into parts, chapters and sections.
+    Splitting a span returns spans into the same buffer, so that the text of
+    each part, chapter and section is only copied when it is needed, i.e.
+    to extract register tables or the requirements of new sections.
+
+    startswith(), find() and split() behave exactly as the str methods of
+    the same name applied to the value of the span.  slice(), prepend() and
+    concat() have no str equivalent; each returns a new span, as described
+    by its comment.
+"""
+
+class TextSpan(object):
+    def __init__(self, buffer, start=0, end=None, prefix=""):
+        if end is None:
+            end = len(buffer)
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.prefix = prefix
+
+    def __len__(self):
+        return len(self.prefix) + self.end - self.start
+
+    def __str__(self):
+        return self.text()
+
+    def text(self):
+        if not self.prefix:
+            return self.buffer[self.start:self.end]
+        return self.prefix + self.buffer[self.start:self.end]
+
+    def startswith(self, sub):
+        if not self.prefix:
+            return (self.end - self.start >= len(sub)
+                    and self.buffer.startswith(sub, self.start))
+        return self.slice(0, len(sub)).text() == sub
+
+    # Return a span for value[first:last].
+    def slice(self, first, last=None):
+        length = len(self.prefix) + self.end - self.start
+        if last is None or last > length:
+            last = length
+        if first < 0 or last < 0:
+            first, last, step = slice(first, last).indices(length)
+        elif first > last:
+            first = last
+        last = max(first, last)
+        plen = len(self.prefix)
+        if first >= plen:
+            return TextSpan(self.buffer, self.start + first - plen,
+                            self.start + last - plen)
+        if last <= plen:
+            return TextSpan(self.prefix[first:last])
+        return TextSpan(self.buffer, self.start, self.start + last - plen,
+                        self.prefix[first:])
+
+    def find(self, sub, offset=0):
+        offset = slice(offset, None).indices(len(self))[0]
+        plen = len(self.prefix)
+        body_offset = self.start
+        if offset < plen:
+            # Matches starting within the prefix.
+            head = (self.prefix[offset:]
+                    + self.buffer[self.start:
+                                  min(self.end, self.start + len(sub) - 1)])
+            found = head.find(sub)
+            if found >= 0:
+                return offset + found
+        else:
+            body_offset += offset - plen
+        found = self.buffer.find(sub, body_offset, self.end)
+        if found < 0:
+            return -1
+        return found - self.start + plen
+
+    # Return spans for the values returned by str.split(sep).
+    def split(self, sep):
+        pieces = []
+        first = 0
+        found = self.find(sep)
+        while found >= 0:
+            pieces.append(self.slice(first, found))
+            first = found + len(sep)
+            found = self.find(sep, first)
+        pieces.append(self.slice(first))
+        return pieces
+
+    # Return a span for prefix + value.  No text is copied if the prefix
+    # immediately precedes the span in the buffer, as is the case for the
+    # separator removed by split().
+    def prepend(self, prefix):
+        if (not self.prefix
+            and self.start >= len(prefix)
+            and self.buffer.startswith(prefix, self.start - len(prefix))):
+            return TextSpan(self.buffer, self.start - len(prefix), self.end)
+        return TextSpan(self.buffer, self.start, self.end,
+                        prefix + self.prefix)
+
+    # Return a span for value + sep + other.value.  No text is copied if
+    # other directly follows this span and sep in the buffer.
+    def concat(self, sep, other):
+        if (other.buffer is self.buffer
+            and not other.prefix
+            and other.start == self.end + len(sep)
+            and self.buffer.startswith(sep, self.end)):
+            return TextSpan(self.buffer, self.start, other.end, self.prefix)
+        return TextSpan(self.text() + sep + other.text())
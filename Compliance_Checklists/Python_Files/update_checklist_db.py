@@ -92,6 +92,17 @@ class ReqtDatabaseUpdater(object):
             self.chk[rev][part][chap][sect][sent_num].extend(temp)
             logging.info("Sentence Num: %s" % sent_num)
 
+    # Add checklist item chk_sent_num to the database as db_sent_num.  The
+    # database is keyed by the Sentence_num column, so the column is set to
+    # db_sent_num.
+    def _add_db_item(self, rev, part, chap, sect, chk_sent_num, db_sent_num):
+        chk_item = self.chk[rev][part][chap][sect][chk_sent_num]
+        temp_items = chk_item[TOK_IDX_CHK_H_SENTENCE:CHECKLIST_HEADER_TOKEN_COUNT]
+        temp_items[TOK_IDX_CHK_H_SENTENCE_NUM] = db_sent_num
+        first_rev = chk_item[TOK_IDX_MRG_CHK_H_FIRST_REV]
+        self.db.add_db_item(rev, part, chap, sect, chk_sent_num, db_sent_num,
+                            temp_items, first_rev)
+
     def update_db_item(self, rev, part, chap, sect, sent_num):
         chk_item = self.chk[rev][part][chap][sect][sent_num]
         sent_num_val = int(sent_num)
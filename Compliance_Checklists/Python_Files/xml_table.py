@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: latin-1 -*-
+"""
+    Rows and cells of the tables in a RapidIO specification section.
+
+    Tables in the conditioned text of a specification are structured as:
+    <Table> <Caption> table caption </Caption>
+    <TR> <TH>Bit </TH> <TH>Field Name</TH> <TH>Description</TH> </TR>
+    <TR> <TD>bits</TD> <TD>Field name</TD> <TD>Descrption</TD> </TR>
+    </Table>
+
+    The text is split into rows at each <TR>.  The cells of a row are the
+    text from the first <TD> to the last </TD>, split at each </TD>.  Each
+    cell has its XML tags replaced by spaces, runs of spaces replaced by a
+    single space, and leading and trailing whitespace removed.
+
+    The cells of a row are cleaned in a single pass over the row: each
+    </TD> is replaced by CELL_SEPARATOR, which XML tags cannot contain, so
+    that XML tags are never matched across cells.
+"""
+
+import re
+
+class TableRow(object):
+    def __init__(self, text, cells):
+        # The XML of the row.
+        self.text = text
+        # The cleaned cells of the row, including empty cells, or None if
+        # the row has no <TD> cells.
+        self.cells = cells
+
+class XmlTable(object):
+    ROW_START = "<TR>"
+    CELL_START = "<TD>"
+    CELL_END = "</TD>"
+    CELL_SEPARATOR = "\x00"
+    # XML tags and spaces, which are replaced by a single space.
+    TAGS_AND_SPACES = re.compile("(?:<[^>" + CELL_SEPARATOR + "]+>| )+")
+    TAG = re.compile(r"<[^>]+>")
+    SPACES = re.compile(" +")
+
+    def __init__(self, text):
+        self.text = text
+
+    @classmethod
+    def clean_cell(cls, cell):
+        cell = cls.TAG.sub(" ", cell).strip()
+        return cls.SPACES.sub(" ", cell)
+
+    @classmethod
+    def _row_cells(cls, row):
+        cells_start = row.find(cls.CELL_START)
+        cells_end = row.rfind(cls.CELL_END)
+        if cells_start == -1 or cells_end == -1:
+            return None
+        cells = row[cells_start:cells_end]
+        if cls.CELL_SEPARATOR in cells:
+            return [cls.clean_cell(cell) for cell in cells.split(cls.CELL_END)]
+        cells = cls.TAGS_AND_SPACES.sub(" ",
+                        cells.replace(cls.CELL_END, cls.CELL_SEPARATOR))
+        return [cell.strip() for cell in cells.split(cls.CELL_SEPARATOR)]
+
+    def rows(self):
+        for row in self.text.split(self.ROW_START):
+            row = row.strip()
+            yield TableRow(row, self._row_cells(row))